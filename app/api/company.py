@@ -1,12 +1,29 @@
 from __future__ import annotations
 
+import io
+import os
+import re
+import tempfile
+from dataclasses import asdict
 from uuid import uuid4
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import func, or_
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from fastapi import Request
+from fastapi import Request, Response
+from app.api.http_cache import (
+    COMPANY_CACHE_CONTROL,
+    cache_headers,
+    is_not_modified,
+    make_etag,
+    not_modified,
+)
+from app.api.pagination import Page, PageParams, page_params, paginate_async
+from app.auth.rbac_guard import require
 from app.deps import extract_user_identity
 from app.schemas.db import (
     CompanyIndustrySizeMaster,
@@ -16,12 +33,17 @@ from app.schemas.db import (
     Engagement,
     EngagementContext,
     RegulatoryMaster,
+    get_async_db,
     get_db,
+    uuid_str,
 )
 from app.schemas.company import (
     CompanyCreateRequest,
     CompanyDetail,
+    CompanyDuplicateCandidate,
+    CompanyOnboardRequest,
     CompanySearchResult,
+    CompanyTypeaheadItem,
     EngagementContextCreateRequest,
     EngagementCreateRequest,
     IndustrySizeUpsertRequest,
@@ -29,11 +51,54 @@ from app.schemas.company import (
     RegulatoryUpsertRequest,
     TaxRegistrationReplaceRequest,
 )
+from app.services.company_dedupe import (
+    DuplicateCompany,
+    check_duplicate,
+    find_candidates,
+    identifiers_of,
+    name_index,
+)
+from app.services.company_import import CompanyImportError, import_companies
+from app.services.company_read import (
+    SEARCH_SELECT,
+    company as company_table,
+    detail_stmt,
+    search_item,
+    updated_at_stmt,
+)
+from app.services.company_write import (
+    CompanyNotFound,
+    VersionConflict,
+    replace_manufacturing_sites,
+    replace_tax_registrations,
+    upsert_industry_size,
+    upsert_regulatory,
+)
+from app.services.typeahead import (
+    TYPEAHEAD_DEFAULT_K,
+    TYPEAHEAD_MAX_K,
+    load_typeahead_index,
+    typeahead_index,
+)
 
 # Router-level auth is handled by AuthMiddleware in main.py
 # All requests must have valid Authorization: Bearer <token> or X-Service-Token
 router = APIRouter()
 
+# Queries shorter than this (innodb_ft_min_token_size) can't use the FULLTEXT
+# index and fall back to a prefix LIKE on the name indexes.
+SEARCH_FULLTEXT_MIN_LEN = int(os.getenv("SEARCH_FULLTEXT_MIN_LEN", "3"))
+SEARCH_DEFAULT_LIMIT = int(os.getenv("SEARCH_DEFAULT_LIMIT", "20"))
+SEARCH_MAX_LIMIT = int(os.getenv("SEARCH_MAX_LIMIT", "100"))
+DEDUPE_DEFAULT_LIMIT = int(os.getenv("DEDUPE_DEFAULT_LIMIT", "10"))
+DEDUPE_MAX_LIMIT = int(os.getenv("DEDUPE_MAX_LIMIT", "50"))
+# /company-import: uploads above this many bytes are spooled to disk
+IMPORT_SPOOL_MEMORY = int(os.getenv("IMPORT_SPOOL_MEMORY", str(8 * 1024 * 1024)))
+# /company-import: larger request bodies are refused with 413
+IMPORT_MAX_BYTES = int(os.getenv("IMPORT_MAX_BYTES", str(200 * 1024 * 1024)))
+# rejected rows returned in the /company-import response (the rest are only counted)
+IMPORT_MAX_REJECTS = int(os.getenv("IMPORT_MAX_REJECTS", "1000"))
+
 
 def _safe_int(value: object, default: int = 1) -> int:
     try:
@@ -42,76 +107,141 @@ def _safe_int(value: object, default: int = 1) -> int:
         return default
 
 
-@router.get("/company-search", response_model=list[CompanySearchResult])
-def search_company_master(
+def _fulltext_terms(q: str) -> str | None:
+    """
+    Build a BOOLEAN MODE expression for ft_company_search: every word required,
+    prefix matched ("tata mot" -> "+tata* +mot*"). Boolean operators in user
+    input are dropped, as are words too short to be in the FULLTEXT index.
+    """
+    words = [w for w in re.split(r"[^\w]+", q) if len(w) >= SEARCH_FULLTEXT_MIN_LEN]
+    if not words:
+        return None
+    return " ".join(f"+{w}*" for w in words)
+
+
+def _like_prefix(q: str) -> str:
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escaped}%"
+
+
+@router.get("/company-search", response_model=Page[CompanySearchResult])
+async def search_company_master(
     request: Request,
     q: str | None = Query(default=None, description="Search by company name"),
-    db: Session = Depends(get_db),
+    page: PageParams = Depends(page_params(SEARCH_DEFAULT_LIMIT, SEARCH_MAX_LIMIT)),
+    db: AsyncSession = Depends(get_async_db),
 ):
     # Extract user identity (reusable helper)
     _, tenant_id = extract_user_identity(request)
-    query = (
-        db.query(CompanyMaster, RegulatoryMaster, CompanyIndustrySizeMaster)
-        .outerjoin(RegulatoryMaster, RegulatoryMaster.company_id == CompanyMaster.company_id)
-        .outerjoin(CompanyIndustrySizeMaster, CompanyIndustrySizeMaster.company_id == CompanyMaster.company_id)
-    )
+    # column projection: only what CompanySearchResult needs (app/services/company_read.py)
+    query = SEARCH_SELECT
     
     # Optional: Filter by tenant_id if available (for multi-tenant isolation)
     # Uncomment if your CompanyMaster has tenant_id column
     # if tenant_id:
-    #     query = query.filter(CompanyMaster.tenant_id == tenant_id)
+    #     query = query.where(company_table.c.tenant_id == tenant_id)
     
-    if q:
-        like = f"%{q}%"
-        query = query.filter(or_(CompanyMaster.legal_name.ilike(like), CompanyMaster.display_name.ilike(like)))
-
-    rows = query.all()
-    results: list[CompanySearchResult] = []
-    for company, regulatory, industry in rows:
-        sector_val = None
-        if industry and industry.industry_sector_id is not None:
-            sector_val = str(industry.industry_sector_id)
-        results.append(
-            CompanySearchResult(
-                company_id=company.company_id,
-                legal_name=company.legal_name,
-                country_id=company.country_id,
-                cin=regulatory.cin if regulatory else None,
-                sector=sector_val,
+    q = (q or "").strip()
+    terms = _fulltext_terms(q) if len(q) >= SEARCH_FULLTEXT_MIN_LEN else None
+    if terms:
+        # ranked MATCH ... AGAINST on FULLTEXT INDEX ft_company_search (legal_name, display_name)
+        score = match(company_table.c.legal_name, company_table.c.display_name, against=terms).in_boolean_mode()
+        query = query.add_columns(score.label("relevance")).where(score)
+        keys = [(score, True), (company_table.c.company_id, False)]
+        key_of = lambda row: (row.relevance, row.company_id)
+    else:
+        if q:
+            # very short query: index-friendly prefix match (collation is case-insensitive)
+            like = _like_prefix(q)
+            query = query.where(
+                or_(
+                    company_table.c.legal_name.like(like, escape="\\"),
+                    company_table.c.display_name.like(like, escape="\\"),
+                )
             )
-        )
-    return results
+        keys = [(company_table.c.legal_name, False), (company_table.c.company_id, False)]
+        key_of = lambda row: (row.legal_name, row.company_id)
+
+    rows, next_cursor, total = await paginate_async(db, query, keys, key_of, page)
+    return {"items": [search_item(row) for row in rows], "next_cursor": next_cursor, "total": total}
+
+
+@router.get("/company-typeahead", response_model=list[CompanyTypeaheadItem])
+async def company_typeahead(
+    request: Request,
+    q: str = Query(..., description="Prefix of a company name / display name / CIN"),
+    k: int = Query(default=TYPEAHEAD_DEFAULT_K, ge=1, le=TYPEAHEAD_MAX_K),
+):
+    # Served from the in-process index (loaded at startup), no DB round trip
+    _, _ = extract_user_identity(request)
+    if not typeahead_index.ready:
+        # startup load failed or hasn't finished - load once on demand (sync DB read, off the loop)
+        await run_in_threadpool(load_typeahead_index)
+    return typeahead_index.search(q, k)
 
 
 @router.get("/company-master", response_model=CompanyDetail)
-def get_company_master_detail(
+async def get_company_master_detail(
     request: Request,
+    response: Response,
     company_id: str = Query(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     # Extract user identity (reusable helper)
     _, tenant_id = extract_user_identity(request)
-    query = db.query(CompanyMaster).filter(CompanyMaster.company_id == company_id)
     
     # Optional: Add tenant filtering if needed
-    # if tenant_id:
-    #     query = query.filter(CompanyMaster.tenant_id == tenant_id)
+    # (add it to detail_stmt / updated_at_stmt in app/services/company_read.py)
     
-    company = query.first()
-    if not company:
+    # Conditional GET: check the client's copy against updated_at before loading the row
+    if request.headers.get("if-none-match") or request.headers.get("if-modified-since"):
+        updated_at = await db.scalar(updated_at_stmt(company_id))
+        if updated_at is not None:
+            etag = make_etag(company_id, updated_at.isoformat())
+            if is_not_modified(request, etag, updated_at):
+                return not_modified(etag, COMPANY_CACHE_CONTROL, updated_at)
+
+    row = (await db.execute(detail_stmt(company_id))).first()
+    if row is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Company not found")
-    return CompanyDetail(
-        company_id=company.company_id,
-        legal_name=company.legal_name,
-        display_name=company.display_name,
-        entity_type_id=company.entity_type_id,
-        country_id=company.country_id,
-        registered_address=company.registered_address,
-        operational_hq_address=company.operational_hq_address,
-        is_part_of_group=company.is_part_of_group,
-        parent_group_id=company.parent_group_id,
-        status=company.status,
-    )
+    detail = dict(row._mapping)
+    updated_at = detail.pop("updated_at")
+    if updated_at is not None:
+        response.headers.update(
+            cache_headers(make_etag(company_id, updated_at.isoformat()), COMPANY_CACHE_CONTROL, updated_at)
+        )
+    return detail
+
+
+def _raise_if_duplicate(db: Session, legal_name: str, identifiers: dict[str, str]) -> None:
+    # index probe on normalized_name + CIN / PAN / LEI (app/services/company_dedupe.py)
+    try:
+        check_duplicate(db, legal_name, identifiers)
+    except DuplicateCompany as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=e.message)
+
+
+@router.get("/company-duplicates", response_model=list[CompanyDuplicateCandidate])
+def find_duplicate_companies(
+    request: Request,
+    legal_name: str | None = Query(default=None),
+    cin: str | None = Query(default=None),
+    pan: str | None = Query(default=None),
+    lei: str | None = Query(default=None),
+    fuzzy: bool = Query(default=False, description="Also return similar legal names"),
+    limit: int = Query(default=DEDUPE_DEFAULT_LIMIT, ge=1, le=DEDUPE_MAX_LIMIT),
+    db: Session = Depends(get_db),
+):
+    # Possible duplicates of a company about to be created: same normalized
+    # name or any shared identifier, plus similar names with fuzzy=true
+    _, _ = extract_user_identity(request)
+    identifiers = identifiers_of({"cin": cin, "pan": pan, "lei": lei})
+    if not (legal_name or "").strip() and not identifiers:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Give legal_name and/or cin, pan, lei",
+        )
+    return [asdict(c) for c in find_candidates(db, legal_name, identifiers, fuzzy, limit)]
 
 
 @router.post("/company-create")
@@ -130,19 +260,7 @@ def create_company_master(
         )
     
     created_by = actor_user_id
-    if payload.cin:
-        duplicate = (
-            db.query(CompanyMaster.company_id)
-            .join(RegulatoryMaster, RegulatoryMaster.company_id == CompanyMaster.company_id)
-            .filter(func.lower(CompanyMaster.legal_name) == func.lower(payload.legal_name))
-            .filter(RegulatoryMaster.cin == payload.cin)
-            .first()
-        )
-        if duplicate:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="Company with same legal name and CIN already exists",
-            )
+    _raise_if_duplicate(db, payload.legal_name, identifiers_of({"cin": payload.cin}))
 
     created_by = str(actor_user_id)
     company = CompanyMaster(
@@ -159,9 +277,129 @@ def create_company_master(
     db.add(company)
     db.commit()
     db.refresh(company)
+    typeahead_index.upsert(company.company_id, company.legal_name, company.display_name)
+    name_index.upsert(company.company_id, company.legal_name)
     return {"message": "Company created", "company_id": company.company_id}
 
 
+@router.post("/company-onboard")
+def onboard_company(
+    payload: CompanyOnboardRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+):
+    # Company + regulatory + industry/size + tax + plants + engagement in one
+    # transaction: one request / auth check instead of six, all-or-nothing
+    actor_user_id, tenant_id = extract_user_identity(request)
+    if not actor_user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User authentication required",
+        )
+
+    # company.cin is only checked (as in /company-create); it is stored via `regulatory`
+    if payload.regulatory:
+        identifiers = identifiers_of(payload.regulatory.model_dump())
+    else:
+        identifiers = identifiers_of({"cin": payload.company.cin})
+    _raise_if_duplicate(db, payload.company.legal_name, identifiers)
+
+    company = CompanyMaster(
+        company_id=uuid_str(),
+        created_by=str(actor_user_id),
+        **payload.company.model_dump(exclude={"cin"}),
+    )
+    company_id = company.company_id
+    regulatory = (
+        RegulatoryMaster(company_id=company_id, **payload.regulatory.model_dump()) if payload.regulatory else None
+    )
+    industry_size = (
+        CompanyIndustrySizeMaster(company_id=company_id, **payload.industry_size.model_dump())
+        if payload.industry_size
+        else None
+    )
+    tax_registrations = [
+        CompanyTaxRegistration(company_id=company_id, **item.model_dump()) for item in payload.tax_registrations
+    ]
+    plants = [CompanyManufacturingList(company_id=company_id, **item.model_dump()) for item in payload.manufacturing]
+    engagement = Engagement(company_id=company_id, **payload.engagement.model_dump()) if payload.engagement else None
+
+    # the unit of work batches each table's rows into one multi-row INSERT (ids are client-side UUIDs)
+    db.add_all([company, *filter(None, [regulatory, industry_size, engagement]), *tax_registrations, *plants])
+    db.flush()
+    # read the generated ids before commit expires the objects
+    result = {
+        "message": "Company onboarded",
+        "company_id": company_id,
+        "registration_id": regulatory.registration_id if regulatory else None,
+        "industry_size_id": industry_size.industry_size_id if industry_size else None,
+        "tax_reg_ids": [t.tax_reg_id for t in tax_registrations],
+        "manufacturing_ids": [p.manufacturing_id for p in plants],
+        "engagement_id": engagement.engagement_id if engagement else None,
+    }
+    db.commit()
+
+    # index only the stored CIN, so the next reload shows the same row
+    cin = payload.regulatory.cin if payload.regulatory else None
+    typeahead_index.upsert(company_id, payload.company.legal_name, payload.company.display_name, cin)
+    name_index.upsert(company_id, payload.company.legal_name)
+    return result
+
+
+@router.post(
+    "/company-import",
+    dependencies=[Depends(require("company.import", required_roles=["ADMIN"]))],
+)
+async def import_company_master(
+    request: Request,
+    fmt: str = Query(..., alias="format", pattern="^(csv|ndjson)$"),
+):
+    # Bulk create from a CSV / NDJSON request body (see app/services/company_import.py)
+    actor_user_id, _ = extract_user_identity(request)
+    if not actor_user_id:
+        # service-token callers have no user to record as created_by
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User authentication required",
+        )
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Import body larger than {IMPORT_MAX_BYTES} bytes",
+    )
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > IMPORT_MAX_BYTES:
+        raise too_large
+
+    spool = tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_MEMORY)
+    rejects: list[dict] = []
+
+    def reject(line, raw, error):
+        if len(rejects) < IMPORT_MAX_REJECTS:
+            rejects.append({"line": line, "error": error, "record": raw})
+
+    try:
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > IMPORT_MAX_BYTES:  # chunked upload without a Content-Length
+                raise too_large
+            spool.write(chunk)
+        spool.seek(0)
+        text = io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+        stats = await run_in_threadpool(import_companies, text, fmt, str(actor_user_id), reject)
+    except CompanyImportError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    finally:
+        spool.close()
+
+    return {
+        "message": "Company import finished",
+        **asdict(stats),
+        "rejects": rejects,
+        "rejects_truncated": stats.rejected > len(rejects),
+    }
+
+
 @router.post("/regulatory-upsert")
 def upsert_regulatory_master(
     payload: RegulatoryUpsertRequest,
@@ -170,46 +408,22 @@ def upsert_regulatory_master(
 ):
     # Extract user identity (reusable helper)
     actor_user_id, _ = extract_user_identity(request)
-    company = db.query(CompanyMaster).filter(CompanyMaster.company_id == payload.company_id).first()
-    if not company:
+    # one INSERT ... SELECT ... ON DUPLICATE KEY UPDATE: company check, duplicate CIN / PAN / LEI check and upsert
+    values = payload.model_dump(exclude={"company_id", "expected_version"})
+    try:
+        outcome = upsert_regulatory(db, payload.company_id, values, payload.expected_version)
+    except CompanyNotFound:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Company not found")
-
-    if payload.cin:
-        duplicate = (
-            db.query(RegulatoryMaster.company_id)
-            .join(CompanyMaster, CompanyMaster.company_id == RegulatoryMaster.company_id)
-            .filter(func.lower(CompanyMaster.legal_name) == func.lower(company.legal_name))
-            .filter(RegulatoryMaster.cin == payload.cin)
-            .filter(RegulatoryMaster.company_id != payload.company_id)
-            .first()
-        )
-        if duplicate:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="Company with same legal name and CIN already exists",
-            )
-
-    record = db.query(RegulatoryMaster).filter(RegulatoryMaster.company_id == payload.company_id).first()
-    if record:
-        record.cin = payload.cin
-        record.pan = payload.pan
-        record.lei = payload.lei
-        record.listed_status = payload.listed_status
-        record.exchange_list = payload.exchange_list
-        record.ticker_symbol = payload.ticker_symbol
-    else:
-        record = RegulatoryMaster(
-            company_id=payload.company_id,
-            cin=payload.cin,
-            pan=payload.pan,
-            lei=payload.lei,
-            listed_status=payload.listed_status,
-            exchange_list=payload.exchange_list,
-            ticker_symbol=payload.ticker_symbol,
+    except DuplicateCompany as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=e.message)
+    except VersionConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": "Regulatory data was changed by someone else", "current_version": e.current_version},
         )
-        db.add(record)
     db.commit()
-    return {"message": "Regulatory data upserted", "company_id": payload.company_id}
+    typeahead_index.set_cin(payload.company_id, payload.cin)
+    return {"message": "Regulatory data upserted", "company_id": payload.company_id, "version": outcome.version}
 
 
 @router.post("/industry-size-upsert")
@@ -220,37 +434,18 @@ def upsert_industry_size_profile(
 ):
     # Extract user identity (reusable helper)
     actor_user_id, _ = extract_user_identity(request)
-    record = (
-        db.query(CompanyIndustrySizeMaster)
-        .filter(CompanyIndustrySizeMaster.company_id == payload.company_id)
-        .first()
-    )
-    if record:
-        record.industry_sector_id = payload.industry_sector_id
-        record.sub_industry_id = payload.sub_industry_id
-        record.industry_code_id = payload.industry_code_id
-        record.annual_turnover_id = payload.annual_turnover_id
-        record.employee_band_id = payload.employee_band_id
-        record.manufacturing_plants_count = payload.manufacturing_plants_count
-        record.sez_eou_presence = payload.sez_eou_presence
-        record.revenue_indicator_id = payload.revenue_indicator_id
-        record.spend_indicator_id = payload.spend_indicator_id
-    else:
-        record = CompanyIndustrySizeMaster(
-            company_id=payload.company_id,
-            industry_sector_id=payload.industry_sector_id,
-            sub_industry_id=payload.sub_industry_id,
-            industry_code_id=payload.industry_code_id,
-            annual_turnover_id=payload.annual_turnover_id,
-            employee_band_id=payload.employee_band_id,
-            manufacturing_plants_count=payload.manufacturing_plants_count,
-            sez_eou_presence=payload.sez_eou_presence,
-            revenue_indicator_id=payload.revenue_indicator_id,
-            spend_indicator_id=payload.spend_indicator_id,
+    values = payload.model_dump(exclude={"company_id", "expected_version"})
+    try:
+        outcome = upsert_industry_size(db, payload.company_id, values, payload.expected_version)
+    except CompanyNotFound:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Company not found")
+    except VersionConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": "Industry/size profile was changed by someone else", "current_version": e.current_version},
         )
-        db.add(record)
     db.commit()
-    return {"message": "Industry/size profile upserted", "company_id": payload.company_id}
+    return {"message": "Industry/size profile upserted", "company_id": payload.company_id, "version": outcome.version}
 
 
 @router.post("/tax-registration-replace")
@@ -261,18 +456,15 @@ def replace_tax_registrations_for_company(
 ):
     # Extract user identity (reusable helper)
     actor_user_id, _ = extract_user_identity(request)
-    db.query(CompanyTaxRegistration).filter(CompanyTaxRegistration.company_id == payload.company_id).delete()
-    for item in payload.items:
-        db.add(
-            CompanyTaxRegistration(
-                company_id=payload.company_id,
-                tax_type=item.tax_type,
-                tax_id=item.tax_id,
-                country_id=item.country_id,
-            )
-        )
+    # diff against the stored rows: only changed registrations are written
+    summary = replace_tax_registrations(db, payload.company_id, [item.model_dump() for item in payload.items])
     db.commit()
-    return {"message": "Tax registrations replaced", "company_id": payload.company_id, "count": len(payload.items)}
+    return {
+        "message": "Tax registrations replaced",
+        "company_id": payload.company_id,
+        "count": len(payload.items),
+        "changes": asdict(summary),
+    }
 
 
 @router.post("/manufacturing-replace")
@@ -283,19 +475,14 @@ def replace_manufacturing_for_company(
 ):
     # Extract user identity (reusable helper)
     actor_user_id, _ = extract_user_identity(request)
-    db.query(CompanyManufacturingList).filter(CompanyManufacturingList.company_id == payload.company_id).delete()
-    for item in payload.items:
-        db.add(
-            CompanyManufacturingList(
-                company_id=payload.company_id,
-                plant_name=item.plant_name,
-                city=item.city,
-                state=item.state,
-                country_id=item.country_id,
-            )
-        )
+    summary = replace_manufacturing_sites(db, payload.company_id, [item.model_dump() for item in payload.items])
     db.commit()
-    return {"message": "Manufacturing list replaced", "company_id": payload.company_id, "count": len(payload.items)}
+    return {
+        "message": "Manufacturing list replaced",
+        "company_id": payload.company_id,
+        "count": len(payload.items),
+        "changes": asdict(summary),
+    }
 
 
 @router.post("/engagement-create")
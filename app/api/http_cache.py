@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+# Conditional GET helpers (ETag / If-None-Match, Last-Modified / If-Modified-Since).
+#
+# Handlers compute the validator from something cheap (a cache version, an
+# updated_at column) and call is_not_modified() before building the body,
+# so a repeat read is answered with an empty 304.
+
+# Master lists change rarely: let the browser reuse them briefly, then revalidate
+MASTER_CACHE_CONTROL = os.getenv("MASTER_CACHE_CONTROL", "private, max-age=60, must-revalidate")
+# Company detail is edited on Screen 1: always revalidate (cheap 304 when unchanged)
+COMPANY_CACHE_CONTROL = os.getenv("COMPANY_CACHE_CONTROL", "private, no-cache")
+
+
+def make_etag(*parts: object) -> str:
+    """Weak ETag over the given parts (weak: gzip / identity bodies share it)."""
+    digest = hashlib.sha256("|".join(str(p) for p in parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def http_date(value: datetime) -> str:
+    # DB DATETIME columns are naive; they are stored in UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # weak comparison: W/"x" matches "x"
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime | None = None) -> bool:
+    """
+    True if the client's copy is current. If-None-Match wins over
+    If-Modified-Since when both are sent (RFC 9110 13.2.2).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        # "-0000" zone parses naive (RFC 5322: UTC, origin unknown)
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        # HTTP dates have 1s resolution
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def cache_headers(etag: str, cache_control: str, last_modified: datetime | None = None) -> dict:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def not_modified(etag: str, cache_control: str, last_modified: datetime | None = None) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag, cache_control, last_modified))
@@ -1,150 +1,231 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, Query, Request
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+import os
 
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+
+from app.api.http_cache import MASTER_CACHE_CONTROL, cache_headers, is_not_modified, make_etag, not_modified
+from app.api.pagination import PageParams, page_params, paginate_items
+from app.auth.rbac_guard import require
 from app.deps import extract_user_identity
-from app.schemas.db import (
-    AnnualTurnoverMaster,
-    BusinessModelMaster,
-    CountryMaster,
-    EmployeeMaster,
-    EntityTypeMaster,
-    GroupMaster,
-    IndustryCodeMaster,
-    IndustryMaster,
-    NatureOfOperationMaster,
-    SubIndustryMaster,
-    TransactionIndicator,
-    get_db,
-)
+from app.services.master_bundle import master_bundle
+from app.services.master_cache import MasterCacheError, master_cache
 
 # Router-level auth is handled by AuthMiddleware in main.py
 # All requests must have valid Authorization: Bearer <token> or X-Service-Token
 router = APIRouter()
 
+# Master lists are small and usually loaded whole into a dropdown, so the
+# default page is large; big code lists (NIC/NAICS) page with cursor.
+MASTER_PAGE_DEFAULT_LIMIT = int(os.getenv("MASTER_PAGE_DEFAULT_LIMIT", "500"))
+MASTER_PAGE_MAX_LIMIT = int(os.getenv("MASTER_PAGE_MAX_LIMIT", "1000"))
+
+master_page = page_params(MASTER_PAGE_DEFAULT_LIMIT, MASTER_PAGE_MAX_LIMIT)
+
+
+async def _serve(name: str, request: Request, response: Response, page: PageParams, predicate=None):
+    """
+    Page of a cached master table (app/services/master_cache.py).
+    A cache hit is served on the event loop; only a (re)load goes to the
+    threadpool for its DB read. A matching If-None-Match is answered with
+    304 before the page is built.
+    """
+    try:
+        entry = master_cache.peek(name) or await run_in_threadpool(master_cache.get, name)
+    except MasterCacheError as e:
+        print(f"[Masters] {e}")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Master data unavailable")
+
+    # same table version + same page/filter params => same body
+    etag = make_etag(name, entry.version, request.url.query)
+    if is_not_modified(request, etag):
+        return not_modified(etag, MASTER_CACHE_CONTROL)
+
+    items = entry.items if predicate is None else [i for i in entry.items if predicate(i)]
+    rows, next_cursor, total = paginate_items(items, master_cache.masters[name].key, page)
+    response.headers.update(cache_headers(etag, MASTER_CACHE_CONTROL))
+    response.headers["X-Master-Version"] = entry.version
+    return {"items": rows, "next_cursor": next_cursor, "total": total}
+
 
 @router.get("/entity-types")
-def get_entity_types(request: Request, db: Session = Depends(get_db)):
+async def get_entity_types(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(master_page),
+):
     # Extract user identity (for audit trail - optional for read-only endpoints)
     _, _ = extract_user_identity(request)
-    rows = db.query(EntityTypeMaster).order_by(EntityTypeMaster.entity_type_id).all()
-    return [{"id": r.entity_type_id, "name": r.name} for r in rows]
+    return await _serve("entity-types", request, response, page)
 
 
 @router.get("/groups")
-def get_groups(request: Request, db: Session = Depends(get_db)):
+async def get_groups(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(master_page),
+):
     # Extract user identity (for audit trail - optional for read-only endpoints)
     _, _ = extract_user_identity(request)
-    rows = db.query(GroupMaster).order_by(GroupMaster.group_id).all()
-    return [{"id": r.group_id, "name": r.name} for r in rows]
+    return await _serve("groups", request, response, page)
 
 
 @router.get("/industries")
-def get_industries(request: Request, db: Session = Depends(get_db)):
+async def get_industries(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(master_page),
+):
     # Extract user identity (for audit trail - optional for read-only endpoints)
     _, _ = extract_user_identity(request)
-    rows = db.query(IndustryMaster).order_by(IndustryMaster.industry_id).all()
-    return [{"id": r.industry_id, "name": r.name} for r in rows]
+    return await _serve("industries", request, response, page)
 
 
 @router.get("/sub-industries")
-def get_sub_industries(
+async def get_sub_industries(
     request: Request,
-    sector_id: int | None = Query(default=None),
-    db: Session = Depends(get_db),
+    response: Response,
+    sector_id: str | None = Query(default=None),
+    page: PageParams = Depends(master_page),
 ):
     # Extract user identity (for audit trail - optional for read-only endpoints)
     _, _ = extract_user_identity(request)
-    query = db.query(SubIndustryMaster)
-    if sector_id:
-        query = query.filter(SubIndustryMaster.industry_id == sector_id)
-    rows = query.order_by(SubIndustryMaster.sub_industry_id).all()
-    return [{"id": r.sub_industry_id, "sector_id": r.industry_id, "name": r.sub_industry_name} for r in rows]
+    predicate = (lambda i: i["sector_id"] == sector_id) if sector_id else None
+    return await _serve("sub-industries", request, response, page, predicate)
 
 
 @router.get("/industry-codes")
-def get_industry_codes(
+async def get_industry_codes(
     request: Request,
+    response: Response,
     code_type: str | None = Query(default=None),
-    db: Session = Depends(get_db),
+    page: PageParams = Depends(master_page),
 ):
     # Extract user identity (for audit trail - optional for read-only endpoints)
     _, _ = extract_user_identity(request)
-    query = db.query(IndustryCodeMaster)
-    if code_type:
-        query = query.filter(IndustryCodeMaster.code_type == code_type)
-    rows = query.order_by(IndustryCodeMaster.industry_code_id).all()
-    return [
-        {"id": r.industry_code_id, "code_type": r.code_type, "description": r.code_description}
-        for r in rows
-    ]
+    predicate = (lambda i: i["code_type"] == code_type) if code_type else None
+    return await _serve("industry-codes", request, response, page, predicate)
 
 
 @router.get("/nature-operations")
-def get_nature_of_operations(request: Request, db: Session = Depends(get_db)):
+async def get_nature_of_operations(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(master_page),
+):
     # Extract user identity (for audit trail - optional for read-only endpoints)
     _, _ = extract_user_identity(request)
-    rows = db.query(NatureOfOperationMaster).order_by(NatureOfOperationMaster.nature_of_operation_id).all()
-    return [{"id": r.nature_of_operation_id, "name": r.name} for r in rows]
+    return await _serve("nature-operations", request, response, page)
 
 
 @router.get("/business-models")
-def get_business_models(request: Request, db: Session = Depends(get_db)):
+async def get_business_models(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(master_page),
+):
     # Extract user identity (for audit trail - optional for read-only endpoints)
     _, _ = extract_user_identity(request)
-    rows = db.query(BusinessModelMaster).order_by(BusinessModelMaster.business_model_id).all()
-    return [{"id": r.business_model_id, "name": r.name} for r in rows]
+    return await _serve("business-models", request, response, page)
 
 
 @router.get("/annual-turnovers")
-def get_annual_turnovers(request: Request, db: Session = Depends(get_db)):
+async def get_annual_turnovers(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(master_page),
+):
     # Extract user identity (for audit trail - optional for read-only endpoints)
     _, _ = extract_user_identity(request)
-    rows = db.query(AnnualTurnoverMaster).order_by(AnnualTurnoverMaster.annual_turnover_id).all()
-    return [{"id": r.annual_turnover_id, "label": r.band_label} for r in rows]
+    return await _serve("annual-turnovers", request, response, page)
 
 
 @router.get("/employees")
-def get_employee_bands(request: Request, db: Session = Depends(get_db)):
+async def get_employee_bands(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(master_page),
+):
     # Extract user identity (for audit trail - optional for read-only endpoints)
     _, _ = extract_user_identity(request)
-    rows = db.query(EmployeeMaster).order_by(EmployeeMaster.employee_band_id).all()
-    return [{"id": r.employee_band_id, "label": r.band_label} for r in rows]
+    return await _serve("employees", request, response, page)
 
 
 @router.get("/transaction-indicators")
-def get_transaction_indicators(request: Request, db: Session = Depends(get_db)):
+async def get_transaction_indicators(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(master_page),
+):
     # Extract user identity (for audit trail - optional for read-only endpoints)
     _, _ = extract_user_identity(request)
-    rows = db.query(TransactionIndicator).order_by(TransactionIndicator.indicator_id).all()
-    return [{"id": r.indicator_id, "type": r.indicator_type, "label": r.indicator_label} for r in rows]
+    return await _serve("transaction-indicators", request, response, page)
 
 
 @router.get("/countries")
-def get_countries(request: Request, db: Session = Depends(get_db)):
+async def get_countries(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(master_page),
+):
     # Extract user identity (for audit trail - optional for read-only endpoints)
     _, _ = extract_user_identity(request)
-    now = func.now()
-    rows = (
-        db.query(CountryMaster)
-        .filter(
-            CountryMaster.active.is_(True),
-            CountryMaster.is_active.is_(True),
-            CountryMaster.st_dt <= now,
-            CountryMaster.e_dt > now,
-        )
-        .order_by(CountryMaster.country_name)
-        .all()
-    )
-    return [
-        {
-            "id": r.country_id,
-            "name": r.country_name,
-            "code": r.country_code,
-            "currency_code": r.currency_code,
-            "currency_name": r.currency_name,
-        }
-        for r in rows
-    ]
+    return await _serve("countries", request, response, page)
+
+
+@router.get("/masters/bundle")
+def get_master_bundle(
+    request: Request,
+    include: str | None = Query(
+        default=None, description="Comma-separated masters, e.g. entity-types,countries; all if omitted"
+    ),
+):
+    # All Screen 1 masters in one pre-serialized, pre-compressed response
+    _, _ = extract_user_identity(request)
+    wanted = {n.strip() for n in (include or "").split(",") if n.strip()}
+    unknown = sorted(wanted - set(master_cache.masters))
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown masters: {unknown}")
+    # canonical order, so "a,b" and "b,a" share one pre-built body
+    names = [n for n in master_cache.masters if not wanted or n in wanted]
+
+    try:
+        version = master_bundle.version(names)
+        etag = make_etag("bundle", version)
+        if is_not_modified(request, etag):
+            return not_modified(etag, MASTER_CACHE_CONTROL)
+        body = master_bundle.get(names)
+    except MasterCacheError as e:
+        print(f"[Masters] {e}")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Master data unavailable")
+
+    content, encoding = body.encoded(request.headers.get("accept-encoding", ""))
+    headers = {
+        "Vary": "Accept-Encoding",
+        "X-Master-Version": body.version,
+        **cache_headers(make_etag("bundle", body.version), MASTER_CACHE_CONTROL),
+    }
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+@router.post(
+    "/masters/cache/invalidate",
+    dependencies=[Depends(require("masters.cache.invalidate", required_roles=["ADMIN"]))],
+)
+def invalidate_master_cache(
+    request: Request,
+    names: list[str] | None = Query(default=None, description="Masters to drop, e.g. names=countries; all if omitted"),
+):
+    # Drop cached master tables after a direct DB change and reload them right away
+    actor_user_id, _ = extract_user_identity(request)
+    unknown = [n for n in names or [] if n not in master_cache.masters]
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown masters: {unknown}")
+
+    dropped = master_cache.invalidate(names)
+    versions = master_cache.warm(dropped)
+    print(f"[Masters] cache invalidated by {actor_user_id}: {dropped}")
+    return {"message": "Master cache invalidated", "versions": versions}
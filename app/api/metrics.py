@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from fastapi import APIRouter
+
+from app.auth.itmtb_auth_sdk import get_shared_async_auth_client
+from app.auth.rbac_guard import rbac_cache_stats
+from app.middleware.compression import compression_stats
+from app.schemas.db import db_pool_stats
+from app.services.company_dedupe import name_index
+from app.services.master_bundle import master_bundle
+from app.services.master_cache import master_cache
+from app.services.typeahead import typeahead_index
+
+# Router-level auth is handled by AuthMiddleware in main.py
+# All requests must have valid Authorization: Bearer <token> or X-Service-Token
+router = APIRouter()
+
+
+@router.get("/internal/metrics")
+def get_internal_metrics():
+    # In-process counters for this worker (caches, pools, outbound calls)
+    return {
+        "auth": get_shared_async_auth_client().get_metrics(),
+        "rbac_cache": rbac_cache_stats(),
+        "typeahead": typeahead_index.stats(),
+        "dedupe_name_index": name_index.stats(),
+        "master_cache": master_cache.stats(),
+        "master_bundle": master_bundle.stats(),
+        "compression": compression_stats.snapshot(),
+        "db_pool": db_pool_stats(),
+    }
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import base64
+import json
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, Sequence, TypeVar
+
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel
+from sqlalchemy import Select, and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Keyset (cursor) pagination shared by /company-search and the master lists.
+#
+# A page is ordered by a stable sort key that ends in the primary key, e.g.
+# (legal_name, company_id). The cursor is the sort key of the last row
+# served, so the next page is "WHERE key > cursor ORDER BY key LIMIT n"
+# and costs the same no matter how deep the client pages.
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: list[T]
+    next_cursor: str | None = None
+    total: int | None = None
+
+
+@dataclass
+class PageParams:
+    limit: int
+    cursor: str | None
+    include_total: bool
+
+
+def page_params(default_limit: int, max_limit: int) -> Callable[..., PageParams]:
+    """Build a FastAPI dependency for limit / cursor / include_total."""
+
+    # async so it runs on the event loop (a sync dependency costs a threadpool hop)
+    async def dependency(
+        limit: int = Query(default=default_limit, ge=1, le=max_limit),
+        cursor: str | None = Query(default=None, description="next_cursor from the previous page"),
+        include_total: bool = Query(default=False, description="Also return the total match count"),
+    ) -> PageParams:
+        return PageParams(limit=limit, cursor=cursor, include_total=include_total)
+
+    return dependency
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return values
+
+
+def _after(keys: Sequence[tuple[Any, bool]], values: Sequence[Any]):
+    """
+    Row-value "greater than" for a mixed ASC/DESC key:
+    (a, b) after (x, y)  <=>  a > x OR (a = x AND b > y)   (with < for DESC parts)
+    """
+    clauses = []
+    for i, (column, descending) in enumerate(keys):
+        equal = [keys[j][0] == values[j] for j in range(i)]
+        step = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*equal, step))
+    return or_(*clauses)
+
+
+async def paginate_async(
+    db: AsyncSession,
+    stmt: Select,
+    keys: Sequence[tuple[Any, bool]],
+    key_of: Callable[[Any], Sequence[Any]],
+    params: PageParams,
+) -> tuple[list[Any], str | None, int | None]:
+    """
+    Apply keyset pagination to `stmt` and run it on `db`.
+
+    keys:   [(column_or_expression, descending), ...], last one must be unique
+    key_of: row -> sort key values, used to build next_cursor
+
+    Returns (rows, next_cursor, total). total is only counted when asked for.
+    """
+    total = None
+    if params.include_total:
+        total = await db.scalar(select(func.count()).select_from(stmt.order_by(None).subquery()))
+
+    if params.cursor:
+        stmt = stmt.where(_after(keys, decode_cursor(params.cursor, len(keys))))
+    stmt = stmt.order_by(*_order_by(keys))
+
+    # one extra row tells us whether there is a next page
+    rows = (await db.execute(stmt.limit(params.limit + 1))).all()
+    return (*_page(rows, key_of, params), total)
+
+
+def _order_by(keys: Sequence[tuple[Any, bool]]) -> list[Any]:
+    return [column.desc() if descending else column.asc() for column, descending in keys]
+
+
+def _page(rows: list[Any], key_of: Callable[[Any], Sequence[Any]], params: PageParams) -> tuple[list[Any], str | None]:
+    # rows holds up to limit + 1; the extra one only means "there is a next page"
+    next_cursor = None
+    if len(rows) > params.limit:
+        rows = rows[: params.limit]
+        next_cursor = encode_cursor(key_of(rows[-1]))
+    return rows, next_cursor
+
+
+def paginate_items(
+    items: Sequence[Any],
+    key_of: Callable[[Any], Sequence[Any]],
+    params: PageParams,
+) -> tuple[list[Any], str | None, int | None]:
+    """
+    Keyset pagination of an in-memory list already sorted by key_of (e.g. a
+    cached master table). The cursor is the key of the last item served, so
+    it has the same format as paginate_async() cursors.
+
+    Returns (items, next_cursor, total). total is only filled when asked for.
+    """
+    start = 0
+    if params.cursor and items:
+        last = tuple(decode_cursor(params.cursor, len(key_of(items[0]))))
+        try:
+            start = bisect_right(items, last, key=lambda item: tuple(key_of(item)))
+        except TypeError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    page = list(items[start:start + params.limit])
+    next_cursor = None
+    if start + params.limit < len(items):
+        next_cursor = encode_cursor(key_of(page[-1]))
+    return page, next_cursor, len(items) if params.include_total else None
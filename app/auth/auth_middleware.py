@@ -1,18 +1,30 @@
 # auth_middleware.py
 
-from fastapi import Request, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+import os
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 from dotenv import load_dotenv
 load_dotenv()
 
 from app.auth.itmtb_auth_sdk import (
-    AuthClient,
     AuthUnauthorizedError,
     AuthServiceError,
+    get_shared_async_auth_client,
+)
+
+# Paths served without any identity (health check + API docs)
+AUTH_PUBLIC_PATHS = frozenset(
+    p.strip()
+    for p in os.getenv(
+        "AUTH_PUBLIC_PATHS", "/,/docs,/docs/oauth2-redirect,/redoc,/openapi.json"
+    ).split(",")
+    if p.strip()
 )
 
-class AuthMiddleware(BaseHTTPMiddleware):
+
+class AuthMiddleware:
     """
     ITMTB Global Authentication Middleware for Microservices
 
@@ -24,57 +36,83 @@ class AuthMiddleware(BaseHTTPMiddleware):
          request.state.service_identity
          request.state.user_identity
     4. Enforce: at least one identity MUST be present.
-       (No anonymous access allowed.)
+       (No anonymous access allowed, except AUTH_PUBLIC_PATHS.)
+
+    Implemented as a plain ASGI middleware (no BaseHTTPMiddleware), so there is
+    no extra task / memory-stream hop per request and streaming responses and
+    background tasks pass through untouched. Failures are answered directly
+    with a JSON body: {"detail": "..."} and 401 / 503.
     """
 
-    def __init__(self, app):
-        super().__init__(app)
-        self.auth_client = AuthClient()  # single instance, uses JWKS cache
+    def __init__(self, app: ASGIApp, public_paths=None):
+        self.app = app
+        self.public_paths = frozenset(public_paths) if public_paths is not None else AUTH_PUBLIC_PATHS
 
-    async def dispatch(self, request: Request, call_next):
+    @property
+    def auth_client(self):
+        # process-wide async client: pooled keep-alive HTTP, JWKS + identity cache.
+        # Looked up per request: shutdown closes it and the next lifespan recreates it.
+        return get_shared_async_auth_client()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Main entry point for every incoming request.
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # request.state is backed by scope["state"]
+        state = scope.setdefault("state", {})
+        state["user_identity"] = None
+        state["service_identity"] = None
 
-        # allow unauthenticated health + docs endpoints - for checking headers
-        # to be disabled
-        #if request.url.path in ("/me", "/docs", "/openapi.json"):
-        #    return await call_next(request)
+        if scope["path"] in self.public_paths:
+            await self.app(scope, receive, send)
+            return
 
-        request.state.user_identity = None
-        request.state.service_identity = None
+        headers = Headers(scope=scope)
 
         # -------------------------------
         # 1. Internal service auth (JWKS local verify)
         # -------------------------------
-        svc_token = request.headers.get("X-Service-Token")
+        svc_token = headers.get("X-Service-Token")
         if svc_token:
             try:
-                service_identity = self.auth_client.verify_service_token(svc_token)
-                request.state.service_identity = service_identity
+                state["service_identity"] = await self.auth_client.verify_service_token(svc_token)
             except AuthUnauthorizedError:
-                raise HTTPException(status_code=401, detail="Invalid service token")
+                await _error(401, "Invalid service token")(scope, receive, send)
+                return
             except AuthServiceError:
-                raise HTTPException(status_code=503, detail="Auth system error")
+                await _error(503, "Auth system error")(scope, receive, send)
+                return
 
         # -------------------------------
         # 2. End-user JWT verification (via Auth MS)
         # -------------------------------
-        auth_header = request.headers.get("Authorization")
+        auth_header = headers.get("Authorization")
         if auth_header and auth_header.startswith("Bearer "):
             user_token = auth_header.split(" ", 1)[1]
             try:
-                user_identity = self.auth_client.verify_user_token(user_token)
-                request.state.user_identity = user_identity
+                state["user_identity"] = await self.auth_client.verify_user_token(user_token)
             except AuthUnauthorizedError:
-                raise HTTPException(status_code=401, detail="Invalid user token")
+                await _error(401, "Invalid user token")(scope, receive, send)
+                return
             except AuthServiceError:
-                raise HTTPException(status_code=503, detail="Auth system error")
+                await _error(503, "Auth system error")(scope, receive, send)
+                return
 
         # -------------------------------
         # 3. Enforce at least one identity
         # -------------------------------
-        if not request.state.user_identity and not request.state.service_identity:
-            raise HTTPException(status_code=401, detail="Missing authentication")
+        if not state["user_identity"] and not state["service_identity"]:
+            await _error(401, "Missing authentication")(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
 
-        return await call_next(request)
+def _error(status_code: int, detail: str) -> JSONResponse:
+    # Same body shape FastAPI uses for HTTPException
+    headers = {"WWW-Authenticate": "Bearer"} if status_code == 401 else None
+    return JSONResponse({"detail": detail}, status_code=status_code, headers=headers)
@@ -8,17 +8,26 @@ Responsibilities:
 - Verify user JWT via Auth MS.
 - Verify service token via Auth MS (for inbound middleware).
 - Provide helpers for cross-service calls with correct headers.
+- AsyncAuthClient: non-blocking variant for use on the event loop.
 """
 
+import asyncio
+import hashlib
 import os
+import threading
 import time
-from typing import Optional, Dict, Any
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Callable, Hashable
 
+import httpx
 import requests
 import jwt
 import json
 import time
-from jwt import PyJWKClient, InvalidTokenError
+from jwt import PyJWK, PyJWKSet, InvalidTokenError
+
+from app.auth.service_http import ServiceCallError, ServiceHTTPLayer, ServiceUnavailableError
 
 
 JWKS_URL = os.getenv("SERVICE_JWKS_URL", "http://localhost:6501/auth/.well-known/jwks.json")
@@ -31,9 +40,37 @@ print("[AuthSDK ENV SERVICE_ID]", os.getenv("SERVICE_ID"))
 print("[AuthSDK ENV SERVICE_SECRET SET]", bool(os.getenv("SERVICE_SECRET")))
 
 
-_jwks_cache = None
-_jwks_last_fetched = 0
-JWKS_CACHE_TTL = 300  # 5 minutes
+# JWKS keys are refreshed in the background every JWKS_CACHE_TTL seconds.
+# An unknown `kid` triggers an immediate fetch, at most once per JWKS_MIN_FETCH_INTERVAL.
+JWKS_CACHE_TTL = int(os.getenv("JWKS_CACHE_TTL", "300"))
+JWKS_MIN_FETCH_INTERVAL = int(os.getenv("JWKS_MIN_FETCH_INTERVAL", "10"))
+
+# Verified user identities are cached in-process, keyed by a hash of the token.
+# Entries live until the earlier of the JWT `exp` claim and this TTL.
+USER_IDENTITY_CACHE_TTL = int(os.getenv("USER_IDENTITY_CACHE_TTL", "60"))
+USER_IDENTITY_CACHE_MAX_ENTRIES = int(os.getenv("USER_IDENTITY_CACHE_MAX_ENTRIES", "10000"))
+# Rejected tokens are remembered briefly so a bad token can't hammer Auth MS.
+USER_IDENTITY_NEGATIVE_TTL = int(os.getenv("USER_IDENTITY_NEGATIVE_TTL", "5"))
+
+# How user JWTs are verified:
+#   "remote" - every cache miss calls Auth MS /verify (default)
+#   "local"  - RS256 signature, issuer, audience and expiry are checked against
+#              the Auth MS JWKS; Auth MS is only asked about revocation, in the
+#              background, at most once per USER_TOKEN_REVOCATION_CHECK_INTERVAL.
+USER_TOKEN_VERIFY_MODE = os.getenv("USER_TOKEN_VERIFY_MODE", "remote").lower()
+USER_JWT_ISSUER = os.getenv("USER_JWT_ISSUER", SERVICE_JWT_ISSUER)
+USER_JWT_AUDIENCE = os.getenv("USER_JWT_AUDIENCE", "")
+USER_TOKEN_REVOCATION_CHECK_INTERVAL = int(os.getenv("USER_TOKEN_REVOCATION_CHECK_INTERVAL", "300"))
+
+# Service tokens are refreshed in the background once this fraction of their
+# lifetime (from the JWT iat/exp claims) has elapsed.
+SERVICE_TOKEN_REFRESH_FRACTION = float(os.getenv("SERVICE_TOKEN_REFRESH_FRACTION", "0.8"))
+SERVICE_TOKEN_EXPIRY_SKEW = int(os.getenv("SERVICE_TOKEN_EXPIRY_SKEW", "10"))
+
+# Connection pool for AsyncAuthClient (keep-alive connections to Auth MS and peers)
+AUTH_HTTP_MAX_CONNECTIONS = int(os.getenv("AUTH_HTTP_MAX_CONNECTIONS", "100"))
+AUTH_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("AUTH_HTTP_KEEPALIVE_EXPIRY", "30"))
+AUTH_HTTP_TIMEOUT = float(os.getenv("AUTH_HTTP_TIMEOUT", "10"))
 
 # =========================
 # Exceptions
@@ -51,8 +88,319 @@ class AuthServiceError(Exception):
     """Auth microservice itself failed (5xx or malformed response)."""
 
 
-class ServiceCallError(Exception):
-    """Generic error from cross-service calls."""
+# =========================
+# Caching helpers
+# =========================
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe, bounded LRU cache with a per-entry expiry.
+
+    Keeps hit/miss/eviction counters so callers can expose them as metrics.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key matches predicate. Returns the number removed."""
+        with self._lock:
+            doomed = [k for k in self._data if predicate(k)]
+            for k in doomed:
+                del self._data[k]
+        return len(doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class _InFlightCall:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one execution.
+
+    The first caller runs fn(); callers arriving while it is in flight block
+    and receive the same result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _InFlightCall] = {}
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _InFlightCall()
+                self._calls[key] = call
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+
+class AsyncSingleFlight:
+    """
+    asyncio version of SingleFlight: concurrent awaiters of one key share one coroutine.
+
+    fn() runs as its own task, so a cancelled caller (e.g. a client that
+    disconnected) only stops waiting; the others still get the result.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._finished(key, t))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved when every caller was cancelled
+
+
+class _RejectedToken:
+    """Negative-cache marker for a token Auth MS refused."""
+
+    __slots__ = ("reason",)
+
+    def __init__(self, reason: str):
+        self.reason = reason
+
+
+def _token_cache_key(token: str) -> str:
+    # never keep raw bearer tokens as dict keys
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _unverified_claim(token: str, name: str) -> Optional[float]:
+    """
+    Read a numeric claim (exp / iat) without verifying the signature.
+    Only used to bound cache lifetimes - never to accept a token.
+    """
+    try:
+        claims = jwt.decode(token, options={"verify_signature": False})
+    except Exception:
+        return None
+    value = claims.get(name)
+    return float(value) if isinstance(value, (int, float)) else None
+
+
+def _unverified_exp(token: str) -> Optional[float]:
+    return _unverified_claim(token, "exp")
+
+
+# =========================
+# JWKS key store
+# =========================
+
+class JWKSKeyStore:
+    """
+    Signing keys from a JWKS endpoint, indexed by `kid`.
+
+    - Refreshed by a background daemon thread every refresh_interval seconds,
+      so verification never waits on a fetch for known keys.
+    - A failed refresh keeps serving the last good keys (stale-while-revalidate).
+    - An unknown kid triggers an immediate single-flight fetch, rate limited by
+      min_fetch_interval so random kids can't be used to hammer Auth MS.
+    """
+
+    def __init__(
+        self,
+        jwks_url: str,
+        session: Optional[requests.Session] = None,
+        refresh_interval: int = JWKS_CACHE_TTL,
+        min_fetch_interval: int = JWKS_MIN_FETCH_INTERVAL,
+        timeout: int = 10,
+    ):
+        self.jwks_url = jwks_url
+        self.session = session or requests.Session()
+        self.refresh_interval = refresh_interval
+        self.min_fetch_interval = min_fetch_interval
+        self.timeout = timeout
+
+        self._keys: Dict[Optional[str], PyJWK] = {}
+        self._flight = SingleFlight()
+        self._last_fetch_attempt = 0.0
+        self._last_success = 0.0
+        self._refresher: Optional[threading.Thread] = None
+        self._refresher_lock = threading.Lock()
+        self._stats = {
+            "kid_hits": 0,
+            "kid_misses": 0,
+            "unknown_kid_fetches": 0,
+            "refreshes": 0,
+            "refresh_failures": 0,
+        }
+
+    def peek(self, kid: Optional[str]) -> Optional[PyJWK]:
+        """Key for kid if already loaded - never touches the network."""
+        keys = self._keys
+        if kid is None:
+            # tokens without a kid are only accepted when the set is unambiguous
+            return next(iter(keys.values())) if len(keys) == 1 else None
+        return keys.get(kid)
+
+    def get_signing_key(self, kid: Optional[str]) -> PyJWK:
+        self._ensure_refresher()
+
+        key = self.peek(kid)
+        if key is not None:
+            self._stats["kid_hits"] += 1
+            return key
+
+        self._stats["kid_misses"] += 1
+        recently_fetched = time.time() - self._last_fetch_attempt < self.min_fetch_interval
+        if not self._keys or not recently_fetched:
+            self._stats["unknown_kid_fetches"] += 1
+            self._flight.do("fetch", self._fetch)
+            key = self.peek(kid)
+
+        if key is None:
+            raise AuthUnauthorizedError(f"Unknown signing key: {kid}")
+        return key
+
+    def warm(self) -> None:
+        """Load keys and start the background refresher (call at startup)."""
+        self._ensure_refresher()
+        if not self._keys:
+            self._flight.do("fetch", self._fetch)
+
+    def _fetch(self) -> None:
+        self._last_fetch_attempt = time.time()
+        try:
+            resp = self.session.get(self.jwks_url, timeout=self.timeout)
+            resp.raise_for_status()
+            jwk_set = PyJWKSet.from_dict(resp.json())
+        except Exception as e:
+            self._stats["refresh_failures"] += 1
+            if self._keys:
+                # keep serving the last good key set
+                print(f"[AuthSDK] JWKS refresh failed, serving cached keys: {e}")
+                return
+            raise AuthServiceError(f"Failed to load JWKS: {e}")
+
+        # swap the whole dict so readers never see a partial set
+        self._keys = {k.key_id: k for k in jwk_set.keys}
+        self._last_success = time.time()
+        self._stats["refreshes"] += 1
+
+    def _ensure_refresher(self) -> None:
+        if self._refresher is not None:
+            return
+        with self._refresher_lock:
+            if self._refresher is None:
+                self._refresher = threading.Thread(
+                    target=self._refresh_loop, name="jwks-refresh", daemon=True
+                )
+                self._refresher.start()
+
+    def _refresh_loop(self) -> None:
+        while True:
+            time.sleep(self.refresh_interval)
+            try:
+                self._flight.do("fetch", self._fetch)
+            except Exception as e:
+                print(f"[AuthSDK] JWKS background refresh failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "keys": len(self._keys),
+            "last_refresh_age_seconds": (
+                round(time.time() - self._last_success, 1) if self._last_success else None
+            ),
+        }
 
 
 # =========================
@@ -95,20 +443,27 @@ class AuthClient:
         service_secret: Optional[str] = None,
         session: Optional[requests.Session] = None,
         service_token_ttl_seconds: int = 9 * 60,
+        identity_cache_ttl_seconds: int = USER_IDENTITY_CACHE_TTL,
+        identity_cache_max_entries: int = USER_IDENTITY_CACHE_MAX_ENTRIES,
+        identity_negative_ttl_seconds: int = USER_IDENTITY_NEGATIVE_TTL,
+        user_token_verify_mode: str = USER_TOKEN_VERIFY_MODE,
+        revocation_check_interval_seconds: int = USER_TOKEN_REVOCATION_CHECK_INTERVAL,
     ):
         """
         auth_base_url: e.g. http://localhost:6501/auth
         service_id: e.g. svc_ums
         service_secret: secret configured in service_accounts table
         session: optional requests.Session for connection reuse / mocking
+        identity_cache_ttl_seconds: upper bound for caching a verified user identity (0 disables)
+        identity_negative_ttl_seconds: how long a rejected user token is remembered
+        user_token_verify_mode: "remote" (Auth MS /verify) or "local" (JWKS + background revocation checks)
         """
-        self._jwks_client = None
-        self._jwks_last_fetched = 0
-        self._jwks_cache_ttl = 300  # seconds
         self.auth_base_url = (auth_base_url or os.getenv("AUTH_BASE_URL") or "").rstrip("/")
         self.service_id = os.getenv("SERVICE_ID") or service_id
         self.service_secret = os.getenv("SERVICE_SECRET") or service_secret
         self.session = session or requests.Session()
+        # per-target pools, retry budget, circuit breaker, hedging for call_service
+        self.service_http = ServiceHTTPLayer()
         self.service_token_ttl_seconds = service_token_ttl_seconds
 
         print(f'in auth sdk service id {os.getenv("SERVICE_ID")}')
@@ -122,9 +477,38 @@ class AuthClient:
         if not self.service_secret:
             raise AuthConfigError("SERVICE_SECRET not set")
 
+        # JWKS signing keys (service tokens + local user token verification)
+        jwks_url = os.getenv("SERVICE_JWKS_URL") or f"{self.auth_base_url}/.well-known/jwks.json"
+        self._jwks = JWKSKeyStore(jwks_url, session=self.session)
+
         # service token cache
         self._service_token: Optional[str] = None
         self._service_token_expiry_ts: float = 0.0
+        self._service_token_refresh_at: float = 0.0
+        self._service_token_flight = SingleFlight()
+        self._service_token_timer: Optional[threading.Timer] = None
+        self._service_token_stats = {"fetches": 0, "background_refreshes": 0, "background_failures": 0}
+
+        # verified user identity cache (token hash -> identity | _RejectedToken)
+        self.identity_cache_ttl_seconds = identity_cache_ttl_seconds
+        self.identity_negative_ttl_seconds = identity_negative_ttl_seconds
+        self._identity_cache = TTLCache(max_entries=identity_cache_max_entries)
+        self._identity_flight = SingleFlight()
+
+        # local user token verification
+        self.user_token_verify_mode = user_token_verify_mode
+        if self.user_token_verify_mode not in ("remote", "local"):
+            raise AuthConfigError(f"Unknown USER_TOKEN_VERIFY_MODE: {self.user_token_verify_mode}")
+        self.user_jwt_issuer = USER_JWT_ISSUER
+        self.user_jwt_audience = USER_JWT_AUDIENCE
+        if self.user_token_verify_mode == "local" and not self.user_jwt_audience:
+            raise AuthConfigError("USER_JWT_AUDIENCE must be set when USER_TOKEN_VERIFY_MODE=local")
+        self.revocation_check_interval_seconds = revocation_check_interval_seconds
+        self._revocation_due = TTLCache(max_entries=identity_cache_max_entries)
+        self._revoked_tokens = TTLCache(max_entries=identity_cache_max_entries)
+        self._revocation_executor: Optional[ThreadPoolExecutor] = None
+        self._revocation_lock = threading.Lock()
+        self._revocation_stats = {"checks": 0, "revoked": 0, "errors": 0}
 
     # ------------------------------------------------------
     # Internal HTTP helpers
@@ -146,6 +530,9 @@ class AuthClient:
         """
         Verify user JWT via Auth MS.
 
+        Results are cached per token (see USER_IDENTITY_CACHE_TTL) and
+        concurrent verifications of the same token share one Auth MS call.
+
         Returns identity JSON on success:
         {
           "u_id": "...",
@@ -157,17 +544,129 @@ class AuthClient:
         if not user_token:
             raise AuthUnauthorizedError("User token missing")
 
+        cache_key = _token_cache_key(user_token)
+        local = self.user_token_verify_mode == "local"
+        if local and self._revoked_tokens.get(cache_key):
+            raise AuthUnauthorizedError("User token revoked")
+
+        identity = self._get_cached_identity(cache_key)
+        if identity is None:
+            verify = self._verify_user_token_local if local else self._verify_user_token_remote
+            identity = self._identity_flight.do(cache_key, lambda: verify(user_token, cache_key))
+
+        if local:
+            self._schedule_revocation_check(user_token, cache_key)
+        return identity
+
+    def _get_cached_identity(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        cached = self._identity_cache.get(cache_key)
+        if isinstance(cached, _RejectedToken):
+            raise AuthUnauthorizedError(cached.reason)
+        return cached
+
+    def _verify_user_token_remote(self, user_token: str, cache_key: str) -> Dict[str, Any]:
         resp = self._auth_post("/verify", {"token": user_token})
+        return self._handle_verify_response(resp, user_token, cache_key)
+
+    def _handle_verify_response(self, resp, user_token: str, cache_key: str) -> Dict[str, Any]:
         if resp.status_code == 200:
             try:
-                return resp.json()
+                identity = resp.json()
             except ValueError:
                 raise AuthServiceError("Auth /verify returned non-JSON")
+            self._cache_identity(cache_key, identity, user_token)
+            return identity
         elif resp.status_code in (400, 401, 403):
-            raise AuthUnauthorizedError(f"User token invalid: {resp.status_code} {resp.text}")
+            reason = f"User token invalid: {resp.status_code} {resp.text}"
+            self._identity_cache.set(cache_key, _RejectedToken(reason), self.identity_negative_ttl_seconds)
+            raise AuthUnauthorizedError(reason)
         else:
+            # Auth MS failures are never cached
             raise AuthServiceError(f"Auth /verify failed: {resp.status_code} {resp.text}")
 
+    def _cache_identity(self, cache_key: str, identity: Dict[str, Any], user_token: str) -> None:
+        ttl = float(self.identity_cache_ttl_seconds)
+        exp = _unverified_exp(user_token)
+        if exp is not None:
+            ttl = min(ttl, exp - time.time())
+        self._identity_cache.set(cache_key, identity, ttl)
+
+    def _verify_user_token_local(self, user_token: str, cache_key: str) -> Dict[str, Any]:
+        try:
+            try:
+                signing_key = self._get_signing_key(user_token)
+                claims = jwt.decode(
+                    user_token,
+                    key=signing_key,
+                    algorithms=["RS256"],
+                    audience=self.user_jwt_audience,
+                    issuer=self.user_jwt_issuer,
+                    options={"require": ["exp"]},
+                )
+            except jwt.ExpiredSignatureError:
+                raise AuthUnauthorizedError("User token expired")
+            except jwt.InvalidTokenError as e:
+                raise AuthUnauthorizedError(f"Invalid user token: {e}")
+
+            if claims.get("type") == "service":
+                raise AuthUnauthorizedError("Invalid token type")
+
+            u_id = claims.get("u_id") or claims.get("sub")
+            if not u_id:
+                raise AuthUnauthorizedError("Token missing subject")
+        except AuthUnauthorizedError as e:
+            self._identity_cache.set(cache_key, _RejectedToken(str(e)), self.identity_negative_ttl_seconds)
+            raise
+
+        identity = {
+            "u_id": u_id,
+            "email": claims.get("email"),
+            "tenant_id": claims.get("tenant_id"),
+            "status": claims.get("status", "active"),
+        }
+        self._cache_identity(cache_key, identity, user_token)
+        return identity
+
+    def _schedule_revocation_check(self, user_token: str, cache_key: str) -> None:
+        """
+        Ask Auth MS whether a locally verified token was revoked, off the request path.
+        Each token is checked at most once per revocation_check_interval_seconds.
+        """
+        if self._revocation_due.get(cache_key):
+            return
+        self._revocation_due.set(cache_key, True, self.revocation_check_interval_seconds)
+
+        if self._revocation_executor is None:
+            with self._revocation_lock:
+                if self._revocation_executor is None:
+                    self._revocation_executor = ThreadPoolExecutor(
+                        max_workers=2, thread_name_prefix="auth-revocation"
+                    )
+        self._revocation_executor.submit(self._check_revocation, user_token, cache_key)
+
+    def _check_revocation(self, user_token: str, cache_key: str) -> None:
+        self._revocation_stats["checks"] += 1
+        try:
+            resp = self._auth_post("/verify", {"token": user_token})
+        except AuthServiceError as e:
+            # Auth MS outage: keep serving the locally verified identity, retry next interval
+            self._revocation_stats["errors"] += 1
+            print(f"[AuthSDK] revocation check failed: {e}")
+            return
+
+        if resp.status_code in (400, 401, 403):
+            self._revocation_stats["revoked"] += 1
+            exp = _unverified_exp(user_token)
+            ttl = (exp - time.time()) if exp is not None else float(self.revocation_check_interval_seconds)
+            self._revoked_tokens.set(cache_key, True, ttl)
+            self._identity_cache.pop(cache_key)
+        elif resp.status_code != 200:
+            self._revocation_stats["errors"] += 1
+
+    def invalidate_user_token(self, user_token: str) -> None:
+        """Forget any cached verification result for this token (e.g. on logout)."""
+        self._identity_cache.pop(_token_cache_key(user_token))
+
     # ------------------------------------------------------
     # Service Token Handling
     # ------------------------------------------------------
@@ -178,6 +677,9 @@ class AuthClient:
             "service_secret": self.service_secret,
         }
         resp = self._auth_post("/internal/service-token", body)
+        return self._handle_service_token_response(resp)
+
+    def _handle_service_token_response(self, resp) -> str:
         if resp.status_code != 200:
             raise AuthUnauthorizedError(
                 f"Auth /internal/service-token failed: {resp.status_code} {resp.text}"
@@ -192,57 +694,90 @@ class AuthClient:
         if not token:
             raise AuthServiceError("Auth /internal/service-token response missing 'token'")
 
-        # naive TTL; we assume token expiry ~10min, so cache for service_token_ttl_seconds
+        # lifetime from the token's own iat/exp; service_token_ttl_seconds only
+        # applies when the token carries no exp claim
+        now = time.time()
+        exp = _unverified_claim(token, "exp")
+        iat = _unverified_claim(token, "iat") or now
+        if exp is None:
+            exp = now + self.service_token_ttl_seconds
+        lifetime = max(exp - iat, 0.0)
+
         self._service_token = token
-        self._service_token_expiry_ts = time.time() + self.service_token_ttl_seconds
+        self._service_token_expiry_ts = exp - SERVICE_TOKEN_EXPIRY_SKEW
+        self._service_token_refresh_at = iat + lifetime * SERVICE_TOKEN_REFRESH_FRACTION
+        self._service_token_stats["fetches"] += 1
+        self._schedule_service_token_refresh(self._service_token_refresh_at - now)
         return token
 
-    def get_service_token(self, force_refresh: bool = False) -> str:
+    def _cached_service_token(self) -> Optional[str]:
+        if self._service_token and time.time() < self._service_token_expiry_ts:
+            return self._service_token
+        return None
+
+    def get_service_token(self, force_refresh: bool = False, rejected_token: Optional[str] = None) -> str:
         """
         Return a valid service token, refreshing if needed.
-        """
-        now = time.time()
-        if (
-            not force_refresh
-            and self._service_token
-            and now < self._service_token_expiry_ts
-        ):
-            return self._service_token
 
-        return self._fetch_new_service_token()
+        Tokens are normally renewed by a background timer before they expire, so
+        callers only wait on Auth MS on a cold start. Concurrent refreshes (cold
+        start, background timer, 401 retries) share one in-flight fetch.
+
+        rejected_token: with force_refresh, the token a peer just refused - if
+        another caller already replaced it, the newer token is returned as-is.
+        """
+        if not force_refresh:
+            token = self._cached_service_token()
+            if token:
+                return token
+
+        def _refresh() -> str:
+            token = self._cached_service_token()
+            if token and not force_refresh:
+                return token
+            if token and force_refresh and rejected_token and token != rejected_token:
+                return token
+            return self._fetch_new_service_token()
+
+        return self._service_token_flight.do("service-token", _refresh)
+
+    def _schedule_service_token_refresh(self, delay: float) -> None:
+        if self._service_token_timer is not None:
+            self._service_token_timer.cancel()
+        timer = threading.Timer(max(delay, 1.0), self._background_refresh_service_token)
+        timer.daemon = True
+        self._service_token_timer = timer
+        timer.start()
+
+    def _background_refresh_service_token(self) -> None:
+        try:
+            self._service_token_flight.do("service-token", self._fetch_new_service_token)
+            self._service_token_stats["background_refreshes"] += 1
+        except Exception as e:
+            # keep using the current token; try again before it expires
+            self._service_token_stats["background_failures"] += 1
+            print(f"[AuthSDK] background service token refresh failed: {e}")
+            remaining = self._service_token_expiry_ts - time.time()
+            if remaining > 0:
+                self._schedule_service_token_refresh(min(30.0, remaining / 2))
 
     # ------------------------------------------------------
     # Service Token Verification (for inbound middleware)
     # ------------------------------------------------------
 
-    def _get_jwks_client(self) -> PyJWKClient:
-        now = time.time()
-
-        if (
-            self._jwks_client is None
-            or now - self._jwks_last_fetched > self._jwks_cache_ttl
-        ):
-            jwks_url = os.getenv(
-                "SERVICE_JWKS_URL",
-                f"{self.auth_base_url}/.well-known/jwks.json"
-            )
-
-            try:
-                self._jwks_client = PyJWKClient(jwks_url)
-                self._jwks_last_fetched = now
-            except Exception as e:
-                raise AuthServiceError(f"Failed to load JWKS: {e}")
-
-        return self._jwks_client
+    def warm_jwks(self) -> None:
+        self._jwks.warm()
 
+    def _get_signing_key(self, token: str):
+        kid = jwt.get_unverified_header(token).get("kid")
+        return self._jwks.get_signing_key(kid).key
 
     def verify_service_token(self, token: str) -> Dict[str, Any]:
         if not token:
             raise AuthUnauthorizedError("Missing service token")
 
         try:
-            jwks_client = self._get_jwks_client()
-            signing_key = jwks_client.get_signing_key_from_jwt(token).key
+            signing_key = self._get_signing_key(token)
 
             decoded = jwt.decode(
                 token,
@@ -287,7 +822,10 @@ class AuthClient:
         - X-Service-Token: <this service's token>
         - X-User-Token: <end-user token> (optional)
         """
-        svc_token = self.get_service_token()
+        return self._service_headers(self.get_service_token(), user_token)
+
+    @staticmethod
+    def _service_headers(svc_token: str, user_token: Optional[str] = None) -> Dict[str, str]:
         headers = {
             "X-Service-Token": svc_token,
         }
@@ -311,6 +849,7 @@ class AuthClient:
         user_token: Optional[str] = None,
         headers: Optional[Dict[str, str]] = None,
         timeout: int = 10,
+        idempotent: Optional[bool] = None,
         **kwargs,
     ) -> requests.Response:
         """
@@ -319,29 +858,251 @@ class AuthClient:
         - X-User-Token (optional)
 
         Automatically retries once on 401 with a forced service-token refresh.
+
+        Goes through ServiceHTTPLayer: per-service connection pool, retries
+        (idempotent calls only, bounded by a retry budget), circuit breaker
+        (raises ServiceUnavailableError while open) and optional GET hedging.
+        idempotent: override the method-based default, e.g. for read-only POSTs.
         """
         base_url = resolve_service_url(service_name)
         url = f"{base_url}{path}"
 
         # merge headers: caller-supplied + auth headers
-        auth_headers = self.build_service_headers(user_token=user_token)
-        final_headers = {**(headers or {}), **auth_headers}
+        svc_token = self.get_service_token()
+        final_headers = {**(headers or {}), **self._service_headers(svc_token, user_token)}
 
-        try:
-            resp = self.session.request(method, url, headers=final_headers, timeout=timeout, **kwargs)
-        except requests.RequestException as e:
-            raise ServiceCallError(f"Error calling service '{service_name}' at {url}: {e}")
+        resp = self.service_http.request(
+            service_name, method, url, idempotent=idempotent, headers=final_headers, timeout=timeout, **kwargs
+        )
 
         # if 401 from target, refresh service token once and retry
         if resp.status_code == 401:
-            # force refresh
-            self.get_service_token(force_refresh=True)
-            auth_headers = self.build_service_headers(user_token=user_token)
-            final_headers = {**(headers or {}), **auth_headers}
+            # force refresh (shared with any other caller that saw the same 401)
+            svc_token = self.get_service_token(force_refresh=True, rejected_token=svc_token)
+            final_headers = {**(headers or {}), **self._service_headers(svc_token, user_token)}
+            resp = self.service_http.request(
+                service_name, method, url, idempotent=idempotent, headers=final_headers, timeout=timeout, **kwargs
+            )
 
-            try:
-                resp = self.session.request(method, url, headers=final_headers, timeout=timeout, **kwargs)
-            except requests.RequestException as e:
-                raise ServiceCallError(f"Error calling service '{service_name}' at {url} after refresh: {e}")
+        return resp
+
+    # ------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "identity_cache": {
+                **self._identity_cache.stats(),
+                "inflight_shared": self._identity_flight.shared,
+            },
+            "jwks": self._jwks.stats(),
+            "services": self.service_http.stats(),
+            "service_token": {
+                **self._service_token_stats,
+                "expires_in": round(self._service_token_expiry_ts - time.time(), 1) if self._service_token else None,
+                "refresh_in": round(self._service_token_refresh_at - time.time(), 1) if self._service_token else None,
+                "inflight_shared": self._service_token_flight.shared,
+            },
+            "user_token_verify_mode": self.user_token_verify_mode,
+            "revocation_checks": {
+                **self._revocation_stats,
+                "revoked_tokens": len(self._revoked_tokens),
+            },
+        }
+
+
+# =========================
+# Async Auth Client
+# =========================
+
+class AsyncAuthClient:
+    """
+    asyncio counterpart of AuthClient for code running on the event loop
+    (middleware, async dependencies).
+
+    Configuration, identity cache and service-token state are shared with a
+    sync AuthClient; only the network layer differs: a pooled keep-alive
+    httpx.AsyncClient instead of a blocking requests.Session.
+    """
+
+    def __init__(
+        self,
+        sync_client: Optional[AuthClient] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        max_connections: int = AUTH_HTTP_MAX_CONNECTIONS,
+        keepalive_expiry: float = AUTH_HTTP_KEEPALIVE_EXPIRY,
+        timeout: float = AUTH_HTTP_TIMEOUT,
+    ):
+        self.sync = sync_client or get_shared_auth_client()
+        self.timeout = timeout
+        self.http = http_client or httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=timeout,
+        )
+        self._identity_flight = AsyncSingleFlight()
+
+    async def aclose(self) -> None:
+        await self.http.aclose()
+        await self.sync.service_http.aclose()
+
+    # ------------------------------------------------------
+    # Internal HTTP helpers
+    # ------------------------------------------------------
+
+    async def _auth_post(
+        self, path: str, json: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None
+    ) -> httpx.Response:
+        url = f"{self.sync.auth_base_url}{path}"
+        try:
+            return await self.http.post(url, json=json or {}, timeout=timeout or self.timeout)
+        except httpx.HTTPError as e:
+            raise AuthServiceError(f"Error calling Auth at {url}: {e}")
+
+    # ------------------------------------------------------
+    # User Token Verification
+    # ------------------------------------------------------
+
+    async def verify_user_token(self, user_token: str) -> Dict[str, Any]:
+        """Same contract as AuthClient.verify_user_token, without blocking the loop."""
+        if not user_token:
+            raise AuthUnauthorizedError("User token missing")
+
+        if self.sync.user_token_verify_mode == "local":
+            # Signature checks are CPU-only; only a JWKS fetch for an unknown
+            # kid blocks, so just that case goes to a worker thread.
+            if self._needs_key_fetch(user_token):
+                return await asyncio.to_thread(self.sync.verify_user_token, user_token)
+            return self.sync.verify_user_token(user_token)
+
+        cache_key = _token_cache_key(user_token)
+        identity = self.sync._get_cached_identity(cache_key)
+        if identity is not None:
+            return identity
+
+        async def _remote() -> Dict[str, Any]:
+            resp = await self._auth_post("/verify", {"token": user_token})
+            return self.sync._handle_verify_response(resp, user_token, cache_key)
+
+        return await self._identity_flight.do(cache_key, _remote)
+
+    async def verify_service_token(self, token: str) -> Dict[str, Any]:
+        if self._needs_key_fetch(token):
+            # unknown kid: the JWKS fetch blocks, keep it off the event loop
+            return await asyncio.to_thread(self.sync.verify_service_token, token)
+        return self.sync.verify_service_token(token)
+
+    def _needs_key_fetch(self, token: str) -> bool:
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+        except jwt.InvalidTokenError:
+            return False  # rejected without any network call
+        return self.sync._jwks.peek(kid) is None
+
+    # ------------------------------------------------------
+    # Service Token Handling
+    # ------------------------------------------------------
+
+    async def get_service_token(self, force_refresh: bool = False, rejected_token: Optional[str] = None) -> str:
+        token = None if force_refresh else self.sync._cached_service_token()
+        if token:
+            return token
+        # Rare path (cold start / 401): join the sync client's single-flight
+        # fetch from a worker thread so the loop never blocks on it.
+        return await asyncio.to_thread(
+            self.sync.get_service_token, force_refresh=force_refresh, rejected_token=rejected_token
+        )
+
+    async def build_service_headers(self, user_token: Optional[str] = None) -> Dict[str, str]:
+        return AuthClient._service_headers(await self.get_service_token(), user_token)
+
+    # ------------------------------------------------------
+    # Cross-service call wrapper
+    # ------------------------------------------------------
+
+    async def call_service(
+        self,
+        service_name: str,
+        path: str,
+        method: str = "GET",
+        user_token: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        idempotent: Optional[bool] = None,
+        **kwargs,
+    ) -> httpx.Response:
+        """
+        Async version of AuthClient.call_service (same ServiceHTTPLayer policies).
+        Retries once on 401 with a forced service-token refresh.
+        """
+        base_url = resolve_service_url(service_name)
+        url = f"{base_url}{path}"
+        layer = self.sync.service_http
+
+        svc_token = await self.get_service_token()
+        final_headers = {**(headers or {}), **AuthClient._service_headers(svc_token, user_token)}
+        resp = await layer.arequest(
+            service_name, method, url, idempotent=idempotent,
+            headers=final_headers, timeout=timeout or self.timeout, **kwargs
+        )
+
+        if resp.status_code == 401:
+            svc_token = await self.get_service_token(force_refresh=True, rejected_token=svc_token)
+            final_headers = {**(headers or {}), **AuthClient._service_headers(svc_token, user_token)}
+            resp = await layer.arequest(
+                service_name, method, url, idempotent=idempotent,
+                headers=final_headers, timeout=timeout or self.timeout, **kwargs
+            )
 
         return resp
+
+    def get_metrics(self) -> Dict[str, Any]:
+        metrics = self.sync.get_metrics()
+        metrics["identity_cache"]["inflight_shared_async"] = self._identity_flight.shared
+        return metrics
+
+
+# =========================
+# Shared client
+# =========================
+
+_shared_client: Optional[AuthClient] = None
+_shared_client_lock = threading.Lock()
+
+
+def get_shared_auth_client() -> AuthClient:
+    """
+    Process-wide AuthClient, created lazily so env vars are read after load_dotenv().
+    Sharing one instance means every caller benefits from the same caches.
+    """
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = AuthClient()
+    return _shared_client
+
+
+_shared_async_client: Optional[AsyncAuthClient] = None
+
+
+def get_shared_async_auth_client() -> AsyncAuthClient:
+    """Process-wide AsyncAuthClient sharing caches with get_shared_auth_client()."""
+    global _shared_async_client
+    if _shared_async_client is None:
+        sync_client = get_shared_auth_client()
+        with _shared_client_lock:
+            if _shared_async_client is None:
+                _shared_async_client = AsyncAuthClient(sync_client=sync_client)
+    return _shared_async_client
+
+
+async def close_shared_async_auth_client() -> None:
+    global _shared_async_client
+    if _shared_async_client is not None:
+        await _shared_async_client.aclose()
+        _shared_async_client = None
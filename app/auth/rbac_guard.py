@@ -1,18 +1,210 @@
 # shared/rbac_guard.py
 import os
 import json
-from typing import Optional, List
+import time
+from typing import Dict, Optional, List
 from fastapi import Request, HTTPException
 
-from itmtb_auth_sdk import AuthClient, AuthUnauthorizedError, AuthServiceError
+from app.auth.itmtb_auth_sdk import (
+    AsyncAuthClient,
+    AsyncSingleFlight,
+    AuthServiceError,
+    AuthUnauthorizedError,
+    TTLCache,
+    get_shared_async_auth_client,
+)
 
 RBAC_SERVICE_NAME = os.getenv("RBAC_SERVICE_NAME", "RBAC")
 RBAC_TIMEOUT = int(os.getenv("RBAC_TIMEOUT", "5"))
 
+# Decision cache: (userId, projectId, activity, requiredRoles) -> allowed / denied.
+# Denials get a shorter TTL so a newly granted permission shows up quickly.
+RBAC_ALLOW_CACHE_TTL = int(os.getenv("RBAC_ALLOW_CACHE_TTL", "60"))
+RBAC_DENY_CACHE_TTL = int(os.getenv("RBAC_DENY_CACHE_TTL", "10"))
+RBAC_CACHE_MAX_ENTRIES = int(os.getenv("RBAC_CACHE_MAX_ENTRIES", "10000"))
+
+_allowed_cache = TTLCache(max_entries=RBAC_CACHE_MAX_ENTRIES)
+_denied_cache = TTLCache(max_entries=RBAC_CACHE_MAX_ENTRIES)
+
+# Permission snapshots: answer require() for a user/project from one bulk RBAC
+# lookup instead of one round trip per activity.
+#   "off"         - per-activity POST /authz/direct/check (default)
+#   "permissions" - fetch the user's full allowed-activity set for the project
+#   "batch"       - check every activity registered via require() in one call
+# If RBAC answers 404/405/501 the guard falls back to per-activity checks and
+# only retries snapshots after RBAC_SNAPSHOT_RETRY_AFTER seconds.
+RBAC_SNAPSHOT_MODE = os.getenv("RBAC_SNAPSHOT_MODE", "off").lower()
+RBAC_SNAPSHOT_TTL = int(os.getenv("RBAC_SNAPSHOT_TTL", "60"))
+RBAC_SNAPSHOT_RETRY_AFTER = int(os.getenv("RBAC_SNAPSHOT_RETRY_AFTER", "300"))
+RBAC_PERMISSIONS_PATH = os.getenv("RBAC_PERMISSIONS_PATH", "/authz/direct/permissions")
+RBAC_BATCH_CHECK_PATH = os.getenv("RBAC_BATCH_CHECK_PATH", "/authz/direct/check-batch")
+
+_snapshot_cache = TTLCache(max_entries=RBAC_CACHE_MAX_ENTRIES)
+_snapshot_flight = AsyncSingleFlight()
+_snapshot_unsupported_until = 0.0
+_registered_activities: set = set()
+
+
+class _PermissionSnapshot:
+    """Allowed/denied activities for one user/project.
+
+    complete=True means the snapshot is the user's full permission set, so an
+    activity missing from it is denied; otherwise a missing activity is unknown.
+    """
+
+    __slots__ = ("decisions", "complete")
+
+    def __init__(self, decisions: Dict[str, bool], complete: bool):
+        self.decisions = decisions
+        self.complete = complete
+
+    def lookup(self, activity: str) -> Optional[bool]:
+        if activity in self.decisions:
+            return self.decisions[activity]
+        return False if self.complete else None
+
+
+def _get_auth_client() -> AsyncAuthClient:
+    # Lazy init: avoids import-time env capture. Shared with AuthMiddleware, so
+    # the service token, identity cache and HTTP pool are reused across calls.
+    return get_shared_async_auth_client()
+
+
+def _decision_key(user_id: str, project_id: str, activity: str, required_roles: Optional[List[str]]) -> tuple:
+    roles = tuple(sorted(required_roles)) if required_roles is not None else None
+    return (str(user_id), str(project_id), activity, roles)
+
+
+def invalidate_rbac_cache(
+    user_id: Optional[str] = None,
+    project_id: Optional[str] = None,
+    activity: Optional[str] = None,
+) -> int:
+    """
+    Drop cached RBAC decisions (e.g. after a role assignment changes).
+    Filters are ANDed; calling with no arguments clears everything.
+    Returns the number of entries removed.
+    """
+    def matches(key: tuple) -> bool:
+        return (
+            (user_id is None or key[0] == str(user_id))
+            and (project_id is None or key[1] == str(project_id))
+            and (activity is None or key[2] == activity)
+        )
+
+    def snapshot_matches(key: tuple) -> bool:
+        # a snapshot covers every activity, so only user/project filters apply
+        return (user_id is None or key[0] == str(user_id)) and (
+            project_id is None or key[1] == str(project_id)
+        )
+
+    return (
+        _allowed_cache.invalidate(matches)
+        + _denied_cache.invalidate(matches)
+        + _snapshot_cache.invalidate(snapshot_matches)
+    )
+
+
+def rbac_cache_stats() -> dict:
+    return {
+        "allowed": _allowed_cache.stats(),
+        "denied": _denied_cache.stats(),
+        "snapshots": {
+            **_snapshot_cache.stats(),
+            "mode": RBAC_SNAPSHOT_MODE,
+            "supported": time.time() >= _snapshot_unsupported_until,
+            "inflight_shared": _snapshot_flight.shared,
+        },
+    }
+
+
+def _parse_snapshot(data: dict) -> Optional[_PermissionSnapshot]:
+    body = data.get("data", data) if isinstance(data, dict) else None
+    if not isinstance(body, dict):
+        return None
+
+    if RBAC_SNAPSHOT_MODE == "permissions":
+        activities = body.get("activities")
+        if not isinstance(activities, list):
+            return None
+        return _PermissionSnapshot({str(a): True for a in activities}, complete=True)
+
+    # batch: {"results": {"activity": true}} or {"results": [{"activity": .., "allowed": ..}]}
+    results = body.get("results")
+    if isinstance(results, dict):
+        return _PermissionSnapshot({str(k): bool(v) for k, v in results.items()}, complete=False)
+    if isinstance(results, list):
+        decisions = {
+            str(r["activity"]): bool(r.get("allowed", False))
+            for r in results
+            if isinstance(r, dict) and r.get("activity")
+        }
+        return _PermissionSnapshot(decisions, complete=False)
+    return None
+
+
+async def _fetch_snapshot(
+    auth_client: AsyncAuthClient, user_jwt: str, user_id: str, project_id: str
+) -> Optional[_PermissionSnapshot]:
+    global _snapshot_unsupported_until
+
+    payload = {"userId": str(user_id), "projectId": str(project_id)}
+    if RBAC_SNAPSHOT_MODE == "permissions":
+        path = RBAC_PERMISSIONS_PATH
+    else:
+        path = RBAC_BATCH_CHECK_PATH
+        payload["activities"] = sorted(_registered_activities)
+
+    print(f"=== [RBAC GUARD] Fetching permission snapshot: POST {path} ===")
+    try:
+        resp = await auth_client.call_service(
+            service_name=RBAC_SERVICE_NAME,
+            path=path,
+            method="POST",
+            user_token=user_jwt,
+            json=payload,
+            timeout=RBAC_TIMEOUT,
+            idempotent=True,          # read-only check, safe to retry
+        )
+    except Exception as e:
+        print(f"=== [RBAC GUARD] Snapshot fetch failed, using per-activity check: {str(e)} ===")
+        return None
 
-def _get_auth_client() -> AuthClient:
-    # Lazy init: avoids import-time env capture
-    return AuthClient()
+    if resp.status_code in (404, 405, 501):
+        print(f"=== [RBAC GUARD] RBAC does not support snapshots ({resp.status_code}), using per-activity checks ===")
+        _snapshot_unsupported_until = time.time() + RBAC_SNAPSHOT_RETRY_AFTER
+        return None
+    if resp.status_code != 200:
+        return None
+
+    try:
+        snapshot = _parse_snapshot(resp.json())
+    except Exception:
+        snapshot = None
+    if snapshot is not None:
+        _snapshot_cache.set((str(user_id), str(project_id)), snapshot, RBAC_SNAPSHOT_TTL)
+    return snapshot
+
+
+async def _snapshot_decision(
+    auth_client: AsyncAuthClient, user_jwt: str, user_id: str, project_id: str, activity: str
+) -> Optional[bool]:
+    """True/False when the snapshot can answer, None to fall back to a per-activity check."""
+    if RBAC_SNAPSHOT_MODE not in ("permissions", "batch"):
+        return None
+    if time.time() < _snapshot_unsupported_until:
+        return None
+
+    key = (str(user_id), str(project_id))
+    snapshot = _snapshot_cache.get(key)
+    if snapshot is None:
+        # concurrent guarded calls from one screen load share a single fetch
+        snapshot = await _snapshot_flight.do(
+            key, lambda: _fetch_snapshot(auth_client, user_jwt, user_id, project_id)
+        )
+    if snapshot is None:
+        return None
+    return snapshot.lookup(activity)
 
 
 def _get_project_from_header_or_query(request: Request) -> Optional[str]:
@@ -78,7 +270,7 @@ def _extract_user_id_from_state(request: Request) -> Optional[str]:
 
     # Support multiple common keys - check nested user object first
     user_obj = ui.get("user", {})
-    if isinstance(user_obj, dict):
+    if isinstance(user_obj, dict) and user_obj:
         return (
             user_obj.get("u_id")
             or user_obj.get("user_id")
@@ -122,6 +314,13 @@ def require(activity: str, required_roles: Optional[List[str]] = None):
     """
     Enforces RBAC via RBAC service endpoint: POST /authz/direct/check
 
+    Decisions are cached per (userId, projectId, activity, requiredRoles):
+    allowed for RBAC_ALLOW_CACHE_TTL, denied for RBAC_DENY_CACHE_TTL seconds.
+    Use invalidate_rbac_cache() to drop them early.
+
+    With RBAC_SNAPSHOT_MODE=permissions|batch, plain activity checks (no
+    required_roles) are answered from a per-user/project permission snapshot.
+
     RBAC expects JSON:
       {
         "userId": "...",
@@ -176,7 +375,7 @@ def require(activity: str, required_roles: Optional[List[str]] = None):
         if not user_id:
             print("=== [RBAC GUARD] User ID not in middleware state, verifying token with Auth MS ===")
             try:
-                identity = auth_client.verify_user_token(user_jwt)
+                identity = await auth_client.verify_user_token(user_jwt)
             except AuthUnauthorizedError as e:
                 print(f"=== [RBAC GUARD] Auth verification failed: {str(e)} ===")
                 raise HTTPException(status_code=401, detail=str(e))
@@ -189,7 +388,7 @@ def require(activity: str, required_roles: Optional[List[str]] = None):
 
             # Extract user_id from identity response
             user_obj = identity.get("user", {})
-            if isinstance(user_obj, dict):
+            if isinstance(user_obj, dict) and user_obj:
                 user_id = (
                     user_obj.get("u_id")
                     or user_obj.get("user_id")
@@ -213,7 +412,26 @@ def require(activity: str, required_roles: Optional[List[str]] = None):
         
         print(f"=== [RBAC GUARD] User ID extracted: '{user_id}' (from token) ===")
 
-        # 4) RBAC call with expected payload
+        # 4) cached decision for this user/project/activity window
+        cache_key = _decision_key(user_id, project_id, activity, required_roles)
+        if _allowed_cache.get(cache_key):
+            print(f"=== [RBAC GUARD] Permission granted (cached) for '{activity}' ===\n")
+            return
+        if _denied_cache.get(cache_key):
+            print(f"=== [RBAC GUARD] Permission denied (cached) for '{activity}' ===")
+            raise HTTPException(status_code=403, detail=f"Forbidden: {activity}")
+
+        # 5) permission snapshot (one bulk lookup per user/project), if enabled
+        if required_roles is None:
+            decision = await _snapshot_decision(auth_client, user_jwt, user_id, project_id, activity)
+            if decision is True:
+                print(f"=== [RBAC GUARD] Permission granted (snapshot) for '{activity}' ===\n")
+                return
+            if decision is False:
+                print(f"=== [RBAC GUARD] Permission denied (snapshot) for '{activity}' ===")
+                raise HTTPException(status_code=403, detail=f"Forbidden: {activity}")
+
+        # 6) RBAC call with expected payload
         payload = {
             "userId": str(user_id),
             "projectId": str(project_id),
@@ -226,13 +444,14 @@ def require(activity: str, required_roles: Optional[List[str]] = None):
         print(f"=== [RBAC GUARD] Payload: {payload} ===")
         
         try:
-            resp = auth_client.call_service(
+            resp = await auth_client.call_service(
                 service_name=RBAC_SERVICE_NAME,
                 path="/authz/direct/check",
                 method="POST",
                 user_token=user_jwt,      # becomes X-User-Token for RBAC service
                 json=payload,
                 timeout=RBAC_TIMEOUT,
+                idempotent=True,          # read-only check, safe to retry
             )
 
             print(f"=== [RBAC GUARD] RBAC Response Status: {resp.status_code} ===")
@@ -252,6 +471,11 @@ def require(activity: str, required_roles: Optional[List[str]] = None):
             
             is_allowed = bool(data.get("data", {}).get("allowed", False))
             print(f"=== [RBAC GUARD] Permission check result: {'ALLOWED' if is_allowed else 'DENIED'} ===")
+
+            if is_allowed:
+                _allowed_cache.set(cache_key, True, RBAC_ALLOW_CACHE_TTL)
+            else:
+                _denied_cache.set(cache_key, True, RBAC_DENY_CACHE_TTL)
             
             if not is_allowed:
                 print(f"=== [RBAC GUARD] Permission denied for user '{user_id}' to perform '{activity}' in project '{project_id}' ===")
@@ -267,6 +491,8 @@ def require(activity: str, required_roles: Optional[List[str]] = None):
             print(f"=== [RBAC GUARD] Exception type: {type(e).__name__} ===")
             raise HTTPException(status_code=503, detail=f"RBAC service error: {str(e)}")
 
+    if required_roles is None:
+        _registered_activities.add(activity)
     dep.__rbac_activity__ = activity
     return dep
 
@@ -0,0 +1,451 @@
+"""
+service_http.py
+
+Outbound HTTP layer used by AuthClient.call_service / AsyncAuthClient.call_service.
+
+Per target service (RBAC, CRAB, ...):
+- a sized connection pool (sync requests.Session and async httpx.AsyncClient)
+- retries for idempotent calls, limited by a retry budget
+- a circuit breaker that fails fast while the target is unhealthy
+- optional hedged requests for idempotent GETs
+- latency / error metrics
+
+Settings come from env, with an optional per-service override, e.g.
+SERVICE_HTTP_POOL_SIZE=20 and RBAC_HTTP_POOL_SIZE=50.
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRYABLE_STATUS = frozenset({502, 503, 504})
+
+
+class ServiceCallError(Exception):
+    """Generic error from cross-service calls."""
+
+
+class ServiceUnavailableError(ServiceCallError):
+    """Circuit breaker is open for the target service; the call was not attempted."""
+
+
+def _setting(service_name: str, name: str, default: str, cast: Callable[[str], Any] = int) -> Any:
+    value = os.getenv(f"{service_name.upper()}_HTTP_{name}") or os.getenv(f"SERVICE_HTTP_{name}") or default
+    return cast(value)
+
+
+# =========================
+# Policies
+# =========================
+
+class RetryBudget:
+    """
+    Token bucket that caps retries to a fraction of traffic.
+
+    Every request deposits `ratio` tokens, every retry (or hedge) spends one.
+    A small reserve lets low-traffic services still retry occasionally.
+    """
+
+    def __init__(self, ratio: float = 0.2, reserve: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = reserve
+        self._tokens = reserve
+        self._lock = threading.Lock()
+        self.exhausted = 0
+
+    def record_request(self) -> None:
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            self.exhausted += 1
+            return False
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures;
+    open -> half_open after `reset_timeout` seconds, letting one probe through;
+    half_open -> closed on success, back to open on failure.
+
+    The probe slot is held until record_success / record_failure, or until the
+    caller gives it back with release_probe() (cancelled or crashed probe).
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.opened = 0
+
+    def admit(self) -> Optional[bool]:
+        """None if rejected; otherwise whether this call holds the half-open probe slot."""
+        with self._lock:
+            if self.state == "closed":
+                return False
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._probe_in_flight = False
+            if self.state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return None
+
+    def allow(self) -> bool:
+        return self.admit() is not None
+
+    def release_probe(self) -> None:
+        """Free the probe slot without an outcome, so the next call can probe."""
+        with self._lock:
+            if self.state == "half_open":
+                self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self.state = "closed"
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.opened += 1
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+
+class ServiceMetrics:
+    """Request / error counters and a rolling latency window for one service."""
+
+    def __init__(self, window: int = 1024):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.hedges = 0
+        self._latencies_ms = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, latency_s: float, ok: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            if not ok:
+                self.errors += 1
+            self._latencies_ms.append(latency_s * 1000.0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = sorted(self._latencies_ms)
+
+        def pct(p: float) -> Optional[float]:
+            if not samples:
+                return None
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))], 2)
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "latency_ms": {"p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99)},
+        }
+
+
+# =========================
+# Per-service target
+# =========================
+
+class ServiceTarget:
+    def __init__(self, service_name: str):
+        self.service_name = service_name
+        self.pool_size = _setting(service_name, "POOL_SIZE", "20")
+        self.max_retries = _setting(service_name, "MAX_RETRIES", "2")
+        self.backoff = _setting(service_name, "RETRY_BACKOFF_SECONDS", "0.05", float)
+        self.hedge_delay = _setting(service_name, "HEDGE_DELAY_MS", "0", float) / 1000.0
+
+        self.budget = RetryBudget(ratio=_setting(service_name, "RETRY_BUDGET_RATIO", "0.2", float))
+        self.breaker = CircuitBreaker(
+            failure_threshold=_setting(service_name, "BREAKER_FAILURES", "5"),
+            reset_timeout=_setting(service_name, "BREAKER_RESET_SECONDS", "30", float),
+        )
+        self.metrics = ServiceMetrics()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._aclient: Optional[httpx.AsyncClient] = None
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def aclient(self) -> httpx.AsyncClient:
+        if self._aclient is None:
+            self._aclient = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.pool_size,
+                    max_keepalive_connections=self.pool_size,
+                )
+            )
+        return self._aclient
+
+    @property
+    def hedge_executor(self) -> ThreadPoolExecutor:
+        if self._hedge_executor is None:
+            self._hedge_executor = ThreadPoolExecutor(
+                max_workers=self.pool_size, thread_name_prefix=f"hedge-{self.service_name.lower()}"
+            )
+        return self._hedge_executor
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.metrics.snapshot(),
+            "pool_size": self.pool_size,
+            "breaker": {
+                "state": self.breaker.state,
+                "opened": self.breaker.opened,
+                "rejected": self.breaker.rejected,
+            },
+            "retry_budget_exhausted": self.budget.exhausted,
+        }
+
+
+# =========================
+# Layer
+# =========================
+
+class ServiceHTTPLayer:
+    """Registry of ServiceTargets plus the sync / async request loops."""
+
+    def __init__(self):
+        self._targets: Dict[str, ServiceTarget] = {}
+        self._lock = threading.Lock()
+
+    def target(self, service_name: str) -> ServiceTarget:
+        key = service_name.upper()
+        target = self._targets.get(key)
+        if target is None:
+            with self._lock:
+                target = self._targets.get(key)
+                if target is None:
+                    target = ServiceTarget(key)
+                    self._targets[key] = target
+        return target
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: t.stats() for name, t in self._targets.items()}
+
+    async def aclose(self) -> None:
+        for t in self._targets.values():
+            if t._aclient is not None:
+                await t._aclient.aclose()
+                t._aclient = None
+
+    @staticmethod
+    def _is_idempotent(method: str, idempotent: Optional[bool]) -> bool:
+        return idempotent if idempotent is not None else method.upper() in IDEMPOTENT_METHODS
+
+    def _admit(self, target: ServiceTarget, url: str) -> bool:
+        """Raise if the breaker rejects the call; returns whether it is the half-open probe."""
+        probe = target.breaker.admit()
+        if probe is None:
+            raise ServiceUnavailableError(
+                f"Circuit open for service '{target.service_name}', not calling {url}"
+            )
+        target.budget.record_request()
+        return probe
+
+    def _can_retry(self, target: ServiceTarget, attempt: int, retryable: bool) -> bool:
+        if not retryable or attempt >= target.max_retries or target.breaker.state == "open":
+            return False
+        if not target.budget.try_spend():
+            return False
+        target.metrics.retries += 1
+        return True
+
+    def _backoff(self, target: ServiceTarget, attempt: int) -> float:
+        return target.backoff * (2 ** attempt) * (0.5 + random.random())
+
+    # ------------------------------------------------------
+    # sync
+    # ------------------------------------------------------
+
+    def request(
+        self,
+        service_name: str,
+        method: str,
+        url: str,
+        idempotent: Optional[bool] = None,
+        **kwargs,
+    ) -> requests.Response:
+        target = self.target(service_name)
+        probe = self._admit(target, url)
+        retryable = self._is_idempotent(method, idempotent)
+        hedge = retryable and method.upper() == "GET" and target.hedge_delay > 0
+
+        attempt = 0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    if hedge:
+                        resp = self._hedged(target, method, url, **kwargs)
+                    else:
+                        resp = target.session.request(method, url, **kwargs)
+                except requests.RequestException as e:
+                    target.metrics.observe(time.perf_counter() - start, ok=False)
+                    target.breaker.record_failure()
+                    probe = False
+                    if self._can_retry(target, attempt, retryable):
+                        time.sleep(self._backoff(target, attempt))
+                        # the breaker may have opened while we backed off
+                        probe = target.breaker.admit()
+                        if probe is not None:
+                            attempt += 1
+                            continue
+                        probe = False
+                    raise ServiceCallError(f"Error calling service '{service_name}' at {url}: {e}")
+
+                failed = resp.status_code >= 500
+                target.metrics.observe(time.perf_counter() - start, ok=not failed)
+                if failed:
+                    target.breaker.record_failure()
+                    probe = False
+                    if resp.status_code in RETRYABLE_STATUS and self._can_retry(target, attempt, retryable):
+                        time.sleep(self._backoff(target, attempt))
+                        probe = target.breaker.admit()
+                        if probe is not None:
+                            attempt += 1
+                            continue
+                        probe = False
+                else:
+                    target.breaker.record_success()
+                    probe = False
+                return resp
+        finally:
+            # cancelled / unexpected error before an outcome was recorded
+            if probe:
+                target.breaker.release_probe()
+
+    def _hedged(self, target: ServiceTarget, method: str, url: str, **kwargs) -> requests.Response:
+        """Send the request; if no answer within hedge_delay, race a second copy."""
+        pool = target.hedge_executor
+        first = pool.submit(target.session.request, method, url, **kwargs)
+        done, _ = wait([first], timeout=target.hedge_delay)
+        if done or not target.budget.try_spend():
+            return first.result()
+
+        target.metrics.hedges += 1
+        pending = {first, pool.submit(target.session.request, method, url, **kwargs)}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                if fut.exception() is None:
+                    return fut.result()
+                error = fut.exception()
+        raise error
+
+    # ------------------------------------------------------
+    # async
+    # ------------------------------------------------------
+
+    async def arequest(
+        self,
+        service_name: str,
+        method: str,
+        url: str,
+        idempotent: Optional[bool] = None,
+        **kwargs,
+    ) -> httpx.Response:
+        target = self.target(service_name)
+        probe = self._admit(target, url)
+        retryable = self._is_idempotent(method, idempotent)
+        hedge = retryable and method.upper() == "GET" and target.hedge_delay > 0
+
+        attempt = 0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    if hedge:
+                        resp = await self._ahedged(target, method, url, **kwargs)
+                    else:
+                        resp = await target.aclient.request(method, url, **kwargs)
+                except httpx.HTTPError as e:
+                    target.metrics.observe(time.perf_counter() - start, ok=False)
+                    target.breaker.record_failure()
+                    probe = False
+                    if self._can_retry(target, attempt, retryable):
+                        await asyncio.sleep(self._backoff(target, attempt))
+                        # the breaker may have opened while we backed off
+                        probe = target.breaker.admit()
+                        if probe is not None:
+                            attempt += 1
+                            continue
+                        probe = False
+                    raise ServiceCallError(f"Error calling service '{service_name}' at {url}: {e}")
+
+                failed = resp.status_code >= 500
+                target.metrics.observe(time.perf_counter() - start, ok=not failed)
+                if failed:
+                    target.breaker.record_failure()
+                    probe = False
+                    if resp.status_code in RETRYABLE_STATUS and self._can_retry(target, attempt, retryable):
+                        await asyncio.sleep(self._backoff(target, attempt))
+                        probe = target.breaker.admit()
+                        if probe is not None:
+                            attempt += 1
+                            continue
+                        probe = False
+                else:
+                    target.breaker.record_success()
+                    probe = False
+                return resp
+        finally:
+            # cancelled / unexpected error before an outcome was recorded
+            if probe:
+                target.breaker.release_probe()
+
+    async def _ahedged(self, target: ServiceTarget, method: str, url: str, **kwargs) -> httpx.Response:
+        first = asyncio.ensure_future(target.aclient.request(method, url, **kwargs))
+        done, _ = await asyncio.wait({first}, timeout=target.hedge_delay)
+        if done or not target.budget.try_spend():
+            return await first
+
+        target.metrics.hedges += 1
+        pending = {first, asyncio.ensure_future(target.aclient.request(method, url, **kwargs))}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
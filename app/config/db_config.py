@@ -3,6 +3,54 @@ import os
 
 RUNNING_ENV = os.getenv("RUNNING_ENV", "dev")
 
+
+def get_pool_config():
+    """
+    Connection pool settings (shared by every environment).
+
+    liveness:
+      "background" - ping idle connections every health_check_interval seconds (default)
+      "pre_ping"   - ping on every checkout (one extra round trip per request)
+      "none"       - rely on pool_recycle and disconnect handling only
+    """
+    return {
+        # FastAPI runs sync handlers on a 40-thread pool
+        "pool_size": int(os.getenv("DATABASE_POOL_SIZE", "20")),
+        "max_overflow": int(os.getenv("DATABASE_MAX_OVERFLOW", "20")),
+        # async handlers (get_async_db) share this many connections per worker; any
+        # number of in-flight requests can wait for one without holding a thread
+        "async_pool_size": int(os.getenv("DATABASE_ASYNC_POOL_SIZE", "20")),
+        "async_max_overflow": int(os.getenv("DATABASE_ASYNC_MAX_OVERFLOW", "20")),
+        # below MySQL wait_timeout, so idle connections are replaced before the server drops them
+        "pool_recycle": int(os.getenv("DATABASE_POOL_RECYCLE", "1800")),
+        "pool_timeout": float(os.getenv("DATABASE_POOL_TIMEOUT", "10")),
+        "liveness": os.getenv("DATABASE_POOL_LIVENESS", "background").lower(),
+        "health_check_interval": float(os.getenv("DATABASE_HEALTH_CHECK_INTERVAL", "30")),
+    }
+
+
+def get_replica_config():
+    """
+    Optional read replicas (same user / password / database as the primary).
+
+    DATABASE_REPLICA_HOSTS=replica1:3306,replica2   -> GET requests read from these
+    Replicas lagging more than max_lag_seconds, or failing, are skipped in
+    favour of the primary.
+    """
+    hosts = []
+    for entry in os.getenv("DATABASE_REPLICA_HOSTS", "").split(","):
+        host, _, port = entry.strip().partition(":")
+        if host:
+            hosts.append({"host": host, "port": port or os.getenv("DATABASE_PORT", "3306")})
+    return {
+        "hosts": hosts,
+        "max_lag_seconds": float(os.getenv("DATABASE_REPLICA_MAX_LAG", "5")),
+        "check_interval": float(os.getenv("DATABASE_REPLICA_CHECK_INTERVAL", "10")),
+        # reads of a user who just wrote go to the primary for this long
+        "sticky_seconds": float(os.getenv("DATABASE_READ_YOUR_WRITES_SECONDS", "5")),
+    }
+
+
 def get_db_config():
     if RUNNING_ENV == "dev":
         return {
@@ -11,6 +59,8 @@ def get_db_config():
             "password": os.getenv("DATABASE_PASSWORD"),
             "database": os.getenv("DATABASE_NAME"),
             "port": os.getenv("DATABASE_PORT", "3306"),
+            "pool": get_pool_config(),
+            "replicas": get_replica_config(),
         }
 
     # WE WILL USE LATER THAT
@@ -24,6 +74,8 @@ def get_db_config():
     #         "password": secrets["SN_DATABASE_PASSWORD"],
     #         "database": secrets["SN_DATABASE_NAME"],
     #         "port": secrets.get("SN_DATABASE_PORT", "3306"),
+    #         "pool": get_pool_config(),
+    #         "replicas": get_replica_config(),
     #     }
 
     else:
@@ -0,0 +1,282 @@
+# compression.py
+
+import gzip
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Bodies smaller than this go out as-is (compression overhead > savings)
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+# Compressed bodies of responses with an ETag are kept and reused (per worker)
+COMPRESSION_CACHE_MAX_ENTRIES = int(os.getenv("COMPRESSION_CACHE_MAX_ENTRIES", "256"))
+COMPRESSION_CACHE_MAX_BODY = int(os.getenv("COMPRESSION_CACHE_MAX_BODY", str(1024 * 1024)))
+
+# Already compressed / binary content types that don't shrink
+_SKIP_TYPES = (
+    "image/",
+    "video/",
+    "audio/",
+    "font/woff",
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/octet-stream",
+    "application/pdf",
+    "text/event-stream",  # flush-sensitive
+)
+
+
+class CompressionStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.responses = 0
+        self.compressed = 0
+        self.skipped_small = 0
+        self.skipped_type = 0
+        self.streamed = 0
+        self.cache_hits = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+
+    def add(self, **counters) -> None:
+        with self._lock:
+            for name, value in counters.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "responses": self.responses,
+                "compressed": self.compressed,
+                "streamed": self.streamed,
+                "skipped_small": self.skipped_small,
+                "skipped_type": self.skipped_type,
+                "cache_hits": self.cache_hits,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "ratio": round(self.bytes_out / self.bytes_in, 3) if self.bytes_in else None,
+                "cpu_ms": round(self.cpu_seconds * 1000.0, 1),
+            }
+
+
+compression_stats = CompressionStats()
+
+
+def _choose_encoding(accept_encoding: str):
+    accepted = set()
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        q = params.strip().replace(" ", "")
+        if q.startswith("q=") and q[2:] in ("0", "0.0", "0.00", "0.000"):
+            continue
+        accepted.add(token.strip().lower())
+    if "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+class _StreamCompressor:
+    """Incremental gzip / brotli; every chunk is flushed so streaming stays streaming."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+            self._z = None
+        else:
+            self._br = None
+            self._z = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)  # 31 = gzip container
+
+    def compress(self, data: bytes) -> bytes:
+        if self._br is not None:
+            return self._br.process(data) + self._br.flush()
+        return self._z.compress(data) + self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self._br is not None:
+            return self._br.finish()
+        return self._z.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """
+    gzip / brotli response compression as a plain ASGI middleware.
+
+    - negotiates br or gzip from Accept-Encoding (br preferred)
+    - leaves alone: bodies under minimum_size, binary / pre-compressed content
+      types, responses that already have a Content-Encoding, HEAD, 204 / 304
+    - single-body responses with an ETag reuse their compressed bytes from a
+      small LRU keyed by (path, ETag, encoding)
+    - streaming responses are compressed chunk by chunk, each chunk flushed
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MIN_SIZE,
+        gzip_level: int = COMPRESSION_GZIP_LEVEL,
+        brotli_quality: int = COMPRESSION_BROTLI_QUALITY,
+        cache_max_entries: int = COMPRESSION_CACHE_MAX_ENTRIES,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache_max_entries = cache_max_entries
+        self._cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = _choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, scope, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    # ------------------------------------------------------
+    # compressed-body cache
+    # ------------------------------------------------------
+
+    def cached(self, key: tuple):
+        with self._cache_lock:
+            body = self._cache.get(key)
+            if body is not None:
+                self._cache.move_to_end(key)
+            return body
+
+    def store(self, key: tuple, body: bytes) -> None:
+        if len(body) > COMPRESSION_CACHE_MAX_BODY:
+            return
+        with self._cache_lock:
+            self._cache[key] = body
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_max_entries:
+                self._cache.popitem(last=False)
+
+    def compress(self, encoding: str, body: bytes) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, scope: Scope, encoding: str, send: Send):
+        self.mw = middleware
+        self.path = scope["path"]
+        self.encoding = encoding
+        self.send_downstream = send
+
+        self.start: Message = None
+        self.passthrough = False
+        self.compressor: _StreamCompressor = None
+        self.buffer = b""
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu = 0.0
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            if (
+                message["status"] in (204, 304)
+                or "content-encoding" in headers
+                or "no-transform" in headers.get("cache-control", "")
+            ):
+                self.passthrough = True
+            elif content_type.startswith(_SKIP_TYPES):
+                self.passthrough = True
+                compression_stats.add(responses=1, skipped_type=1)
+            if self.passthrough:
+                await self.send_downstream(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send_downstream(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            self.buffer += body
+            if more_body and len(self.buffer) < self.mw.minimum_size:
+                return  # streaming: wait until we know it's worth compressing
+            if not more_body:
+                await self._send_whole(self.buffer)
+                return
+            # large enough streaming body: switch to chunked compression
+            self.compressor = _StreamCompressor(self.encoding, self.mw.gzip_level, self.mw.brotli_quality)
+            await self._send_start(content_length=None)
+            body, self.buffer = self.buffer, b""
+
+        start = time.process_time()
+        out = self.compressor.compress(body) if body else b""
+        if not more_body:
+            out += self.compressor.finish()
+        self.cpu += time.process_time() - start
+        self.bytes_in += len(body)
+        self.bytes_out += len(out)
+        await self.send_downstream({"type": "http.response.body", "body": out, "more_body": more_body})
+        if not more_body:
+            compression_stats.add(
+                responses=1, compressed=1, streamed=1,
+                bytes_in=self.bytes_in, bytes_out=self.bytes_out, cpu_seconds=self.cpu,
+            )
+
+    async def _send_whole(self, body: bytes) -> None:
+        if len(body) < self.mw.minimum_size:
+            compression_stats.add(responses=1, skipped_small=1)
+            await self.send_downstream(self.start)
+            await self.send_downstream({"type": "http.response.body", "body": body})
+            return
+
+        etag = Headers(raw=self.start["headers"]).get("etag")
+        key = (self.path, etag, self.encoding) if etag else None
+        compressed = self.mw.cached(key) if key else None
+        if compressed is not None:
+            compression_stats.add(responses=1, compressed=1, cache_hits=1, bytes_in=len(body), bytes_out=len(compressed))
+        else:
+            start = time.process_time()
+            compressed = self.mw.compress(self.encoding, body)
+            cpu = time.process_time() - start
+            if key:
+                self.mw.store(key, compressed)
+            compression_stats.add(
+                responses=1, compressed=1, bytes_in=len(body), bytes_out=len(compressed), cpu_seconds=cpu
+            )
+
+        await self._send_start(content_length=len(compressed))
+        await self.send_downstream({"type": "http.response.body", "body": compressed})
+
+    async def _send_start(self, content_length) -> None:
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if content_length is None:
+            if "content-length" in headers:
+                del headers["content-length"]
+        else:
+            headers["Content-Length"] = str(content_length)
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            # a strong ETag names exact bytes; the compressed body is a different representation
+            headers["ETag"] = "W/" + etag
+        await self.send_downstream(self.start)
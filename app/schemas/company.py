@@ -13,6 +13,23 @@ class CompanySearchResult(BaseModel):
     sector: str | None = None
 
 
+class CompanyTypeaheadItem(BaseModel):
+    company_id: str
+    legal_name: str
+    display_name: str | None = None
+    cin: str | None = None
+
+
+class CompanyDuplicateCandidate(BaseModel):
+    company_id: str
+    legal_name: str
+    cin: str | None = None
+    pan: str | None = None
+    lei: str | None = None
+    matched: list[str]
+    score: float
+
+
 class CompanyDetail(BaseModel):
     company_id: str
     legal_name: str
@@ -38,8 +55,7 @@ class CompanyCreateRequest(BaseModel):
     cin: str | None = None
 
 
-class RegulatoryUpsertRequest(BaseModel):
-    company_id: str
+class RegulatoryFields(BaseModel):
     cin: str | None = None
     pan: str
     lei: str | None = None
@@ -48,8 +64,13 @@ class RegulatoryUpsertRequest(BaseModel):
     ticker_symbol: str | None = None
 
 
-class IndustrySizeUpsertRequest(BaseModel):
+class RegulatoryUpsertRequest(RegulatoryFields):
     company_id: str
+    # version from the previous response; rejected with 409 if the row has changed since
+    expected_version: int | None = None
+
+
+class IndustrySizeFields(BaseModel):
     industry_sector_id: str
     sub_industry_id: str
     industry_code_id: str
@@ -61,6 +82,12 @@ class IndustrySizeUpsertRequest(BaseModel):
     spend_indicator_id: str
 
 
+class IndustrySizeUpsertRequest(IndustrySizeFields):
+    company_id: str
+    # see RegulatoryUpsertRequest.expected_version
+    expected_version: int | None = None
+
+
 class TaxRegistrationItem(BaseModel):
     tax_type: str
     tax_id: str
@@ -84,8 +111,7 @@ class ManufacturingReplaceRequest(BaseModel):
     items: list[ManufacturingItem]
 
 
-class EngagementCreateRequest(BaseModel):
-    company_id: str
+class EngagementFields(BaseModel):
     engagement_name: str
     engagement_code: str
     audit_type: str
@@ -93,6 +119,32 @@ class EngagementCreateRequest(BaseModel):
     audit_fy: str
 
 
+class EngagementCreateRequest(EngagementFields):
+    company_id: str
+
+
+class OnboardEngagementFields(EngagementFields):
+    # checked up front (422) so a bad value can't fail the whole onboarding at insert
+    audit_type: str = Field(..., pattern="^(Full-scope IA|IFC|SOX)$")
+
+
+# Screen 1 "Confirm & Run Analysis": the whole form in one request
+class CompanyOnboardRequest(BaseModel):
+    company: CompanyCreateRequest
+    regulatory: RegulatoryFields | None = None
+    industry_size: IndustrySizeFields | None = None
+    tax_registrations: list[TaxRegistrationItem] = Field(default_factory=list)
+    manufacturing: list[ManufacturingItem] = Field(default_factory=list)
+    engagement: OnboardEngagementFields | None = None
+
+
+# One company of a bulk import (app/services/company_import.py), after its
+# entity type / country have been resolved to master ids
+class CompanyImportRow(CompanyCreateRequest):
+    regulatory: RegulatoryFields | None = None
+    tax_registrations: list[TaxRegistrationItem] = Field(default_factory=list)
+
+
 class EngagementContextCreateRequest(BaseModel):
     engagement_id: str
     context: dict[str, Any]
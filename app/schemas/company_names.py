@@ -0,0 +1,77 @@
+"""
+company_names.py
+
+Duplicate-detection key for company legal names, persisted in
+company_master.normalized_name (indexed, filled by the column default) and
+used by app/services/company_dedupe.py.
+
+The key is the legal name lowercased, accents and punctuation dropped
+("P.V.T." -> "pvt", "&" -> "and") and legal-form words folded to one
+spelling, so "Acme Pvt. Ltd.", "ACME Private Limited" and "Acme (Pvt) Ltd"
+all become "acme pvt ltd". Changing these rules changes stored keys: run
+backfill_normalized_names() (company_dedupe.py) with a cleared column after.
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import List, Optional
+
+NORMALIZED_NAME_LENGTH = 255
+
+# multi-word legal forms, folded before single words
+_PHRASES = [
+    (re.compile(rf"\b{phrase}\b"), short)
+    for phrase, short in (
+        ("limited liability partnership", "llp"),
+        ("limited liability company", "llc"),
+        ("public limited company", "plc"),
+        ("one person company", "opc"),
+    )
+]
+
+_WORDS = {
+    "private": "pvt",
+    "pvte": "pvt",
+    "limited": "ltd",
+    "ltda": "ltd",
+    "company": "co",
+    "corporation": "corp",
+    "incorporated": "inc",
+    "&": "and",
+}
+
+# legal-form words: part of the key, left out of the fuzzy-match text
+LEGAL_FORMS = frozenset({"pvt", "ltd", "co", "corp", "inc", "llp", "llc", "plc", "opc", "the"})
+
+_JOIN_RE = re.compile(r"['.’]")  # "p.v.t." -> "pvt", "o'neil" -> "oneil"
+_SPLIT_RE = re.compile(r"[^0-9a-z&]+")
+
+
+def _tokens(name: str) -> List[str]:
+    text = unicodedata.normalize("NFKD", name)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    text = _JOIN_RE.sub("", text).replace("&", " & ")
+    text = " ".join(_SPLIT_RE.split(text))
+    for pattern, short in _PHRASES:
+        text = pattern.sub(short, text)
+    return [_WORDS.get(word, word) for word in text.split()]
+
+
+def normalize_company_name(name: Optional[str]) -> str:
+    """Stored duplicate key of a legal name (see module docstring)."""
+    if not name:
+        return ""
+    words = _tokens(name)
+    if words[:1] == ["the"] and len(words) > 1:
+        words = words[1:]
+    key = " ".join(words) or name.strip().lower()
+    return key[:NORMALIZED_NAME_LENGTH]
+
+
+def similarity_text(normalized_name: str) -> str:
+    """Normalized name without legal-form words, for fuzzy matching ("acme pvt ltd" -> "acme")."""
+    words = normalized_name.split()
+    core = [w for w in words if w not in LEGAL_FORMS]
+    return " ".join(core or words)
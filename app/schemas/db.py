@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import os
 from datetime import date, datetime
-from typing import Generator, Optional
+from typing import AsyncGenerator, Generator, Optional
 from uuid import uuid4
 
 from sqlalchemy import (
@@ -16,25 +17,110 @@ from sqlalchemy import (
     String,
     Text,
     UniqueConstraint,
-    create_engine,
     func,
     text,
 )
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, sessionmaker
 
 from urllib.parse import quote_plus
+
+from fastapi import Request
+
 from app.config.db_config import get_db_config
+from app.schemas.company_names import NORMALIZED_NAME_LENGTH, normalize_company_name
+from app.schemas.db_pool import (
+    AsyncPoolHealthChecker,
+    PoolHealthChecker,
+    create_async_pooled_engine,
+    create_pooled_engine,
+    pool_stats,
+)
+from app.schemas.db_routing import ReplicaRouter
 
 db = get_db_config()
+pool_config = db["pool"]
+replica_config = db["replicas"]
 
-DATABASE_URL = (
-    f"mysql+pymysql://"
-    f"{db['user']}:{quote_plus(db['password'])}"
-    f"@{db['host']}:{db['port']}/{db['database']}"
-)
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+
+def _mysql_url(host: str, port: str) -> str:
+    return (
+        f"mysql+pymysql://"
+        f"{db['user']}:{quote_plus(db['password'])}"
+        f"@{host}:{port}/{db['database']}"
+    )
+
+
+# DATABASE_URL / DATABASE_REPLICA_URLS override the MySQL settings, e.g. two
+# sqlite:///... files to exercise replica routing locally.
+DATABASE_URL = os.getenv("DATABASE_URL") or _mysql_url(db["host"], db["port"])
+REPLICA_URLS = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()] or [
+    _mysql_url(r["host"], r["port"]) for r in replica_config["hosts"]
+]
+
+# async twin of each URL, for get_async_db
+_ASYNC_DRIVERS = {"mysql": "aiomysql", "sqlite": "aiosqlite"}
+
+
+def _async_url(url: str) -> URL:
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    return parsed.set(drivername=f"{backend}+{_ASYNC_DRIVERS[backend]}")
+
+
+engine = create_pooled_engine(DATABASE_URL, pool_config)
+replica_engines = {f"replica{i + 1}": create_pooled_engine(url, pool_config) for i, url in enumerate(REPLICA_URLS)}
+# Sessions are lazy: a connection is checked out on the first query, not in
+# SessionLocal(), so handlers that never touch the DB never take one.
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
+db_router = ReplicaRouter(
+    SessionLocal,
+    replica_engines,
+    max_lag_seconds=replica_config["max_lag_seconds"],
+    check_interval=replica_config["check_interval"],
+    sticky_seconds=replica_config["sticky_seconds"],
+)
+
+# Async sessions for `async def` handlers. Their sync_session_class is
+# SessionLocal's, so an async commit on the primary fires the router's
+# after_commit hook (read-your-writes) just like a sync one.
+async_engine = create_async_pooled_engine(_async_url(DATABASE_URL), pool_config)
+async_replica_engines = {
+    name: create_async_pooled_engine(_async_url(url), pool_config)
+    for name, url in zip(replica_engines, REPLICA_URLS)
+}
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False, sync_session_class=SessionLocal.class_
+)
+# replica health tracking + failover to the primary, as for the sync replicas
+async_replica_sessions = db_router.attach_async(async_replica_engines, async_engine)
+
+_health_check_interval = pool_config["health_check_interval"] if pool_config["liveness"] == "background" else 0
+pool_health_checker = PoolHealthChecker(engine, _health_check_interval)
+# same for the async engines; started on the event loop by the app lifespan
+async_pool_health_checkers = [
+    AsyncPoolHealthChecker(e, _health_check_interval) for e in (async_engine, *async_replica_engines.values())
+]
+
+
+def db_pool_stats() -> dict:
+    return {
+        "liveness": pool_config["liveness"],
+        **pool_stats(engine),
+        "replicas": {name: pool_stats(e) for name, e in replica_engines.items()},
+        "routing": db_router.stats(),
+        "async": pool_stats(async_engine.sync_engine),
+        "async_replicas": {name: pool_stats(e.sync_engine) for name, e in async_replica_engines.items()},
+    }
+
+
+async def dispose_async_engines() -> None:
+    # async connections must be closed on the event loop before it shuts down
+    for e in (async_engine, *async_replica_engines.values()):
+        await e.dispose()
+
 
 class Base(DeclarativeBase):
     pass
@@ -44,11 +130,19 @@ def uuid_str() -> str:
     return str(uuid4())
 
 
+def _normalized_legal_name(context) -> str:
+    return normalize_company_name(context.get_current_parameters().get("legal_name"))
+
+
 class CompanyMaster(Base):
     __tablename__ = "company_master"
 
     company_id: Mapped[str] = mapped_column(String(36), primary_key=True, default=uuid_str)
     legal_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    # duplicate-detection key, derived from legal_name on insert (app/schemas/company_names.py)
+    normalized_name: Mapped[str] = mapped_column(
+        String(NORMALIZED_NAME_LENGTH), nullable=False, default=_normalized_legal_name, server_default=""
+    )
     display_name: Mapped[Optional[str]] = mapped_column(String(255))
     entity_type_id: Mapped[str] = mapped_column(String(36), nullable=False)
     country_id: Mapped[str] = mapped_column(String(36), nullable=False)
@@ -69,6 +163,8 @@ class CompanyMaster(Base):
 
     __table_args__ = (
         Index("idx_legal_name", "legal_name"),
+        Index("idx_normalized_name", "normalized_name"),
+        Index("idx_display_name", "display_name"),
         Index("idx_country", "country_id"),
         Index("idx_entity_type", "entity_type_id"),
         Index("idx_parent_group", "parent_group_id"),
@@ -89,12 +185,17 @@ class RegulatoryMaster(Base):
     ticker_symbol: Mapped[Optional[str]] = mapped_column(String(30))
     created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, server_default=func.now())
     updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
+    # bumped by every upsert (optimistic locking, see app/services/company_write.py)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default=text("1"))
     is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
 
     __table_args__ = (
         UniqueConstraint("company_id", name="uniq_company_reg"),
         Index("idx_company", "company_id"),
         Index("idx_country", "country_id"),
+        Index("idx_cin", "cin"),
+        Index("idx_pan", "pan"),
+        Index("idx_lei", "lei"),
     )
 
 
@@ -128,6 +229,8 @@ class CompanyIndustrySizeMaster(Base):
     spend_indicator_id: Mapped[str] = mapped_column(String(36), nullable=False)
     created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, server_default=func.now())
     updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
+    # bumped by every upsert (optimistic locking, see app/services/company_write.py)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default=text("1"))
     is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
 
     __table_args__ = (
@@ -813,10 +916,19 @@ class AuditPlanStatus(Base):
     is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
 
 
-def get_db() -> Generator:
-    db = SessionLocal()
+def get_db(request: Request) -> Generator:
+    # GET/HEAD -> a replica (when configured and healthy), everything else -> primary
+    db = db_router.session_for(request)
     try:
         yield db
     finally:
         db.close()
 
+
+async def get_async_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    # Same routing as get_db, for async handlers (aiomysql, no threadpool hop)
+    replica = db_router.route(request)
+    maker = AsyncSessionLocal if replica is None else async_replica_sessions[replica.name]
+    async with maker() as db:
+        db_router.tag_writer(db, request)
+        yield db
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Connection pool instrumentation + background liveness checks for db.py.
+#
+# Checkout waits, timeouts and new connections are recorded in the pool's
+# PoolMetrics, which is carried over when the pool is recreated (by
+# engine.dispose() or after a disconnect invalidates it).
+
+
+class PoolMetrics:
+    def __init__(self, window: int = 2048):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.max_wait_ms = 0.0
+        self._waits_ms = deque(maxlen=window)
+
+        self.health_checks = 0
+        self.health_check_failures = 0
+        self.last_health_check: Optional[float] = None
+        self.last_health_check_error: Optional[str] = None
+
+    def observe_checkout(self, wait_s: float) -> None:
+        wait_ms = wait_s * 1000.0
+        with self._lock:
+            self.checkouts += 1
+            self._waits_ms.append(wait_ms)
+            if wait_ms > self.max_wait_ms:
+                self.max_wait_ms = wait_ms
+
+    def snapshot(self, pool: QueuePool) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits_ms)
+
+        def pct(p: float) -> Optional[float]:
+            if not waits:
+                return None
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))], 2)
+
+        capacity = pool.size() + max(pool._max_overflow, 0)
+        checked_out = pool.checkedout()
+        return {
+            "pool_size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_out": checked_out,
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "saturation": round(checked_out / capacity, 3) if capacity else None,
+            "checkouts": self.checkouts,
+            "connects": self.connects,
+            "timeouts": self.timeouts,
+            "wait_ms": {"p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99), "max": round(self.max_wait_ms, 2)},
+            "health_checks": self.health_checks,
+            "health_check_failures": self.health_check_failures,
+            "last_health_check": self.last_health_check,
+            "last_health_check_error": self.last_health_check_error,
+        }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        self.metrics.observe_checkout(time.perf_counter() - start)
+        return record
+
+    def _create_connection(self):
+        self.metrics.connects += 1
+        return super()._create_connection()
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """Same instrumentation for async engines (checkouts wait on an asyncio-aware queue)."""
+
+
+def create_pooled_engine(url: str, pool_config: Dict[str, Any], **kwargs) -> Engine:
+    """Engine on an InstrumentedQueuePool sized by db_config.get_pool_config()."""
+    return create_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=pool_config["pool_size"],
+        max_overflow=pool_config["max_overflow"],
+        pool_recycle=pool_config["pool_recycle"],
+        pool_timeout=pool_config["pool_timeout"],
+        pool_pre_ping=pool_config["liveness"] == "pre_ping",
+        **kwargs,
+    )
+
+
+def create_async_pooled_engine(url, pool_config: Dict[str, Any], **kwargs) -> AsyncEngine:
+    """
+    Async engine (aiomysql) on an InstrumentedAsyncQueuePool. Requests waiting
+    for one of its connections wait on the event loop, not on a thread.
+    "background" liveness is AsyncPoolHealthChecker's job.
+    """
+    return create_async_engine(
+        url,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=pool_config["async_pool_size"],
+        max_overflow=pool_config["async_max_overflow"],
+        pool_recycle=pool_config["pool_recycle"],
+        pool_timeout=pool_config["pool_timeout"],
+        pool_pre_ping=pool_config["liveness"] == "pre_ping",
+        **kwargs,
+    )
+
+
+def pool_stats(engine: Engine) -> Dict[str, Any]:
+    return engine.pool.metrics.snapshot(engine.pool)
+
+
+class PoolHealthChecker:
+    """
+    Pings the database every `interval` seconds on a daemon thread instead of
+    pinging on every checkout (pool_pre_ping). The pool hands out idle
+    connections FIFO, so successive pings cycle through them; a ping that
+    hits a dead connection makes SQLAlchemy invalidate the whole pool, and
+    the next checkouts open fresh connections.
+    """
+
+    def __init__(self, engine: Engine, interval: float):
+        self.engine = engine
+        self.interval = interval
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        if self._thread is not None or self.interval <= 0:
+            return
+        self._thread = threading.Thread(target=self._run, name="db-pool-health", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def check(self) -> bool:
+        metrics = self.engine.pool.metrics
+        metrics.health_checks += 1
+        metrics.last_health_check = time.time()
+        try:
+            with self.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            metrics.last_health_check_error = None
+            return True
+        except Exception as e:
+            metrics.health_check_failures += 1
+            metrics.last_health_check_error = str(e)
+            print(f"[DBPool] health check failed: {e}")
+            return False
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            # only idle connections need checking; don't compete with requests for one
+            if self.engine.pool.checkedin() > 0:
+                self.check()
+
+
+class AsyncPoolHealthChecker:
+    """
+    PoolHealthChecker for an async engine: the same periodic ping, run as a
+    task on the event loop (start() / stop() from the app lifespan).
+    """
+
+    def __init__(self, engine: AsyncEngine, interval: float):
+        self.engine = engine
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is not None or self.interval <= 0:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="db-async-pool-health")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def check(self) -> bool:
+        metrics = self.engine.sync_engine.pool.metrics
+        metrics.health_checks += 1
+        metrics.last_health_check = time.time()
+        try:
+            async with self.engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            metrics.last_health_check_error = None
+            return True
+        except Exception as e:
+            metrics.health_check_failures += 1
+            metrics.last_health_check_error = str(e)
+            print(f"[DBPool] async health check failed: {e}")
+            return False
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            # only idle connections need checking; don't compete with requests for one
+            if self.engine.sync_engine.pool.checkedin() > 0:
+                await self.check()
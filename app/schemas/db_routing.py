@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from fastapi import Request
+from sqlalchemy import event, exc, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.deps import extract_user_identity
+
+# Read-replica routing for get_db.
+#
+# GET / HEAD requests get a session on a healthy replica whose replication
+# lag is within max_lag_seconds; everything else (and every read when no
+# replica qualifies) goes to the primary. After a user's request commits on
+# the primary, that user's reads stay on the primary for sticky_seconds so
+# they see their own writes (per worker).
+#
+# route() only decides where a request reads from, so the async sessions
+# in db.py (get_async_db) follow the same rules and share the health state.
+#
+# A disconnect on a replica takes it out of rotation, and the statement that
+# hit it is re-run on the primary (ReplicaSession), so the request still
+# gets its answer.
+
+READ_METHODS = frozenset({"GET", "HEAD"})
+
+
+class ReplicaSession(Session):
+    """
+    Read-only session on a replica. A statement failing with a disconnect is
+    retried once on info["primary_bind"], and the rest of the session stays
+    there. Only GET / HEAD requests get one, so re-running is safe.
+    """
+
+    def _on_primary(self, method, *args, **kwargs):
+        try:
+            return method(*args, **kwargs)
+        except exc.DBAPIError as e:
+            primary = self.info.get("primary_bind")
+            if not e.connection_invalidated or primary is None or self.bind is primary:
+                raise
+            self.rollback()
+            self.bind = primary
+            router = self.info.get("router")
+            if router is not None:
+                router.failovers += 1
+            print(f"[DBRouter] replica read failed, retrying on the primary: {e.orig}")
+            return method(*args, **kwargs)
+
+    def execute(self, *args, **kwargs):
+        return self._on_primary(super().execute, *args, **kwargs)
+
+    def scalar(self, *args, **kwargs):
+        return self._on_primary(super().scalar, *args, **kwargs)
+
+    def scalars(self, *args, **kwargs):
+        return self._on_primary(super().scalars, *args, **kwargs)
+
+
+class Replica:
+    def __init__(self, name: str, engine: Engine, session_info: Dict[str, Any]):
+        self.name = name
+        self.engine = engine
+        self.sessionmaker = sessionmaker(
+            bind=engine, class_=ReplicaSession, autocommit=False, autoflush=False, info=session_info
+        )
+        self.healthy = True  # optimistic until the first check
+        self.lag_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.last_check: Optional[float] = None
+        self.reads = 0
+
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        primary_sessionmaker: sessionmaker,
+        replicas: Dict[str, Engine],
+        max_lag_seconds: float = 5.0,
+        check_interval: float = 10.0,
+        sticky_seconds: float = 5.0,
+    ):
+        self.primary_sessionmaker = primary_sessionmaker
+        primary = {"primary_bind": primary_sessionmaker.kw["bind"], "router": self}
+        self.replicas = [Replica(name, e, primary) for name, e in replicas.items()]
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self.sticky_seconds = sticky_seconds
+
+        self._rr = itertools.count()
+        self._sticky: Dict[str, float] = {}  # user_id -> read-from-primary-until
+        self._sticky_lock = threading.Lock()
+        self._checker: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self.primary_reads = 0
+        self.sticky_reads = 0
+        self.fallback_reads = 0
+        self.failovers = 0  # statements re-run on the primary after a replica disconnect
+
+        # a connection error on a replica takes it out of rotation until the next check
+        for replica in self.replicas:
+            event.listen(replica.engine, "handle_error", self._on_error(replica))
+
+        # remember who wrote, for read-your-writes
+        event.listen(primary_sessionmaker, "after_commit", self._after_commit)
+
+    # ------------------------------------------------------
+    # session selection
+    # ------------------------------------------------------
+
+    def route(self, request: Request) -> Optional[Replica]:
+        """Replica that should serve this request's reads, or None for the primary."""
+        if request.method not in READ_METHODS:
+            return None
+
+        if not self.replicas:
+            self.primary_reads += 1
+            return None
+
+        user_id, _ = extract_user_identity(request)
+        if user_id and self._is_sticky(user_id):
+            self.sticky_reads += 1
+            return None
+        return self.read_replica()
+
+    def read_replica(self) -> Optional[Replica]:
+        """A usable replica, or None (counted as a fallback) if none qualifies."""
+        replica = self._pick_replica()
+        if replica is None:
+            self.fallback_reads += 1
+            return None
+        replica.reads += 1
+        return replica
+
+    def tag_writer(self, session, request: Request) -> None:
+        # primary sessions of write requests remember the user for _after_commit
+        if request.method not in READ_METHODS:
+            session.info["user_id"], _ = extract_user_identity(request)
+
+    def attach_async(
+        self, engines: Dict[str, AsyncEngine], primary: AsyncEngine
+    ) -> Dict[str, async_sessionmaker]:
+        """
+        Register the async twins of the replica engines (same names) and return
+        their session makers: same health tracking and primary failover.
+        """
+        makers = {}
+        for replica in self.replicas:
+            engine = engines[replica.name]
+            event.listen(engine.sync_engine, "handle_error", self._on_error(replica))
+            makers[replica.name] = async_sessionmaker(
+                engine,
+                autoflush=False,
+                expire_on_commit=False,
+                sync_session_class=ReplicaSession,
+                info={"primary_bind": primary.sync_engine, "router": self},
+            )
+        return makers
+
+    def session_for(self, request: Request) -> Session:
+        replica = self.route(request)
+        if replica is not None:
+            return replica.sessionmaker()
+        session = self.primary_sessionmaker()
+        self.tag_writer(session, request)
+        return session
+
+    def _pick_replica(self) -> Optional[Replica]:
+        usable = [
+            r for r in self.replicas
+            if r.healthy and (r.lag_seconds is None or r.lag_seconds <= self.max_lag_seconds)
+        ]
+        if not usable:
+            return None
+        return usable[next(self._rr) % len(usable)]
+
+    # ------------------------------------------------------
+    # read-your-writes
+    # ------------------------------------------------------
+
+    def _after_commit(self, session: Session) -> None:
+        user_id = session.info.get("user_id")
+        if user_id and self.replicas:
+            self.mark_write(user_id)
+
+    def mark_write(self, user_id: str) -> None:
+        now = time.monotonic()
+        with self._sticky_lock:
+            self._sticky[user_id] = now + self.sticky_seconds
+            if len(self._sticky) > 10000:
+                self._sticky = {u: t for u, t in self._sticky.items() if t > now}
+
+    def _is_sticky(self, user_id: str) -> bool:
+        until = self._sticky.get(user_id)
+        return until is not None and time.monotonic() < until
+
+    # ------------------------------------------------------
+    # health / lag
+    # ------------------------------------------------------
+
+    def _on_error(self, replica: Replica):
+        def handle_error(context) -> None:
+            if context.is_disconnect:
+                replica.healthy = False
+                replica.last_error = str(context.original_exception)
+                print(f"[DBRouter] replica {replica.name} marked unhealthy: {replica.last_error}")
+        return handle_error
+
+    def check_replicas(self) -> None:
+        for replica in self.replicas:
+            replica.last_check = time.time()
+            try:
+                with replica.engine.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+                    replica.lag_seconds = _replication_lag(conn)
+                replica.healthy = True
+                replica.last_error = None
+            except Exception as e:
+                replica.healthy = False
+                replica.last_error = str(e)
+                print(f"[DBRouter] replica {replica.name} check failed: {e}")
+
+    def start(self) -> None:
+        if not self.replicas or self._checker is not None or self.check_interval <= 0:
+            return
+
+        stop = self._stop = threading.Event()
+
+        def run():
+            while True:
+                self.check_replicas()
+                if stop.wait(self.check_interval):
+                    return
+
+        self._checker = threading.Thread(target=run, name="db-replica-check", daemon=True)
+        self._checker.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._checker = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "replicas": {
+                r.name: {
+                    "healthy": r.healthy,
+                    "lag_seconds": r.lag_seconds,
+                    "reads": r.reads,
+                    "last_check": r.last_check,
+                    "last_error": r.last_error,
+                }
+                for r in self.replicas
+            },
+            "primary_reads": self.primary_reads,
+            "sticky_reads": self.sticky_reads,
+            "fallback_reads": self.fallback_reads,
+            "failovers": self.failovers,
+            "max_lag_seconds": self.max_lag_seconds,
+        }
+
+
+def _replication_lag(conn) -> Optional[float]:
+    """
+    Seconds behind the source, from SHOW REPLICA STATUS (MySQL 8.0.22+) or
+    SHOW SLAVE STATUS. None when it can't be measured (not MySQL, not a
+    replica, or no REPLICATION CLIENT privilege); a stopped SQL thread counts
+    as infinitely behind.
+    """
+    if conn.dialect.name != "mysql":
+        return None
+    for statement, column in (
+        ("SHOW REPLICA STATUS", "Seconds_Behind_Source"),
+        ("SHOW SLAVE STATUS", "Seconds_Behind_Master"),
+    ):
+        try:
+            row = conn.execute(text(statement)).mappings().first()
+        except exc.DBAPIError:
+            continue
+        if row is None:
+            return None
+        lag = row.get(column)
+        return float("inf") if lag is None else float(lag)
+    return None
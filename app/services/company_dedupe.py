@@ -0,0 +1,479 @@
+"""
+company_dedupe.py
+
+Duplicate detection for company_master, used by /company-create,
+/company-onboard, /regulatory-upsert, the bulk import and
+GET /company-duplicates.
+
+Every exact check is an index probe, never a scan:
+
+- company_master.normalized_name (idx_normalized_name): the legal name with
+  case, punctuation and legal-form suffixes folded ("Acme Pvt. Ltd." and
+  "ACME Private Limited" share the key "acme pvt ltd"), see
+  app/schemas/company_names.py
+- regulatory_master.cin / pan / lei (idx_cin, idx_pan, idx_lei)
+
+A company is a duplicate (409) when another company has the same normalized
+name and shares its CIN, PAN or LEI. find_candidates() is looser: any
+company matching the name key or one of the identifiers, for the UI to show
+before creating.
+
+Fuzzy mode adds similar names from NameSimilarityIndex, an in-process
+trigram index over the normalized names (legal-form words left out). Like
+the typeahead index it is loaded at startup, updated on writes and fully
+reloaded every DEDUPE_INDEX_RELOAD_SECONDS.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import bindparam, exists, literal, or_, select, union_all, update
+from sqlalchemy.orm import Session
+
+from app.schemas.company_names import normalize_company_name, similarity_text
+from app.schemas.db import CompanyMaster, RegulatoryMaster, SessionLocal
+
+# minimum Dice similarity (0..1) of name trigrams for a fuzzy candidate
+DEDUPE_FUZZY_THRESHOLD = float(os.getenv("DEDUPE_FUZZY_THRESHOLD", "0.6"))
+# grams on more names than this ("ind", "ser", ...) aren't used to find fuzzy candidates
+DEDUPE_FUZZY_MAX_POSTINGS = int(os.getenv("DEDUPE_FUZZY_MAX_POSTINGS", "20000"))
+DEDUPE_INDEX_RELOAD_SECONDS = int(os.getenv("DEDUPE_INDEX_RELOAD_SECONDS", "600"))
+# Rebuild once this fraction of docs are tombstones from updates
+DEDUPE_COMPACT_RATIO = float(os.getenv("DEDUPE_COMPACT_RATIO", "0.25"))
+
+IDENTIFIERS = ("cin", "pan", "lei")
+
+company = CompanyMaster.__table__
+regulatory = RegulatoryMaster.__table__
+
+# (normalized name, identifier field, identifier value)
+ConflictKey = Tuple[str, str, str]
+
+
+class DuplicateCompany(Exception):
+    """Another company with the same normalized legal name has this CIN / PAN / LEI."""
+
+    def __init__(self, field: str, value: str, company_id: Optional[str] = None):
+        super().__init__(f"{field.upper()} {value} already used by company {company_id}")
+        self.field = field
+        self.value = value
+        self.company_id = company_id
+
+    @property
+    def message(self) -> str:
+        return f"Company with same legal name and {self.field.upper()} already exists"
+
+
+@dataclass
+class DuplicateCandidate:
+    company_id: str
+    legal_name: str
+    cin: Optional[str] = None
+    pan: Optional[str] = None
+    lei: Optional[str] = None
+    # "name" (same normalized name), "cin" / "pan" / "lei", or "similar_name" (fuzzy only)
+    matched: List[str] = field(default_factory=list)
+    score: float = 1.0
+
+
+def identifiers_of(values: Dict[str, Any]) -> Dict[str, str]:
+    """The CIN / PAN / LEI given in `values`, trimmed and uppercased (empty ones left out).
+
+    Only the comparison is folded: the stored values stay as the client sent them.
+    """
+    found = {f: (values.get(f) or "").strip().upper() for f in IDENTIFIERS}
+    return {f: value for f, value in found.items() if value}
+
+
+# =========================
+# Exact checks
+# =========================
+
+def name_key_of(company_id: str):
+    """Stored normalized_name of `company_id`, as a scalar subquery."""
+    mine = company.alias("this_company")
+    return select(mine.c.normalized_name).where(mine.c.company_id == company_id).scalar_subquery()
+
+
+def _conflicts(name_key: Any, identifiers: Dict[str, str], exclude_company_id: Optional[str]):
+    # idx_normalized_name -> uniq_company_reg: only companies sharing the name key are visited.
+    # Identifiers are stored as sent; the column's case-insensitive MySQL collation matches the folded value
+    # (aliased so it doesn't correlate with a company_master in an enclosing statement)
+    other = company.alias("other_company")
+    stmt = (
+        select(other.c.company_id, *[regulatory.c[f] for f in IDENTIFIERS])
+        .select_from(other.join(regulatory, regulatory.c.company_id == other.c.company_id))
+        .where(
+            other.c.normalized_name == name_key,
+            or_(*[regulatory.c[f] == value for f, value in identifiers.items()]),
+        )
+    )
+    if exclude_company_id is not None:
+        stmt = stmt.where(other.c.company_id != exclude_company_id)
+    return stmt
+
+
+def conflict_exists(name_key: Any, identifiers: Dict[str, str], exclude_company_id: Optional[str] = None):
+    """EXISTS clause for a duplicate of (name_key, identifiers), to guard a write in the same statement."""
+    return exists(_conflicts(name_key, identifiers, exclude_company_id))
+
+
+def find_conflict(
+    db: Session, name_key: Any, identifiers: Dict[str, str], exclude_company_id: Optional[str] = None
+) -> Optional[DuplicateCompany]:
+    """The duplicate that (name_key, identifiers) would create, or None."""
+    if not identifiers:
+        return None
+    row = db.execute(_conflicts(name_key, identifiers, exclude_company_id).limit(1)).first()
+    if row is None:
+        return None
+    matched = next(
+        (f for f, value in identifiers.items() if (row._mapping[f] or "").upper() == value.upper()),
+        next(iter(identifiers)),
+    )
+    return DuplicateCompany(matched, identifiers[matched], row.company_id)
+
+
+def check_duplicate(
+    db: Session, legal_name: str, identifiers: Dict[str, str], exclude_company_id: Optional[str] = None
+) -> None:
+    """Raise DuplicateCompany if another company has this legal name (normalized) and one of the identifiers."""
+    conflict = find_conflict(db, normalize_company_name(legal_name), identifiers, exclude_company_id)
+    if conflict is not None:
+        raise conflict
+
+
+def conflict_keys(name_key: str, identifiers: Dict[str, str]) -> Set[ConflictKey]:
+    return {(name_key, f, value.upper()) for f, value in identifiers.items()}
+
+
+def existing_conflict_keys(db: Session, name_keys: Iterable[str]) -> Set[ConflictKey]:
+    """Conflict keys of the stored companies with one of `name_keys` (one IN probe on idx_normalized_name)."""
+    name_keys = set(name_keys)
+    if not name_keys:
+        return set()
+    rows = db.execute(
+        select(company.c.normalized_name, *[regulatory.c[f] for f in IDENTIFIERS])
+        .select_from(company.join(regulatory, regulatory.c.company_id == company.c.company_id))
+        .where(company.c.normalized_name.in_(name_keys))
+    )
+    keys: Set[ConflictKey] = set()
+    for row in rows:
+        keys |= conflict_keys(row.normalized_name, identifiers_of(row._mapping))
+    return keys
+
+
+# =========================
+# Candidates
+# =========================
+
+def find_candidates(
+    db: Session,
+    legal_name: Optional[str] = None,
+    identifiers: Optional[Dict[str, str]] = None,
+    fuzzy: bool = False,
+    limit: int = 10,
+) -> List[DuplicateCandidate]:
+    """Companies matching the name key or any identifier (plus similar names when fuzzy), best first."""
+    identifiers = identifiers or {}
+    name_key = normalize_company_name(legal_name)
+
+    # one UNION ALL of index probes: idx_normalized_name, idx_cin, idx_pan, idx_lei
+    probes = [
+        select(regulatory.c.company_id, literal(f).label("matched")).where(regulatory.c[f] == value)
+        for f, value in identifiers.items()
+    ]
+    if name_key:
+        probes.append(
+            select(company.c.company_id, literal("name").label("matched")).where(company.c.normalized_name == name_key)
+        )
+
+    matched: Dict[str, List[str]] = {}
+    if probes:
+        for company_id, reason in db.execute(union_all(*probes)):
+            matched.setdefault(company_id, []).append(reason)
+
+    scores: Dict[str, float] = {}
+    if fuzzy and name_key:
+        if not name_index.ready:
+            load_name_index()
+        for company_id, score in name_index.similar(name_key, limit):
+            scores[company_id] = score
+            matched.setdefault(company_id, [])
+    if not matched:
+        return []
+
+    rows = db.execute(
+        select(company.c.company_id, company.c.legal_name, *[regulatory.c[f] for f in IDENTIFIERS])
+        .select_from(company.outerjoin(regulatory, regulatory.c.company_id == company.c.company_id))
+        .where(company.c.company_id.in_(list(matched)))
+    )
+    candidates = []
+    for row in rows:
+        reasons = sorted(set(matched[row.company_id]))
+        candidates.append(
+            DuplicateCandidate(
+                company_id=row.company_id,
+                legal_name=row.legal_name,
+                cin=row.cin,
+                pan=row.pan,
+                lei=row.lei,
+                matched=reasons or ["similar_name"],
+                score=1.0 if "name" in reasons else scores.get(row.company_id, 1.0),
+            )
+        )
+    candidates.sort(key=lambda c: (-len(c.matched), -c.score, c.legal_name))
+    return candidates[:limit]
+
+
+# =========================
+# Fuzzy name index
+# =========================
+
+def _name_grams(text: str) -> Set[str]:
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameSimilarityIndex:
+    """Trigram index over normalized company names, ranked by Dice similarity."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+        self.ready = False
+        self.loaded_at: Optional[float] = None
+        self.last_load_ms: Optional[float] = None
+
+        self.queries = 0
+        self.updates = 0
+        self.compactions = 0
+        self._query_time_s = 0.0
+
+        self._reloader: Optional[threading.Thread] = None
+        # upserts made while a reload() is running, replayed onto its result
+        self._pending: Optional[List[Tuple[str, str]]] = None
+        self._reloading = 0
+
+    def _reset(self) -> None:
+        # doc id -> fields (parallel lists, doc id is the list position)
+        self._company_ids: List[Optional[str]] = []  # None = tombstone
+        self._texts: List[str] = []
+        self._live: Dict[str, int] = {}  # company_id -> current doc id
+        self._dead = 0
+        self._postings: Dict[str, array] = {}
+
+    def _add(self, company_id: str, normalized_name: str) -> None:
+        company_id = sys.intern(str(company_id))
+        text = similarity_text(normalized_name)
+
+        doc = len(self._company_ids)
+        previous = self._live.get(company_id)
+        if previous is not None:
+            self._company_ids[previous] = None
+            self._dead += 1
+        self._live[company_id] = doc
+        self._company_ids.append(company_id)
+        self._texts.append(text)
+
+        for gram in _name_grams(text):
+            postings = self._postings.get(gram)
+            if postings is None:
+                postings = self._postings[sys.intern(gram)] = array("I")
+            postings.append(doc)
+
+    def load(self, rows: Iterable[Tuple[str, str]]) -> None:
+        """Replace the whole index with (company_id, normalized_name) rows."""
+        self.reload(lambda: rows)
+
+    def reload(self, loader: Callable[[], Iterable[Tuple[str, str]]]) -> None:
+        """Replace the whole index with loader()'s rows, keeping upserts made meanwhile (as TypeaheadIndex)."""
+        start = time.perf_counter()
+        with self._lock:
+            self._reloading += 1
+            if self._pending is None:
+                self._pending = []
+        try:
+            fresh = NameSimilarityIndex.__new__(NameSimilarityIndex)
+            NameSimilarityIndex._reset(fresh)
+            for company_id, normalized_name in loader():
+                NameSimilarityIndex._add(fresh, company_id, normalized_name)
+        except BaseException:
+            with self._lock:
+                self._end_reload()
+            raise
+
+        with self._lock:
+            for company_id, normalized_name in self._pending:
+                NameSimilarityIndex._add(fresh, company_id, normalized_name)
+            self._end_reload()
+            for name in ("_company_ids", "_texts", "_live", "_dead", "_postings"):
+                setattr(self, name, getattr(fresh, name))
+            self.ready = True
+            self.loaded_at = time.time()
+            self.last_load_ms = round((time.perf_counter() - start) * 1000.0, 2)
+
+    def _end_reload(self) -> None:
+        self._reloading -= 1
+        if not self._reloading:
+            self._pending = None
+
+    def upsert(self, company_id: str, legal_name: str) -> None:
+        """Add or replace one company. Only kept for a running reload until the index has been loaded."""
+        normalized_name = normalize_company_name(legal_name)
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((company_id, normalized_name))
+            if not self.ready:
+                return
+            self._add(company_id, normalized_name)
+            self.updates += 1
+            if self._dead > DEDUPE_COMPACT_RATIO * len(self._company_ids):
+                rows = [(cid, self._texts[doc]) for cid, doc in self._live.items()]
+                self._reset()
+                for company_id, text in rows:
+                    self._add(company_id, text)
+                self.compactions += 1
+
+    def similar(
+        self, normalized_name: str, limit: int, threshold: float = DEDUPE_FUZZY_THRESHOLD
+    ) -> List[Tuple[str, float]]:
+        """(company_id, similarity) of the closest names at or above `threshold`, best first."""
+        start = time.perf_counter()
+        grams = _name_grams(similarity_text(normalized_name))
+        scored: List[Tuple[float, str]] = []
+        with self._lock:
+            lists = [p for p in (self._postings.get(g) for g in grams) if p is not None]
+            if lists:
+                # candidates from the rarer grams, then rescored exactly on the full gram sets
+                rare = [p for p in lists if len(p) <= DEDUPE_FUZZY_MAX_POSTINGS] or [min(lists, key=len)]
+                overlap: Counter = Counter()
+                for postings in rare:
+                    overlap.update(postings)
+                for doc, _ in overlap.most_common(limit * 10):
+                    company_id = self._company_ids[doc]
+                    if company_id is None:
+                        continue
+                    other = _name_grams(self._texts[doc])
+                    score = 2 * len(grams & other) / (len(grams) + len(other))
+                    if score >= threshold:
+                        scored.append((round(score, 4), company_id))
+
+        self.queries += 1
+        self._query_time_s += time.perf_counter() - start
+        scored.sort(key=lambda s: (-s[0], s[1]))
+        return [(company_id, score) for score, company_id in scored[:limit]]
+
+    def start_auto_reload(self, loader: Callable[[], Iterable[Tuple[str, str]]]) -> None:
+        """Reload from `loader` every DEDUPE_INDEX_RELOAD_SECONDS on a daemon thread."""
+        if DEDUPE_INDEX_RELOAD_SECONDS <= 0 or self._reloader is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(DEDUPE_INDEX_RELOAD_SECONDS)
+                try:
+                    self.reload(loader)
+                except Exception as e:
+                    print(f"[Dedupe] name index reload failed, keeping current index: {e}")
+
+        self._reloader = threading.Thread(target=run, name="dedupe-name-reload", daemon=True)
+        self._reloader.start()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            docs = len(self._company_ids)
+            live = len(self._live)
+            dead = self._dead
+            grams = len(self._postings)
+            postings = sum(len(p) for p in self._postings.values())
+        return {
+            "ready": self.ready,
+            "companies": live,
+            "tombstones": dead,
+            "docs": docs,
+            "grams": grams,
+            "postings": postings,
+            "queries": self.queries,
+            "avg_query_us": round(self._query_time_s / self.queries * 1e6, 1) if self.queries else None,
+            "updates": self.updates,
+            "compactions": self.compactions,
+            "loaded_at": self.loaded_at,
+            "last_load_ms": self.last_load_ms,
+        }
+
+
+name_index = NameSimilarityIndex()
+
+
+def company_name_rows(db: Session) -> List[Tuple[str, str]]:
+    rows = db.execute(select(company.c.company_id, company.c.normalized_name, company.c.legal_name))
+    # rows not backfilled yet are keyed on the fly
+    return [(cid, key or normalize_company_name(legal_name)) for cid, key, legal_name in rows]
+
+
+def _load_with_new_session() -> List[Tuple[str, str]]:
+    # primary, like the typeahead loader
+    db = SessionLocal()
+    try:
+        return company_name_rows(db)
+    finally:
+        db.close()
+
+
+_initial_load_lock = threading.Lock()
+
+
+def load_name_index() -> None:
+    """Initial load (startup or first use), then keep it fresh in the background."""
+    with _initial_load_lock:
+        if name_index.ready:
+            return
+        name_index.start_auto_reload(_load_with_new_session)
+        name_index.reload(_load_with_new_session)
+
+
+# =========================
+# Backfill
+# =========================
+
+def backfill_normalized_names(
+    session_factory: Callable[[], Session] = SessionLocal, batch_size: int = 1000
+) -> int:
+    """Fill normalized_name for rows that have none (created before the column existed); returns rows updated."""
+    updated, after = 0, ""
+    while True:
+        db = session_factory()
+        try:
+            rows = db.execute(
+                select(company.c.company_id, company.c.legal_name)
+                .where(company.c.normalized_name == "", company.c.company_id > after)
+                .order_by(company.c.company_id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            db.execute(
+                update(company)
+                .where(company.c.company_id == bindparam("_id"))
+                # keep updated_at: the row's content (and its ETag) hasn't changed
+                .values(normalized_name=bindparam("_key"), updated_at=company.c.updated_at),
+                [{"_id": r.company_id, "_key": normalize_company_name(r.legal_name)} for r in rows],
+            )
+            db.commit()
+        finally:
+            db.close()
+        updated += len(rows)
+        after = rows[-1].company_id
+    if updated:
+        print(f"[Dedupe] backfilled normalized_name for {updated} companies")
+    return updated
@@ -0,0 +1,334 @@
+"""
+company_import.py
+
+Bulk company import from CSV or NDJSON, used by POST /company-import and
+from the command line (import_companies.py):
+
+    python import_companies.py companies.csv --rejects rejects.ndjson
+
+Input is read as a stream and processed IMPORT_CHUNK_SIZE rows at a time,
+so memory stays flat however big the file is (apart from the set of
+(name key, identifier) pairs seen so far, used to catch in-file duplicates).
+Per chunk:
+
+- entity type / country are resolved from names, codes or ids against the
+  cached masters (app/services/master_cache.py), no DB lookups
+- the whole chunk is validated in one pydantic call against the
+  /company-create and /regulatory-upsert rules (CompanyImportRow); rows
+  that fail are rejected with the error, the rest carry on
+- duplicates (same normalized legal name and CIN / PAN / LEI, in the file or
+  already stored, see app/services/company_dedupe.py) are rejected with one
+  index probe per chunk
+- company_master, regulatory_master and company_tax_registration rows go in
+  as one multi-row INSERT each, and the chunk commits
+
+A chunk that fails at the database is rolled back and all its rows are
+rejected; earlier chunks stay committed.
+
+Flat row shape (CSV header / NDJSON keys):
+  legal_name, display_name, entity_type (or entity_type_id), country (or
+  country_id), registered_address, operational_hq_address, is_part_of_group,
+  parent_group_id, cin, pan, lei, listed_status, exchange_list ("NSE|BSE"),
+  ticker_symbol, tax_registrations ("GST:29ABCDE1234F1Z5|VAT:123")
+NDJSON may also give exchange_list / tax_registrations as JSON lists.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.schemas.company import CompanyImportRow
+from app.schemas.company_names import normalize_company_name
+from app.schemas.db import (
+    CompanyMaster,
+    CompanyTaxRegistration,
+    RegulatoryMaster,
+    SessionLocal,
+    uuid_str,
+)
+from app.services.company_dedupe import (
+    DuplicateCompany,
+    conflict_keys,
+    existing_conflict_keys,
+    identifiers_of,
+    name_index,
+)
+from app.services.master_cache import master_cache
+from app.services.typeahead import typeahead_index
+
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "2000"))
+
+company = CompanyMaster.__table__
+regulatory = RegulatoryMaster.__table__
+tax_registration = CompanyTaxRegistration.__table__
+
+_REGULATORY_FIELDS = ("cin", "pan", "lei", "listed_status", "exchange_list", "ticker_symbol")
+_ROWS = TypeAdapter(List[CompanyImportRow])
+
+# (line number, raw record, error)
+Reject = Callable[[int, Any, str], None]
+
+
+class CompanyImportError(Exception):
+    """The input can't be imported at all (bad format, masters unavailable)."""
+
+
+@dataclass
+class ImportStats:
+    rows: int = 0
+    inserted: int = 0
+    rejected: int = 0
+    regulatory_rows: int = 0
+    tax_registration_rows: int = 0
+    chunks: int = 0
+    seconds: float = 0.0
+    rows_per_second: Optional[float] = None
+
+
+# =========================
+# Reading
+# =========================
+
+def read_records(stream: TextIO, fmt: str) -> Iterator[Tuple[int, Any, Optional[str]]]:
+    """Yield (line, record, parse error) from a CSV or NDJSON text stream."""
+    if fmt == "csv":
+        # line numbers count the header as line 1
+        for line, record in enumerate(csv.DictReader(stream), start=2):
+            yield line, record, None
+    elif fmt == "ndjson":
+        for line, text in enumerate(stream, start=1):
+            if not text.strip():
+                continue
+            try:
+                record = json.loads(text)
+            except ValueError as e:
+                yield line, text.rstrip("\n"), f"Invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield line, record, "Each line must be a JSON object"
+                continue
+            yield line, record, None
+    else:
+        raise CompanyImportError(f"Unsupported format '{fmt}' (csv or ndjson)")
+
+
+def _split(value: Any) -> Optional[list]:
+    if value is None or isinstance(value, list):
+        return value
+    parts = [p.strip() for p in str(value).split("|") if p.strip()]
+    return parts or None
+
+
+def _tax_items(value: Any) -> list:
+    if isinstance(value, list):
+        return value
+    items = []
+    for part in _split(value) or []:
+        tax_type, _, tax_id = part.partition(":")
+        items.append({"tax_type": tax_type.strip(), "tax_id": tax_id.strip()})
+    return items
+
+
+# =========================
+# Master lookups
+# =========================
+
+class MasterLookup:
+    """Entity type / country resolution by id, name or (country) code, case-insensitive."""
+
+    def __init__(self):
+        try:
+            self.entity_types = self._index(master_cache.get("entity-types").items, ("id", "name"))
+            self.countries = self._index(master_cache.get("countries").items, ("id", "name", "code"))
+        except Exception as e:
+            raise CompanyImportError(f"Master data unavailable: {e}") from e
+
+    @staticmethod
+    def _index(items: Iterable[Dict[str, Any]], fields: Tuple[str, ...]) -> Dict[str, str]:
+        index = {}
+        for item in items:
+            for field in fields:
+                if item.get(field):
+                    index.setdefault(str(item[field]).strip().lower(), item["id"])
+        return index
+
+    @staticmethod
+    def _resolve(index: Dict[str, str], value: Any, label: str) -> Optional[str]:
+        if value in (None, ""):
+            return None  # left for validation to report as missing
+        found = index.get(str(value).strip().lower())
+        if found is None:
+            raise ValueError(f"Unknown {label} '{value}'")
+        return found
+
+    def shape(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Flat import record -> CompanyImportRow input. Raises ValueError on unknown masters."""
+        row = {k: (None if v == "" else v) for k, v in record.items() if k is not None}
+        row["entity_type_id"] = self._resolve(
+            self.entity_types, row.pop("entity_type", None) or row.get("entity_type_id"), "entity type"
+        )
+        row["country_id"] = self._resolve(self.countries, row.pop("country", None) or row.get("country_id"), "country")
+        if row.get("is_part_of_group") is None:
+            row.pop("is_part_of_group", None)
+        row["exchange_list"] = _split(row.get("exchange_list"))
+        row["tax_registrations"] = _tax_items(row.get("tax_registrations"))
+
+        fields = {f: row.pop(f, None) for f in _REGULATORY_FIELDS}
+        row["cin"] = fields["cin"]
+        # a regulatory row is written when any regulatory value is given (pan / listed_status then required)
+        row["regulatory"] = fields if any(v is not None for v in fields.values()) else None
+        return row
+
+
+# =========================
+# Import
+# =========================
+
+def _validate(batch: List[Tuple[int, Any, Dict[str, Any]]], reject: Reject) -> List[Tuple[int, CompanyImportRow]]:
+    """Validate a chunk in one call; rows with errors are rejected, the rest returned as models."""
+    try:
+        models = _ROWS.validate_python([shaped for _, _, shaped in batch])
+        return [(line, model) for (line, _, _), model in zip(batch, models)]
+    except ValidationError as e:
+        errors: Dict[int, List[str]] = {}
+        for err in e.errors():
+            index, *loc = err["loc"]
+            errors.setdefault(index, []).append(f"{'.'.join(map(str, loc))}: {err['msg']}")
+
+    good = []
+    for index, (line, raw, shaped) in enumerate(batch):
+        if index in errors:
+            reject(line, raw, "; ".join(errors[index]))
+        else:
+            good.append((line, raw, shaped))
+    return _validate(good, reject) if good else []
+
+
+def _conflict_keys(model: CompanyImportRow, name_key: str) -> set:
+    identifiers = identifiers_of(model.regulatory.model_dump()) if model.regulatory else identifiers_of({"cin": model.cin})
+    return conflict_keys(name_key, identifiers)
+
+
+def _write_chunk(
+    session_factory: Callable[[], Session],
+    rows: List[Tuple[int, Any, CompanyImportRow]],
+    seen: set,
+    created_by: str,
+    reject: Reject,
+    stats: ImportStats,
+) -> None:
+    db = session_factory()
+    # rows a database failure would reject: all of them until the duplicate
+    # pass has rejected its own, then only the ones about to be written
+    pending = [(line, raw) for line, raw, _ in rows]
+    try:
+        name_keys = [normalize_company_name(m.legal_name) for _, _, m in rows]
+        taken = existing_conflict_keys(db, name_keys)  # plus `seen` from earlier chunks
+
+        companies, registrations, taxes, written = [], [], [], []
+        for (line, raw, model), name_key in zip(rows, name_keys):
+            keys = _conflict_keys(model, name_key)
+            clash = next((key for key in keys if key in taken or key in seen), None)
+            if clash is not None:
+                reject(line, raw, DuplicateCompany(clash[1], clash[2]).message)
+                continue
+            taken |= keys
+
+            company_id = uuid_str()
+            companies.append(
+                {
+                    "company_id": company_id,
+                    "normalized_name": name_key,
+                    "created_by": created_by,
+                    **model.model_dump(exclude={"cin", "regulatory", "tax_registrations"}),
+                }
+            )
+            if model.regulatory:
+                registrations.append(
+                    {"registration_id": uuid_str(), "company_id": company_id, **model.regulatory.model_dump()}
+                )
+            taxes.extend(
+                {"tax_reg_id": uuid_str(), "company_id": company_id, **item.model_dump()}
+                for item in model.tax_registrations
+            )
+            written.append((line, raw, model, company_id, keys))
+        pending = [(line, raw) for line, raw, _, _, _ in written]
+
+        # one multi-row INSERT per table (executemany batched by SQLAlchemy / PyMySQL)
+        for table, values in ((company, companies), (regulatory, registrations), (tax_registration, taxes)):
+            if values:
+                db.execute(table.insert(), values)
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        print(f"[CompanyImport] chunk of {len(pending)} rows failed: {e}")
+        for line, raw in pending:
+            reject(line, raw, f"Database error: {e.__class__.__name__}")
+        return
+    finally:
+        db.close()
+
+    for _, _, _, _, keys in written:
+        seen.update(keys)
+    stats.inserted += len(written)
+    stats.regulatory_rows += len(registrations)
+    stats.tax_registration_rows += len(taxes)
+    for _, _, model, company_id, _ in written:
+        cin = model.regulatory.cin if model.regulatory else None  # only the stored CIN
+        typeahead_index.upsert(company_id, model.legal_name, model.display_name, cin)
+        name_index.upsert(company_id, model.legal_name)
+
+
+def import_companies(
+    stream: TextIO,
+    fmt: str,
+    created_by: str,
+    reject: Reject,
+    session_factory: Callable[[], Session] = SessionLocal,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> ImportStats:
+    """Import every record of `stream`; rejected rows are passed to `reject`."""
+    start = time.perf_counter()
+    lookup = MasterLookup()
+    stats = ImportStats()
+    seen: set = set()
+
+    def counted_reject(line: int, raw: Any, error: str) -> None:
+        stats.rejected += 1
+        reject(line, raw, error)
+
+    def flush(batch: List[Tuple[int, Any, Dict[str, Any]]]) -> None:
+        valid = {line: model for line, model in _validate(batch, counted_reject)}
+        rows = [(line, raw, valid[line]) for line, raw, _ in batch if line in valid]
+        if rows:
+            _write_chunk(session_factory, rows, seen, created_by, counted_reject, stats)
+        stats.chunks += 1
+
+    batch: List[Tuple[int, Any, Dict[str, Any]]] = []
+    for line, record, error in read_records(stream, fmt):
+        stats.rows += 1
+        if error is None:
+            try:
+                batch.append((line, record, lookup.shape(record)))
+            except ValueError as e:
+                error = str(e)
+        if error is not None:
+            counted_reject(line, record, error)
+        if len(batch) >= chunk_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+    stats.seconds = round(time.perf_counter() - start, 3)
+    stats.rows_per_second = round(stats.rows / stats.seconds, 1) if stats.seconds else None
+    return stats
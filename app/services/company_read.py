@@ -0,0 +1,81 @@
+"""
+company_read.py
+
+Projection queries for the hot company read paths (/company-search and
+/company-master). They run on the Core tables instead of ORM entities:
+
+- only the columns the response needs are selected (search never pulls the
+  TEXT address columns), and rows skip entity construction / the identity map
+- rows are mapped straight to response dicts
+- the search base statement is built once at import and the detail lookups
+  are lambda statements, so a request neither rebuilds the statement tree
+  nor recompiles the SQL (SQLAlchemy's compiled cache is keyed on structure)
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.sql.lambdas import StatementLambdaElement
+
+from app.schemas.db import CompanyIndustrySizeMaster, CompanyMaster, RegulatoryMaster
+
+company = CompanyMaster.__table__
+regulatory = RegulatoryMaster.__table__
+industry_size = CompanyIndustrySizeMaster.__table__
+
+
+# =========================
+# /company-search
+# =========================
+
+SEARCH_SELECT = select(
+    company.c.company_id,
+    company.c.legal_name,
+    company.c.country_id,
+    regulatory.c.cin,
+    industry_size.c.industry_sector_id.label("sector"),
+).select_from(
+    company.outerjoin(regulatory, regulatory.c.company_id == company.c.company_id).outerjoin(
+        industry_size, industry_size.c.company_id == company.c.company_id
+    )
+)
+
+
+def search_item(row) -> Dict[str, Any]:
+    return {
+        "company_id": row.company_id,
+        "legal_name": row.legal_name,
+        "country_id": row.country_id,
+        "cin": row.cin,
+        "sector": None if row.sector is None else str(row.sector),
+    }
+
+
+# =========================
+# /company-master
+# =========================
+
+DETAIL_COLUMNS = (
+    company.c.company_id,
+    company.c.legal_name,
+    company.c.display_name,
+    company.c.entity_type_id,
+    company.c.country_id,
+    company.c.registered_address,
+    company.c.operational_hq_address,
+    company.c.is_part_of_group,
+    company.c.parent_group_id,
+    company.c.status,
+    company.c.updated_at,
+)
+
+
+def detail_stmt(company_id: str) -> StatementLambdaElement:
+    # company_id becomes a bound parameter; the statement itself is cached
+    return lambda_stmt(lambda: select(*DETAIL_COLUMNS).where(company.c.company_id == company_id))
+
+
+def updated_at_stmt(company_id: str) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(company.c.updated_at).where(company.c.company_id == company_id))
@@ -0,0 +1,229 @@
+"""
+company_write.py
+
+Write paths for the Screen 1 company child tables.
+
+Upserts: the one-row-per-company tables (regulatory_master,
+company_industry_size_master), used by /regulatory-upsert and
+/industry-size-upsert.
+
+Each upsert is one INSERT ... SELECT ... ON DUPLICATE KEY UPDATE keyed on the
+table's UNIQUE (company_id):
+
+- the SELECT reads the company row, so an unknown company_id inserts nothing
+- for regulatory data, a NOT EXISTS in the same SELECT rejects a CIN / PAN /
+  LEI already held by another company with the same normalized legal name
+  (app/services/company_dedupe.py; index probes on idx_normalized_name)
+- with expected_version, the SELECT also requires the stored row to be at
+  that version (optimistic locking); every update bumps `version`
+
+The update sets version = LAST_INSERT_ID(version + 1), so the new version
+comes back in the OK packet without another query. Only when nothing was
+written does _diagnose() run a few reads to say why.
+
+Replaces: the repeater lists (company_tax_registration,
+company_manufacturing_list), used by /tax-registration-replace and
+/manufacturing-replace. replace_children() diffs the submitted list against
+the stored rows and only touches what changed: one batched DELETE, one
+executemany UPDATE and one multi-row INSERT at most, in the caller's
+transaction.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import Table, bindparam, delete, exists, func, literal, select, update
+from sqlalchemy.dialects.mysql import insert
+from sqlalchemy.orm import Session
+
+from app.schemas.db import (
+    CompanyIndustrySizeMaster,
+    CompanyManufacturingList,
+    CompanyMaster,
+    CompanyTaxRegistration,
+    RegulatoryMaster,
+    uuid_str,
+)
+from app.services.company_dedupe import conflict_exists, find_conflict, identifiers_of, name_key_of
+
+company = CompanyMaster.__table__
+regulatory = RegulatoryMaster.__table__
+industry_size = CompanyIndustrySizeMaster.__table__
+tax_registration = CompanyTaxRegistration.__table__
+manufacturing = CompanyManufacturingList.__table__
+
+# ids per DELETE ... WHERE id IN (...)
+_DELETE_BATCH = 1000
+
+
+class CompanyNotFound(Exception):
+    pass
+
+
+class VersionConflict(Exception):
+    def __init__(self, current_version: Optional[int]):
+        super().__init__(f"Record is at version {current_version}")
+        self.current_version = current_version
+
+
+@dataclass
+class UpsertResult:
+    created: bool
+    version: int
+
+
+def _upsert(
+    db: Session,
+    table: Table,
+    id_column: str,
+    company_id: str,
+    values: Dict[str, Any],
+    expected_version: Optional[int],
+    guards: list,
+) -> Optional[UpsertResult]:
+    # SELECT <new id>, company_id, <values...> FROM company_master WHERE company_id = :id [AND guards]
+    columns = [id_column, "company_id", *values]
+    source = select(
+        literal(uuid_str(), table.c[id_column].type),
+        company.c.company_id,
+        *[literal(value, table.c[name].type) for name, value in values.items()],
+    ).where(company.c.company_id == company_id, *guards)
+    if expected_version is not None:
+        source = source.where(
+            exists().where(table.c.company_id == company_id, table.c.version == expected_version)
+        )
+
+    stmt = insert(table).from_select(columns, source, include_defaults=False)
+    stmt = stmt.on_duplicate_key_update(
+        **{name: stmt.inserted[name] for name in values},
+        updated_at=func.now(),
+        version=func.last_insert_id(table.c.version + 1),
+    )
+    result = db.execute(stmt)
+    # affected rows (CLIENT_FOUND_ROWS): 1 = inserted, 2 = updated, 0 = SELECT matched nothing
+    if result.rowcount == 0:
+        return None
+    if result.rowcount == 1:
+        return UpsertResult(created=True, version=1)
+    return UpsertResult(created=False, version=result.lastrowid)
+
+
+def _diagnose(
+    db: Session, table: Table, company_id: str, identifiers: Optional[Dict[str, str]] = None
+) -> Exception:
+    if db.scalar(select(company.c.company_id).where(company.c.company_id == company_id)) is None:
+        return CompanyNotFound(company_id)
+    if identifiers:
+        conflict = find_conflict(db, name_key_of(company_id), identifiers, exclude_company_id=company_id)
+        if conflict is not None:
+            return conflict
+    return VersionConflict(db.scalar(select(table.c.version).where(table.c.company_id == company_id)))
+
+
+def upsert_regulatory(
+    db: Session, company_id: str, values: Dict[str, Any], expected_version: Optional[int] = None
+) -> UpsertResult:
+    """Insert or update the company's regulatory row. Raises CompanyNotFound / DuplicateCompany / VersionConflict."""
+    identifiers = identifiers_of(values)
+    guards = [~conflict_exists(name_key_of(company_id), identifiers, company_id)] if identifiers else []
+    outcome = _upsert(db, regulatory, "registration_id", company_id, values, expected_version, guards)
+    if outcome is None:
+        raise _diagnose(db, regulatory, company_id, identifiers)
+    return outcome
+
+
+def upsert_industry_size(
+    db: Session, company_id: str, values: Dict[str, Any], expected_version: Optional[int] = None
+) -> UpsertResult:
+    """Insert or update the company's industry / size row. Raises CompanyNotFound / VersionConflict."""
+    outcome = _upsert(db, industry_size, "industry_size_id", company_id, values, expected_version, [])
+    if outcome is None:
+        raise _diagnose(db, industry_size, company_id)
+    return outcome
+
+
+# =========================
+# Diff-based list replace
+# =========================
+
+@dataclass
+class ReplaceSummary:
+    added: int = 0
+    updated: int = 0
+    removed: int = 0
+    unchanged: int = 0
+
+
+def replace_children(
+    db: Session,
+    table: Table,
+    id_column: str,
+    company_id: str,
+    key_fields: Sequence[str],
+    value_fields: Sequence[str],
+    items: List[Dict[str, Any]],
+) -> ReplaceSummary:
+    """
+    Make the company's rows in `table` equal to `items`.
+
+    Items are matched to stored rows by key_fields (duplicates pair up in
+    order); a match with different value_fields is updated in place, the
+    rest are inserted or deleted. The stored rows are locked (FOR UPDATE)
+    while the diff is applied, so concurrent replaces serialize.
+    """
+    id_col = table.c[id_column]
+    fields = [*key_fields, *value_fields]
+    current = db.execute(
+        select(id_col, *[table.c[f] for f in fields]).where(table.c.company_id == company_id).with_for_update()
+    ).all()
+
+    stored = defaultdict(list)
+    for row in current:
+        stored[tuple(row._mapping[f] for f in key_fields)].append(row)
+
+    summary = ReplaceSummary()
+    inserts, updates = [], []
+    for item in items:
+        matches = stored.get(tuple(item[f] for f in key_fields))
+        if not matches:
+            inserts.append({id_column: uuid_str(), "company_id": company_id, **{f: item[f] for f in fields}})
+            continue
+        row = matches.pop(0)
+        if all(row._mapping[f] == item[f] for f in value_fields):
+            summary.unchanged += 1
+        else:
+            updates.append({"_id": row._mapping[id_column], **{f"_{f}": item[f] for f in value_fields}})
+    removed = [row._mapping[id_column] for rows in stored.values() for row in rows]
+
+    for start in range(0, len(removed), _DELETE_BATCH):
+        db.execute(delete(table).where(id_col.in_(removed[start:start + _DELETE_BATCH])))
+    if updates:
+        db.execute(
+            update(table)
+            .where(id_col == bindparam("_id"))
+            .values({f: bindparam(f"_{f}") for f in value_fields}),
+            updates,
+        )
+    if inserts:
+        # executemany: batched into multi-row INSERT ... VALUES by SQLAlchemy / PyMySQL
+        db.execute(table.insert(), inserts)
+
+    summary.added, summary.updated, summary.removed = len(inserts), len(updates), len(removed)
+    return summary
+
+
+def replace_tax_registrations(db: Session, company_id: str, items: List[Dict[str, Any]]) -> ReplaceSummary:
+    # (tax_type, tax_id) identifies a registration; only its country can change in place
+    return replace_children(
+        db, tax_registration, "tax_reg_id", company_id, ("tax_type", "tax_id"), ("country_id",), items
+    )
+
+
+def replace_manufacturing_sites(db: Session, company_id: str, items: List[Dict[str, Any]]) -> ReplaceSummary:
+    # a plant is identified by its name; its location can change in place
+    return replace_children(
+        db, manufacturing, "manufacturing_id", company_id, ("plant_name",), ("city", "state", "country_id"), items
+    )
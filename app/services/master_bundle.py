@@ -0,0 +1,125 @@
+"""
+master_bundle.py
+
+GET /masters/bundle: every Screen 1 master list in one response.
+
+The bundle is built from the master cache (master_cache.py) and kept as
+ready-to-send bytes: raw JSON, gzip and brotli. It is keyed by the versions
+of the masters it contains, so it is only rebuilt after one of them actually
+changes.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+import brotli
+
+from app.services.master_cache import MasterDataCache, master_cache
+
+MASTER_BUNDLE_GZIP_LEVEL = int(os.getenv("MASTER_BUNDLE_GZIP_LEVEL", "9"))
+MASTER_BUNDLE_BROTLI_QUALITY = int(os.getenv("MASTER_BUNDLE_BROTLI_QUALITY", "11"))
+# distinct `include` subsets kept pre-built
+MASTER_BUNDLE_MAX_VARIANTS = int(os.getenv("MASTER_BUNDLE_MAX_VARIANTS", "32"))
+
+
+@dataclass
+class BundleBody:
+    version: str
+    identity: bytes
+    gzip: bytes
+    br: bytes
+
+    def encoded(self, accept_encoding: str) -> Tuple[bytes, Optional[str]]:
+        """Best pre-built body for the client's Accept-Encoding -> (bytes, Content-Encoding)."""
+        accepted = _accepted_encodings(accept_encoding)
+        if "br" in accepted:
+            return self.br, "br"
+        if "gzip" in accepted:
+            return self.gzip, "gzip"
+        return self.identity, None
+
+
+def _accepted_encodings(header: str) -> set:
+    accepted = set()
+    for part in (header or "").split(","):
+        token, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        if token:
+            accepted.add(token.strip().lower())
+    return accepted
+
+
+class MasterBundleCache:
+    def __init__(self, cache: MasterDataCache):
+        self.cache = cache
+        self._bodies: "OrderedDict[Tuple[str, ...], BundleBody]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.builds = 0
+
+    @staticmethod
+    def _version(entries) -> str:
+        return hashlib.sha256(
+            "|".join(f"{n}:{e.version}" for n, e in entries.items()).encode()
+        ).hexdigest()[:16]
+
+    def version(self, names: Sequence[str]) -> str:
+        """Version the bundle for `names` has right now, without building it."""
+        return self._version({name: self.cache.get(name) for name in names})
+
+    def get(self, names: Sequence[str]) -> BundleBody:
+        # MasterDataCache.get keeps each master fresh; a hit costs a dict lookup
+        entries = {name: self.cache.get(name) for name in names}
+        version = self._version(entries)
+
+        key = tuple(names)
+        with self._lock:
+            body = self._bodies.get(key)
+            if body is not None and body.version == version:
+                self._bodies.move_to_end(key)
+                self.hits += 1
+                return body
+
+        raw = json.dumps(
+            {"version": version, "masters": {n: e.items for n, e in entries.items()}},
+            separators=(",", ":"),
+            default=str,
+        ).encode()
+        body = BundleBody(
+            version=version,
+            identity=raw,
+            gzip=gzip.compress(raw, compresslevel=MASTER_BUNDLE_GZIP_LEVEL, mtime=0),
+            br=brotli.compress(raw, quality=MASTER_BUNDLE_BROTLI_QUALITY),
+        )
+        with self._lock:
+            self._bodies[key] = body
+            self._bodies.move_to_end(key)
+            while len(self._bodies) > MASTER_BUNDLE_MAX_VARIANTS:
+                self._bodies.popitem(last=False)
+            self.builds += 1
+        return body
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            variants = {
+                ",".join(key): {
+                    "version": b.version,
+                    "bytes": len(b.identity),
+                    "gzip_bytes": len(b.gzip),
+                    "br_bytes": len(b.br),
+                }
+                for key, b in self._bodies.items()
+            }
+        return {"hits": self.hits, "builds": self.builds, "variants": variants}
+
+
+master_bundle = MasterBundleCache(master_cache)
@@ -0,0 +1,312 @@
+"""
+master_cache.py
+
+In-process cache for the Screen 1 reference/master tables served by
+app/api/master.py. These tables almost never change, so each one is loaded
+once into a ready-to-serve list of dicts and kept until:
+
+- MASTER_CACHE_TTL seconds pass (or, for countries, the next st_dt / e_dt
+  boundary, whichever is sooner), or
+- it is dropped with invalidate() (POST /masters/cache/invalidate).
+
+Each entry carries a version: a hash of its serialized contents, so it only
+changes when the data does. A cache hit never opens a DB session; on expiry
+one request reloads the entry while concurrent ones keep serving the old copy.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.schemas.db import (
+    AnnualTurnoverMaster,
+    BusinessModelMaster,
+    CountryMaster,
+    EmployeeMaster,
+    EntityTypeMaster,
+    GroupMaster,
+    IndustryCodeMaster,
+    IndustryMaster,
+    NatureOfOperationMaster,
+    SessionLocal,
+    SubIndustryMaster,
+    TransactionIndicator,
+)
+
+MASTER_CACHE_TTL = int(os.getenv("MASTER_CACHE_TTL", "300"))
+# After a failed reload, keep serving the old entry and retry after this long
+MASTER_CACHE_RETRY_SECONDS = int(os.getenv("MASTER_CACHE_RETRY_SECONDS", "30"))
+
+
+class MasterCacheError(Exception):
+    """A master table could not be loaded and there is no cached copy to serve."""
+
+
+@dataclass
+class MasterDef:
+    name: str
+    load: Callable[[Session], List[Dict[str, Any]]]
+    # sort / cursor key of one item; items are kept sorted by it
+    key: Callable[[Dict[str, Any]], tuple]
+    # optional: seconds until the loaded data goes stale on its own (time-bounded rows)
+    expires_in: Optional[Callable[[Session], Optional[float]]] = None
+
+
+@dataclass
+class MasterEntry:
+    items: List[Dict[str, Any]]
+    version: str
+    loaded_at: float
+    expires_at: float
+
+
+def content_version(items: List[Dict[str, Any]]) -> str:
+    raw = json.dumps(items, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+def _by_id(key: str) -> Callable[[Dict[str, Any]], tuple]:
+    return lambda item: (item[key],)
+
+
+# =========================
+# Master tables
+# =========================
+
+def _load_countries(db: Session) -> List[Dict[str, Any]]:
+    now = func.now()
+    rows = db.query(CountryMaster).filter(
+        CountryMaster.active.is_(True),
+        CountryMaster.is_active.is_(True),
+        CountryMaster.st_dt <= now,
+        CountryMaster.e_dt > now,
+    )
+    return [
+        {
+            "id": r.country_id,
+            "name": r.country_name,
+            "code": r.country_code,
+            "currency_code": r.currency_code,
+            "currency_name": r.currency_name,
+        }
+        for r in rows
+    ]
+
+
+def _countries_expire_in(db: Session) -> Optional[float]:
+    # the served set changes on its own when a row's e_dt passes or a future st_dt starts
+    now = func.now()
+    active = (CountryMaster.active.is_(True), CountryMaster.is_active.is_(True))
+    db_now, next_end = db.query(now, func.min(CountryMaster.e_dt)).filter(
+        *active, CountryMaster.st_dt <= now, CountryMaster.e_dt > now
+    ).one()
+    next_start = db.query(func.min(CountryMaster.st_dt)).filter(*active, CountryMaster.st_dt > now).scalar()
+    boundaries = [b for b in (next_end, next_start) if b is not None]
+    if not boundaries or db_now is None:
+        return None
+    return max(0.0, (min(boundaries) - db_now).total_seconds())
+
+
+MASTERS: Dict[str, MasterDef] = {
+    m.name: m
+    for m in [
+        MasterDef(
+            "entity-types",
+            lambda db: [{"id": r.entity_type_id, "name": r.name} for r in db.query(EntityTypeMaster)],
+            _by_id("id"),
+        ),
+        MasterDef(
+            "groups",
+            lambda db: [{"id": r.group_id, "name": r.name} for r in db.query(GroupMaster)],
+            _by_id("id"),
+        ),
+        MasterDef(
+            "industries",
+            lambda db: [{"id": r.industry_id, "name": r.name} for r in db.query(IndustryMaster)],
+            _by_id("id"),
+        ),
+        MasterDef(
+            "sub-industries",
+            lambda db: [
+                {"id": r.sub_industry_id, "sector_id": r.industry_id, "name": r.sub_industry_name}
+                for r in db.query(SubIndustryMaster)
+            ],
+            _by_id("id"),
+        ),
+        MasterDef(
+            "industry-codes",
+            lambda db: [
+                {"id": r.industry_code_id, "code_type": r.code_type, "description": r.code_description}
+                for r in db.query(IndustryCodeMaster)
+            ],
+            _by_id("id"),
+        ),
+        MasterDef(
+            "nature-operations",
+            lambda db: [
+                {"id": r.nature_of_operation_id, "name": r.name} for r in db.query(NatureOfOperationMaster)
+            ],
+            _by_id("id"),
+        ),
+        MasterDef(
+            "business-models",
+            lambda db: [{"id": r.business_model_id, "name": r.name} for r in db.query(BusinessModelMaster)],
+            _by_id("id"),
+        ),
+        MasterDef(
+            "annual-turnovers",
+            lambda db: [
+                {"id": r.annual_turnover_id, "label": r.band_label} for r in db.query(AnnualTurnoverMaster)
+            ],
+            _by_id("id"),
+        ),
+        MasterDef(
+            "employees",
+            lambda db: [{"id": r.employee_band_id, "label": r.band_label} for r in db.query(EmployeeMaster)],
+            _by_id("id"),
+        ),
+        MasterDef(
+            "transaction-indicators",
+            lambda db: [
+                {"id": r.indicator_id, "type": r.indicator_type, "label": r.indicator_label}
+                for r in db.query(TransactionIndicator)
+            ],
+            _by_id("id"),
+        ),
+        MasterDef(
+            "countries",
+            _load_countries,
+            lambda item: (item["name"], item["id"]),
+            _countries_expire_in,
+        ),
+    ]
+}
+
+
+# =========================
+# Cache
+# =========================
+
+class MasterDataCache:
+    def __init__(
+        self,
+        masters: Dict[str, MasterDef],
+        ttl: int = MASTER_CACHE_TTL,
+        # primary, not a replica: invalidate() + warm() right after a write must
+        # not cache pre-write rows from a lagging replica for a whole TTL
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        self.masters = masters
+        self.ttl = ttl
+        self._session_factory = session_factory
+        self._entries: Dict[str, MasterEntry] = {}
+        self._locks = {name: threading.Lock() for name in masters}
+
+        self.hits = {name: 0 for name in masters}
+        self.misses = {name: 0 for name in masters}
+        self.loads = {name: 0 for name in masters}
+        self.load_errors = {name: 0 for name in masters}
+
+    def peek(self, name: str) -> Optional[MasterEntry]:
+        """Fresh cached entry for `name`, or None if get() would have to touch the DB."""
+        entry = self._entries.get(name)
+        if entry is not None and time.time() < entry.expires_at:
+            self.hits[name] += 1
+            return entry
+        return None
+
+    def get(self, name: str) -> MasterEntry:
+        """Cached entry for `name`, loading or refreshing it if needed."""
+        fresh = self.peek(name)
+        if fresh is not None:
+            return fresh
+        entry = self._entries.get(name)
+
+        self.misses[name] += 1
+        lock = self._locks[name]
+        if entry is not None:
+            # expired: one caller refreshes, the rest serve the old copy meanwhile
+            if not lock.acquire(blocking=False):
+                return entry
+        else:
+            lock.acquire()
+        try:
+            current = self._entries.get(name)
+            if current is not None and current is not entry and time.time() < current.expires_at:
+                return current  # refreshed by another thread while we waited
+            return self._load(name, stale=entry)
+        finally:
+            lock.release()
+
+    def _load(self, name: str, stale: Optional[MasterEntry]) -> MasterEntry:
+        master = self.masters[name]
+        db = self._session_factory()
+        try:
+            items = sorted(master.load(db), key=master.key)
+            ttl = float(self.ttl)
+            if master.expires_in is not None:
+                natural = master.expires_in(db)
+                if natural is not None:
+                    ttl = min(ttl, natural)
+        except Exception as e:
+            self.load_errors[name] += 1
+            if stale is None:
+                raise MasterCacheError(f"Failed to load master '{name}': {e}") from e
+            print(f"[MasterCache] reload of '{name}' failed, serving cached copy: {e}")
+            stale.expires_at = time.time() + MASTER_CACHE_RETRY_SECONDS
+            return stale
+        finally:
+            db.close()
+
+        now = time.time()
+        entry = MasterEntry(items=items, version=content_version(items), loaded_at=now, expires_at=now + ttl)
+        self._entries[name] = entry
+        self.loads[name] += 1
+        return entry
+
+    def invalidate(self, names: Optional[Iterable[str]] = None) -> List[str]:
+        """Drop cached entries (all when `names` is None); they reload on next use."""
+        dropped = list(self.masters) if names is None else [n for n in names if n in self.masters]
+        for name in dropped:
+            self._entries.pop(name, None)
+        return dropped
+
+    def warm(self, names: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """Load entries now; returns {name: version}. Failures are logged, not raised."""
+        versions = {}
+        for name in list(self.masters) if names is None else names:
+            try:
+                versions[name] = self.get(name).version
+            except MasterCacheError as e:
+                print(f"[MasterCache] warm-up of '{name}' failed: {e}")
+        return versions
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        out = {}
+        for name in self.masters:
+            entry = self._entries.get(name)
+            out[name] = {
+                "cached": entry is not None,
+                "version": entry.version if entry else None,
+                "items": len(entry.items) if entry else 0,
+                "age_seconds": round(now - entry.loaded_at, 1) if entry else None,
+                "expires_in_seconds": round(entry.expires_at - now, 1) if entry else None,
+                "hits": self.hits[name],
+                "misses": self.misses[name],
+                "loads": self.loads[name],
+                "load_errors": self.load_errors[name],
+            }
+        return out
+
+
+master_cache = MasterDataCache(MASTERS)
@@ -0,0 +1,368 @@
+"""
+typeahead.py
+
+In-process autocomplete index over company_master (legal_name, display_name)
+and regulatory_master.cin, serving GET /company-typeahead without touching
+the database.
+
+- Every field is normalized to lowercase alphanumeric words. The index maps
+  word-start bigrams (" t") and all trigrams (" ta", "tat", ...) to
+  array-backed posting lists of integer doc ids.
+- A query word w matches a doc when " " + w occurs in the doc text, i.e. w is
+  a prefix of one of its words. Candidates come from the shortest posting
+  list among the query's grams and are verified with a substring check.
+- Updates are incremental: an upserted company gets a new doc id and its old
+  one is tombstoned; the index compacts itself once tombstones pile up.
+- Each worker holds its own copy, so it is also fully reloaded from the
+  database every TYPEAHEAD_RELOAD_SECONDS to pick up other workers' writes.
+  Upserts made while a reload reads and builds are replayed onto the new
+  index before it is swapped in, so they are not lost.
+"""
+
+from __future__ import annotations
+
+import heapq
+import os
+from bisect import bisect_left
+import re
+import sys
+import threading
+import time
+from array import array
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.schemas.db import CompanyMaster, RegulatoryMaster, SessionLocal
+
+TYPEAHEAD_DEFAULT_K = int(os.getenv("TYPEAHEAD_DEFAULT_K", "10"))
+TYPEAHEAD_MAX_K = int(os.getenv("TYPEAHEAD_MAX_K", "50"))
+TYPEAHEAD_RELOAD_SECONDS = int(os.getenv("TYPEAHEAD_RELOAD_SECONDS", "600"))
+# Rebuild once this fraction of docs are tombstones from updates
+TYPEAHEAD_COMPACT_RATIO = float(os.getenv("TYPEAHEAD_COMPACT_RATIO", "0.25"))
+
+_WORD_RE = re.compile(r"[^0-9a-z]+")
+
+# (company_id, legal_name, display_name, cin)
+Row = Tuple[str, str, Optional[str], Optional[str]]
+
+
+def _normalize(value: Optional[str]) -> str:
+    if not value:
+        return ""
+    return " ".join(w for w in _WORD_RE.split(value.lower()) if w)
+
+
+def _grams(word: str) -> List[str]:
+    """Grams for one word-start-padded word: " t" for one letter, else trigrams."""
+    padded = " " + word
+    if len(padded) == 2:
+        return [padded]
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def _text_grams(text: str) -> set:
+    grams = set()
+    for word in text.split():
+        grams.add(" " + word[0])
+        grams.update(_grams(word))
+    return grams
+
+
+class TypeaheadIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+        self.ready = False
+        self.loaded_at: Optional[float] = None
+        self.last_load_ms: Optional[float] = None
+
+        self.queries = 0
+        self.hits = 0
+        self.updates = 0
+        self.compactions = 0
+        self._query_time_s = 0.0
+
+        self._reloader: Optional[threading.Thread] = None
+        # upserts made while a reload() is running, replayed onto its result
+        self._pending: Optional[List[Row]] = None
+        self._reloading = 0
+
+    def _reset(self) -> None:
+        # doc id -> fields (parallel lists, doc id is the list position)
+        self._company_ids: List[str] = []
+        self._legal_names: List[str] = []
+        self._display_names: List[Optional[str]] = []
+        self._cins: List[Optional[str]] = []
+        self._texts: List[str] = []  # " legal words display words cin"
+        self._legal_norm: List[str] = []
+
+        self._live: Dict[str, int] = {}  # company_id -> current doc id
+        self._dead = 0
+        self._postings: Dict[str, array] = {}
+        # docs below this id were bulk-loaded in ranking order (shortest legal name first)
+        self._sorted_upto = 0
+
+    # ------------------------------------------------------
+    # building
+    # ------------------------------------------------------
+
+    def _add(self, row: Row) -> None:
+        company_id, legal_name, display_name, cin = row
+        company_id = sys.intern(str(company_id))
+        legal_norm = _normalize(legal_name)
+        text = " " + " ".join(
+            part for part in (legal_norm, _normalize(display_name), _normalize(cin)) if part
+        )
+
+        doc = len(self._company_ids)
+        previous = self._live.get(company_id)
+        if previous is not None:
+            self._texts[previous] = ""  # tombstone: never verifies again
+            self._dead += 1
+        self._live[company_id] = doc
+
+        self._company_ids.append(company_id)
+        self._legal_names.append(legal_name)
+        self._display_names.append(display_name)
+        self._cins.append(cin)
+        self._texts.append(text)
+        self._legal_norm.append(legal_norm)
+
+        for gram in _text_grams(text):
+            postings = self._postings.get(gram)
+            if postings is None:
+                postings = self._postings[sys.intern(gram)] = array("I")
+            postings.append(doc)
+
+    def _build(self, rows: Iterable[Row]) -> None:
+        self._reset()
+        # Add in tie-break order so a posting list scan meets the best
+        # candidates first and can stop early (see _search).
+        for row in sorted(rows, key=lambda r: (len(_normalize(r[1])), _normalize(r[1]))):
+            self._add(row)
+        self._sorted_upto = len(self._company_ids)
+
+    def load(self, rows: Iterable[Row]) -> None:
+        """Replace the whole index with `rows`."""
+        self.reload(lambda: rows)
+
+    def reload(self, loader: Callable[[], Iterable[Row]]) -> None:
+        """Replace the whole index with loader()'s rows, keeping upserts made meanwhile."""
+        start = time.perf_counter()
+        with self._lock:
+            self._reloading += 1
+            if self._pending is None:
+                self._pending = []
+        try:
+            fresh = TypeaheadIndex.__new__(TypeaheadIndex)
+            TypeaheadIndex._build(fresh, loader())
+        except BaseException:
+            with self._lock:
+                self._end_reload()
+            raise
+
+        with self._lock:
+            for row in self._pending:
+                TypeaheadIndex._add(fresh, row)
+            self._end_reload()
+            for name in (
+                "_company_ids", "_legal_names", "_display_names", "_cins",
+                "_texts", "_legal_norm", "_live", "_dead", "_postings", "_sorted_upto",
+            ):
+                setattr(self, name, getattr(fresh, name))
+            self.ready = True
+            self.loaded_at = time.time()
+            self.last_load_ms = round((time.perf_counter() - start) * 1000.0, 2)
+
+    def _end_reload(self) -> None:
+        self._reloading -= 1
+        if not self._reloading:
+            self._pending = None
+
+    def upsert(
+        self,
+        company_id: str,
+        legal_name: str,
+        display_name: Optional[str] = None,
+        cin: Optional[str] = None,
+    ) -> None:
+        """Add or replace one company. Only kept for a running reload until the index has been loaded."""
+        row = (company_id, legal_name, display_name, cin)
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(row)
+            if not self.ready:
+                return
+            self._add(row)
+            self.updates += 1
+            if self._dead > TYPEAHEAD_COMPACT_RATIO * len(self._company_ids):
+                self._compact()
+
+    def set_cin(self, company_id: str, cin: Optional[str]) -> None:
+        """Re-index a known company with a new CIN (names unchanged)."""
+        with self._lock:
+            doc = self._live.get(company_id)
+            if doc is None or self._cins[doc] == cin:
+                return
+            legal_name, display_name = self._legal_names[doc], self._display_names[doc]
+        self.upsert(company_id, legal_name, display_name, cin)
+
+    def _compact(self) -> None:
+        rows = [
+            (cid, self._legal_names[doc], self._display_names[doc], self._cins[doc])
+            for cid, doc in self._live.items()
+        ]
+        self._build(rows)
+        self.compactions += 1
+
+    # ------------------------------------------------------
+    # querying
+    # ------------------------------------------------------
+
+    def search(self, q: str, k: int = TYPEAHEAD_DEFAULT_K) -> List[Dict[str, Any]]:
+        start = time.perf_counter()
+        words = _normalize(q).split()
+        results: List[Dict[str, Any]] = []
+        if words:
+            with self._lock:
+                results = self._search(words, k)
+
+        self.queries += 1
+        if results:
+            self.hits += 1
+        self._query_time_s += time.perf_counter() - start
+        return results
+
+    def _search(self, words: List[str], k: int) -> List[Dict[str, Any]]:
+        shortest: Optional[array] = None
+        for word in words:
+            for gram in _grams(word):
+                postings = self._postings.get(gram)
+                if postings is None:
+                    return []
+                if shortest is None or len(postings) < len(shortest):
+                    shortest = postings
+
+        needles = [" " + w for w in words]
+        phrase = " ".join(words)
+        texts = self._texts
+        scored = []
+        best = 0
+        i, end = 0, len(shortest)
+        while i < end:
+            doc = shortest[i]
+            i += 1
+            text = texts[doc]
+            if not all(n in text for n in needles):
+                continue
+            legal = self._legal_norm[doc]
+            # legal name starts with the query > query as a phrase anywhere > scattered words
+            if legal.startswith(phrase):
+                rank = 0
+                best += 1
+            elif " " + phrase in text:
+                rank = 1
+            else:
+                rank = 2
+            scored.append((rank, len(legal), legal, doc))
+            if best == k and doc < self._sorted_upto:
+                # k top-rank hits in ranking order: the rest of the sorted part can't
+                # beat them, only docs upserted since the last load still can
+                i = max(i, bisect_left(shortest, self._sorted_upto))
+
+        return [
+            {
+                "company_id": self._company_ids[doc],
+                "legal_name": self._legal_names[doc],
+                "display_name": self._display_names[doc],
+                "cin": self._cins[doc],
+            }
+            for _, _, _, doc in heapq.nsmallest(k, scored)
+        ]
+
+    # ------------------------------------------------------
+    # reload / metrics
+    # ------------------------------------------------------
+
+    def start_auto_reload(self, loader: Callable[[], Iterable[Row]]) -> None:
+        """Reload from `loader` every TYPEAHEAD_RELOAD_SECONDS on a daemon thread."""
+        if TYPEAHEAD_RELOAD_SECONDS <= 0 or self._reloader is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(TYPEAHEAD_RELOAD_SECONDS)
+                try:
+                    self.reload(loader)
+                except Exception as e:
+                    print(f"[Typeahead] reload failed, keeping current index: {e}")
+
+        self._reloader = threading.Thread(target=run, name="typeahead-reload", daemon=True)
+        self._reloader.start()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            docs = len(self._company_ids)
+            postings = sum(len(p) for p in self._postings.values())
+            posting_bytes = sum(p.buffer_info()[1] * p.itemsize for p in self._postings.values())
+            text_bytes = sum(sys.getsizeof(t) for t in self._texts)
+            live = len(self._live)
+            dead = self._dead
+            grams = len(self._postings)
+        return {
+            "ready": self.ready,
+            "companies": live,
+            "tombstones": dead,
+            "docs": docs,
+            "grams": grams,
+            "postings": postings,
+            "approx_bytes": posting_bytes + text_bytes,
+            "queries": self.queries,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.queries, 4) if self.queries else None,
+            "avg_query_us": round(self._query_time_s / self.queries * 1e6, 1) if self.queries else None,
+            "updates": self.updates,
+            "compactions": self.compactions,
+            "loaded_at": self.loaded_at,
+            "last_load_ms": self.last_load_ms,
+        }
+
+
+typeahead_index = TypeaheadIndex()
+
+
+def company_rows(db: Session) -> List[Row]:
+    return (
+        db.query(
+            CompanyMaster.company_id,
+            CompanyMaster.legal_name,
+            CompanyMaster.display_name,
+            RegulatoryMaster.cin,
+        )
+        .outerjoin(RegulatoryMaster, RegulatoryMaster.company_id == CompanyMaster.company_id)
+        .all()
+    )
+
+
+def _load_with_new_session() -> List[Row]:
+    # primary: a lagging replica would drop companies created since its position
+    db = SessionLocal()
+    try:
+        return company_rows(db)
+    finally:
+        db.close()
+
+
+_initial_load_lock = threading.Lock()
+
+
+def load_typeahead_index() -> None:
+    """Initial load (startup or first use), then keep it fresh in the background."""
+    # concurrent cold callers wait for one load instead of each reading every company
+    with _initial_load_lock:
+        if typeahead_index.ready:
+            return
+        typeahead_index.start_auto_reload(_load_with_new_session)
+        typeahead_index.reload(_load_with_new_session)
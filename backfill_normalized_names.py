@@ -0,0 +1,28 @@
+"""
+Fill company_master.normalized_name for rows that have none.
+
+    python backfill_normalized_names.py
+
+Run after migrations/0003_company_dedupe_keys.sql, once the new code is
+deployed (rows inserted by old workers during the rollout have no key).
+Safe to re-run: only rows with an empty key are touched. This is the only
+place the backfill runs; the app does not do it at startup.
+"""
+
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.services.company_dedupe import backfill_normalized_names
+
+
+def main() -> int:
+    updated = backfill_normalized_names()
+    print(f"[Dedupe] {updated} companies backfilled")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
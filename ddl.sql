@@ -431,6 +431,8 @@ CREATE TABLE company_master (
   -- sample data of company_master
   company_id CHAR(36) NOT NULL DEFAULT (UUID()),
   legal_name VARCHAR(255) NOT NULL,
+  -- duplicate-detection key of legal_name (case / punctuation / "Pvt Ltd" folded), set by the app
+  normalized_name VARCHAR(255) NOT NULL DEFAULT '',
   display_name VARCHAR(255) NULL,
   entity_type_id CHAR(36) NOT NULL,
   country_id CHAR(36) NOT NULL,
@@ -449,6 +451,8 @@ CREATE TABLE company_master (
   is_active TINYINT(1) NOT NULL DEFAULT 1,
   PRIMARY KEY (company_id),
   INDEX idx_legal_name (legal_name),
+  INDEX idx_normalized_name (normalized_name),
+  INDEX idx_display_name (display_name),
   FULLTEXT INDEX ft_company_search (legal_name, display_name),
   INDEX idx_country (country_id),
   INDEX idx_entity_type (entity_type_id),
@@ -478,11 +482,15 @@ CREATE TABLE regulatory_master (
   created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
   updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
 
+  version INT NOT NULL DEFAULT 1,
   is_active TINYINT(1) NOT NULL DEFAULT 1,
   PRIMARY KEY (registration_id),
   UNIQUE KEY uniq_company_reg (company_id),
   INDEX idx_company (company_id),
-  INDEX idx_country (country_id)
+  INDEX idx_country (country_id),
+  INDEX idx_cin (cin),
+  INDEX idx_pan (pan),
+  INDEX idx_lei (lei)
 ) ENGINE=InnoDB;
 
 
@@ -557,6 +565,7 @@ CREATE TABLE company_industry_size_master (
   created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
   updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
 
+  version INT NOT NULL DEFAULT 1,
   is_active TINYINT(1) NOT NULL DEFAULT 1,
   PRIMARY KEY (industry_size_id),
   UNIQUE KEY uniq_company_industry (company_id),
@@ -0,0 +1,51 @@
+"""
+Bulk company import (CSV / NDJSON) from the command line.
+
+    python import_companies.py companies.csv --rejects rejects.ndjson
+    python import_companies.py - --format ndjson < registry.ndjson
+
+Row format and behaviour: app/services/company_import.py.
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import asdict
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.services.company_import import IMPORT_CHUNK_SIZE, CompanyImportError, import_companies
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk import companies from CSV / NDJSON")
+    parser.add_argument("path", help="input file, or - for stdin")
+    parser.add_argument("--format", choices=("csv", "ndjson"), help="default: from the file extension")
+    parser.add_argument("--rejects", default="rejects.ndjson", help="where rejected rows are written (NDJSON)")
+    parser.add_argument("--created-by", default="bulk-import", help="created_by for the new companies")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    source = sys.stdin if args.path == "-" else open(args.path, newline="", encoding="utf-8-sig")
+    with source, open(args.rejects, "w", encoding="utf-8") as rejects:
+
+        def reject(line, raw, error):
+            rejects.write(json.dumps({"line": line, "error": error, "record": raw}, default=str) + "\n")
+
+        try:
+            stats = import_companies(source, fmt, args.created_by, reject, chunk_size=args.chunk_size)
+        except CompanyImportError as e:
+            print(f"[CompanyImport] {e}", file=sys.stderr)
+            return 2
+
+    print(json.dumps(asdict(stats), indent=2))
+    if stats.rejected:
+        print(f"[CompanyImport] {stats.rejected} rejected rows written to {args.rejects}", file=sys.stderr)
+    return 0 if stats.inserted or not stats.rows else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,74 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from dotenv import load_dotenv
 
 load_dotenv()
 
-from app.api import company, master
+from app.api import company, master, metrics
 from app.auth.auth_middleware import AuthMiddleware
+from app.auth.itmtb_auth_sdk import (
+    close_shared_async_auth_client,
+    get_shared_auth_client,
+)
+from app.middleware.compression import CompressionMiddleware
+from app.schemas.db import (
+    async_pool_health_checkers,
+    db_router,
+    dispose_async_engines,
+    pool_health_checker,
+)
+from app.services.company_dedupe import load_name_index
+from app.services.master_bundle import master_bundle
+from app.services.master_cache import MasterCacheError, master_cache
+from app.services.typeahead import load_typeahead_index
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # replaces per-checkout pre-ping (DATABASE_POOL_LIVENESS=background)
+    pool_health_checker.start()
+    for checker in async_pool_health_checkers:
+        checker.start()
+    # replica health / lag checks (no-op without DATABASE_REPLICA_HOSTS)
+    db_router.start()
+    # load JWKS signing keys before the first request needs them
+    try:
+        await asyncio.to_thread(get_shared_auth_client().warm_jwks)
+    except Exception as e:
+        print(f"[startup] JWKS warm-up failed, will retry on demand: {e}")
+    # company typeahead index (served from memory)
+    try:
+        await asyncio.to_thread(load_typeahead_index)
+    except Exception as e:
+        print(f"[startup] typeahead index load failed, will load on first use: {e}")
+    # duplicate detection: fuzzy name index (older rows get their normalized_name
+    # from backfill_normalized_names.py after migrations/0003, not at startup)
+    try:
+        await asyncio.to_thread(load_name_index)
+    except Exception as e:
+        print(f"[startup] company name index load failed, will load on first use: {e}")
+    # master dropdown tables (served from memory; failures load lazily)
+    await asyncio.to_thread(master_cache.warm)
+    try:
+        await asyncio.to_thread(master_bundle.get, list(master_cache.masters))
+    except MasterCacheError as e:
+        print(f"[startup] master bundle not pre-built, will build on first use: {e}")
+    yield
+    # release pooled keep-alive connections to Auth MS / peer services
+    await close_shared_async_auth_client()
+    pool_health_checker.stop()
+    for checker in async_pool_health_checkers:
+        await checker.stop()
+    db_router.stop()
+    await dispose_async_engines()
+
 
 app = FastAPI(
     title="Internal Audit BE API",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Add authentication middleware
@@ -16,8 +76,12 @@ app = FastAPI(
 # and sets request.state.user_identity or request.state.service_identity
 app.add_middleware(AuthMiddleware)
 
+# gzip / brotli for large JSON responses; added last so it wraps everything
+app.add_middleware(CompressionMiddleware)
+
 app.include_router(company.router, prefix="/api")
 app.include_router(master.router , prefix="/api")
+app.include_router(metrics.router, prefix="/api")
 
 
 @app.get("/")
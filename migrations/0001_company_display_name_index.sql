@@ -0,0 +1,4 @@
+-- company-search prefix fallback (LIKE 'q%') on display_name.
+-- ddl.sql already has this index; run only on databases created before it.
+ALTER TABLE company_master
+  ADD INDEX idx_display_name (display_name);
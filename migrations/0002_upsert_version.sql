@@ -0,0 +1,9 @@
+-- Optimistic versioning for /regulatory-upsert and /industry-size-upsert.
+-- ddl.sql already has these columns; run only on databases created before them.
+-- Apply BEFORE deploying the code that maps `version`: the ORM selects the
+-- column on every read. Old code ignores it, so applying early is safe.
+ALTER TABLE regulatory_master
+  ADD COLUMN version INT NOT NULL DEFAULT 1 AFTER updated_at;
+
+ALTER TABLE company_industry_size_master
+  ADD COLUMN version INT NOT NULL DEFAULT 1 AFTER updated_at;
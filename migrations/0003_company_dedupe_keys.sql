@@ -0,0 +1,18 @@
+-- Indexed duplicate detection: normalized legal name + CIN / PAN / LEI lookups.
+-- ddl.sql already has these; run only on databases created before them.
+-- Apply BEFORE deploying the code that maps normalized_name: every
+-- company_master query selects it. Old code ignores the column (the default
+-- '' marks rows without a key yet), so applying early is safe.
+ALTER TABLE company_master
+  ADD COLUMN normalized_name VARCHAR(255) NOT NULL DEFAULT '' AFTER legal_name,
+  ADD INDEX idx_normalized_name (normalized_name);
+
+ALTER TABLE regulatory_master
+  ADD INDEX idx_cin (cin),
+  ADD INDEX idx_pan (pan),
+  ADD INDEX idx_lei (lei);
+
+-- Then fill normalized_name for the existing rows (and any the old code
+-- inserted during the rollout) once the new code is deployed:
+--   python backfill_normalized_names.py
+-- (a one-off step: the app does not backfill at startup)
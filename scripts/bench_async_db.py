@@ -0,0 +1,260 @@
+"""
+Concurrent load on the read endpoints: sync handlers on the threadpool vs
+async handlers on the async engine.
+
+    python scripts/bench_async_db.py [--url mysql+pymysql://user:pw@127.0.0.1/audit_bench]
+                                     [--concurrency 50,500,2000] [--requests 4000]
+
+Drives the real app (main.app, AuthMiddleware included, identity cache
+pre-warmed) in-process through httpx's ASGI transport, so both sides pay
+the same HTTP overhead and only the handler execution model differs:
+
+- sync:  `def` copies of /company-search and /company-master on get_db
+         (AnyIO threadpool, 40 threads, PyMySQL / sqlite3), i.e. the
+         handlers before the async conversion, with today's statements
+- async: the real /api/company-search and /api/company-master on
+         get_async_db (event loop, aiomysql / aiosqlite)
+
+Requests alternate between a search page (2-letter prefix, the LIKE path)
+and a detail lookup.
+--url (or BENCH_DATABASE_URL) is used as DATABASE_URL for the app; the
+default is a throwaway SQLite file, which only shows the threadpool vs
+event loop behaviour: SQLite serializes work inside the driver, so run it
+against a local MySQL for real numbers. The three company tables are
+created if missing and seeded with --companies rows (--skip-seed to
+reuse them).
+"""
+
+import argparse
+import asyncio
+import collections
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TOKEN = "bench-async-db-token"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--url",
+        default=os.getenv("BENCH_DATABASE_URL")
+        or f"sqlite:///{os.path.join(tempfile.gettempdir(), 'bench_async_db.sqlite')}",
+        help="sync SQLAlchemy URL (the async driver is derived from it)",
+    )
+    parser.add_argument("--companies", type=int, default=20000)
+    parser.add_argument("--concurrency", default="50,500,2000", help="comma-separated in-flight request counts")
+    parser.add_argument("--requests", type=int, default=4000, help="requests per row")
+    parser.add_argument("--skip-seed", action="store_true")
+    return parser.parse_args(argv)
+
+
+ARGS = parse_args()
+
+# app.schemas.db builds its engines from these at import
+os.environ["DATABASE_URL"] = ARGS.url
+os.environ["DATABASE_REPLICA_URLS"] = ""
+os.environ.setdefault("AUTH_BASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault("SERVICE_ID", "svc_bench")
+os.environ.setdefault("SERVICE_SECRET", "bench")
+os.environ.setdefault("USER_TOKEN_VERIFY_MODE", "remote")
+
+import httpx
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateTable
+
+from app.api.company import SEARCH_DEFAULT_LIMIT, SEARCH_MAX_LIMIT, _like_prefix
+from app.api.pagination import PageParams, _order_by, _page, page_params
+from app.auth.itmtb_auth_sdk import _token_cache_key, get_shared_auth_client
+from app.schemas.db import engine, get_db
+from app.services.company_read import SEARCH_SELECT, company, detail_stmt, industry_size, regulatory, search_item
+from main import app
+
+WORDS = "tata reliance infosys global steel power holdings industries capital green river".split()
+
+
+# =========================
+# sync twins of the async read endpoints
+# =========================
+
+sync_router = APIRouter()
+
+
+@sync_router.get("/company-search")
+def sync_search(
+    q: str | None = Query(default=None),
+    page: PageParams = Depends(page_params(SEARCH_DEFAULT_LIMIT, SEARCH_MAX_LIMIT)),
+    db: Session = Depends(get_db),
+):
+    query = SEARCH_SELECT
+    if q:
+        like = _like_prefix(q)
+        query = query.where(
+            or_(company.c.legal_name.like(like, escape="\\"), company.c.display_name.like(like, escape="\\"))
+        )
+    keys = [(company.c.legal_name, False), (company.c.company_id, False)]
+    if page.cursor:
+        raise HTTPException(status_code=400, detail="cursor not used by the benchmark")
+    rows = db.execute(query.order_by(*_order_by(keys)).limit(page.limit + 1)).all()
+    rows, next_cursor = _page(rows, lambda row: (row.legal_name, row.company_id), page)
+    return {"items": [search_item(row) for row in rows], "next_cursor": next_cursor, "total": None}
+
+
+@sync_router.get("/company-master")
+def sync_detail(company_id: str = Query(...), db: Session = Depends(get_db)):
+    row = db.execute(detail_stmt(company_id)).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Company not found")
+    detail = dict(row._mapping)
+    detail.pop("updated_at")
+    return detail
+
+
+app.include_router(sync_router, prefix="/bench-sync")
+
+
+# =========================
+# data
+# =========================
+
+def company_ids(n: int) -> list:
+    return [f"{i:08d}-bench-0000-0000-000000000000" for i in range(n)]
+
+
+def seed(n: int) -> None:
+    tables = (company, regulatory, industry_size)
+    with engine.begin() as conn:
+        if engine.dialect.name == "sqlite":
+            # tables only: SQLite index names are database-wide and the models reuse some
+            for table in tables:
+                conn.execute(CreateTable(table, if_not_exists=True))
+        else:
+            company.metadata.create_all(conn, tables=list(tables), checkfirst=True)
+        ids = company_ids(n)
+        for table in (industry_size, regulatory, company):
+            conn.execute(table.delete().where(table.c.company_id.like("%-bench-%")))
+
+        rng = random.Random(7)
+        for start in range(0, n, 5000):
+            chunk = ids[start:start + 5000]
+            conn.execute(
+                company.insert(),
+                [
+                    {
+                        "company_id": cid,
+                        "legal_name": " ".join(rng.sample(WORDS, 3)).title() + f" {i} Pvt Ltd",
+                        "normalized_name": "",
+                        "entity_type_id": "et",
+                        "country_id": "in",
+                        "registered_address": "x" * 200,
+                        "is_part_of_group": False,
+                        "status": "Draft",
+                        "created_by": "bench",
+                        "is_active": True,
+                    }
+                    for i, cid in enumerate(chunk, start)
+                ],
+            )
+            conn.execute(
+                regulatory.insert(),
+                [
+                    {
+                        "registration_id": f"r{cid[1:]}",
+                        "company_id": cid,
+                        "cin": f"U{i:020d}",
+                        "pan": f"P{i:09d}",
+                        "listed_status": "Unlisted",
+                    }
+                    for i, cid in enumerate(chunk, start)
+                ],
+            )
+
+
+# =========================
+# load
+# =========================
+
+async def run(client: httpx.AsyncClient, prefix: str, ids: list, concurrency: int, requests: int):
+    rng = random.Random(concurrency)
+    gate = asyncio.Semaphore(concurrency)
+    latencies, errors = [], collections.Counter()
+    peak_threads = threading.active_count()
+
+    async def one(i: int):
+        nonlocal peak_threads
+        if i % 2:
+            url = f"{prefix}/company-master?company_id={rng.choice(ids)}"
+        else:
+            # 2 letters: below SEARCH_FULLTEXT_MIN_LEN, so both sides take the prefix LIKE path
+            url = f"{prefix}/company-search?q={rng.choice(WORDS)[:2]}&limit=20"
+        async with gate:
+            start = time.perf_counter()
+            try:
+                resp = await client.get(url)
+                if resp.status_code != 200:
+                    errors[str(resp.status_code)] += 1
+            except Exception as e:
+                # unhandled in the app, e.g. sqlalchemy TimeoutError waiting for a pooled connection
+                errors[type(e).__name__] += 1
+            latencies.append((time.perf_counter() - start) * 1000.0)
+            peak_threads = max(peak_threads, threading.active_count())
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    p99 = latencies[int(0.99 * (len(latencies) - 1))]
+    return requests / elapsed, statistics.median(latencies), p99, errors, peak_threads
+
+
+async def bench(levels: list) -> list:
+    ids = company_ids(ARGS.companies)
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {TOKEN}"}
+    results = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers, timeout=120) as client:
+        for prefix in ("/bench-sync", "/api"):
+            await run(client, prefix, ids, 20, 200)  # warm-up: pools, compiled statements
+        for concurrency in levels:
+            for label, prefix in (("sync", "/bench-sync"), ("async", "/api")):
+                results.append((concurrency, label, await run(client, prefix, ids, concurrency, ARGS.requests)))
+    return results
+
+
+def main() -> int:
+    if not ARGS.skip_seed:
+        print(f"seeding {ARGS.companies} companies on {engine.url.render_as_string(hide_password=True)} ...")
+        seed(ARGS.companies)
+
+    # warm identity cache: AuthMiddleware never leaves the process
+    get_shared_auth_client()._identity_cache.set(
+        _token_cache_key(TOKEN), {"u_id": "bench", "tenant_id": 1, "status": "active"}, 3600
+    )
+
+    levels = [int(c) for c in ARGS.concurrency.split(",")]
+    results = asyncio.run(bench(levels))
+    print(
+        f"\n{ARGS.requests} requests per row (search page / detail lookup), {engine.dialect.name}\n"
+        f"{'in flight':>9} {'handler':<7} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>9} {'threads':>8}  errors"
+    )
+    for concurrency, label, (rps, p50, p99, errors, threads) in results:
+        failed = ", ".join(f"{n} {kind}" for kind, n in errors.most_common()) or "-"
+        print(f"{concurrency:>9} {label:<7} {rps:>8.0f} {p50:>8.1f} {p99:>9.1f} {threads:>8}  {failed}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
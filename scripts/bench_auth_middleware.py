@@ -0,0 +1,210 @@
+"""
+Per-request overhead of AuthMiddleware: old BaseHTTPMiddleware vs plain ASGI.
+
+    python scripts/bench_auth_middleware.py [--requests 20000] [--concurrency 100]
+
+Drives a small FastAPI app straight through ASGI (no server, no sockets)
+with the identity cache pre-warmed, so the numbers are the middleware's
+own cost and not Auth MS latency:
+
+- none:   the app without AuthMiddleware (floor)
+- before: a copy of the BaseHTTPMiddleware version (dispatch + call_next,
+          HTTPException raised from the middleware)
+- after:  app.auth.auth_middleware.AuthMiddleware
+
+Each stack serves an authenticated JSON request, a streamed response and an
+unauthenticated request. Status codes are printed next to the timings, so
+the 401 contract is checked along the way.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("AUTH_BASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault("SERVICE_ID", "svc_bench")
+os.environ.setdefault("SERVICE_SECRET", "bench")
+os.environ.setdefault("USER_TOKEN_VERIFY_MODE", "remote")
+
+from fastapi import FastAPI, HTTPException, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import StreamingResponse
+
+from app.auth.auth_middleware import AuthMiddleware
+from app.auth.itmtb_auth_sdk import (
+    AuthServiceError,
+    AuthUnauthorizedError,
+    _token_cache_key,
+    get_shared_async_auth_client,
+    get_shared_auth_client,
+)
+
+TOKEN = "bench-user-token"
+
+
+class LegacyAuthMiddleware(BaseHTTPMiddleware):
+    """AuthMiddleware as it was before the plain ASGI rewrite."""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.auth_client = get_shared_async_auth_client()
+
+    async def dispatch(self, request: Request, call_next):
+        request.state.user_identity = None
+        request.state.service_identity = None
+
+        svc_token = request.headers.get("X-Service-Token")
+        if svc_token:
+            try:
+                request.state.service_identity = await self.auth_client.verify_service_token(svc_token)
+            except AuthUnauthorizedError:
+                raise HTTPException(status_code=401, detail="Invalid service token")
+            except AuthServiceError:
+                raise HTTPException(status_code=503, detail="Auth system error")
+
+        auth_header = request.headers.get("Authorization")
+        if auth_header and auth_header.startswith("Bearer "):
+            user_token = auth_header.split(" ", 1)[1]
+            try:
+                request.state.user_identity = await self.auth_client.verify_user_token(user_token)
+            except AuthUnauthorizedError:
+                raise HTTPException(status_code=401, detail="Invalid user token")
+            except AuthServiceError:
+                raise HTTPException(status_code=503, detail="Auth system error")
+
+        if not request.state.user_identity and not request.state.service_identity:
+            raise HTTPException(status_code=401, detail="Missing authentication")
+
+        return await call_next(request)
+
+
+def build_app(middleware) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/company/{company_id}")
+    async def company(company_id: str, request: Request):
+        identity = getattr(request.state, "user_identity", None) or {}
+        return {"id": company_id, "name": "Bench Industries Pvt Ltd", "tenant_id": identity.get("tenant_id")}
+
+    @app.get("/export")
+    async def export():
+        async def rows():
+            for i in range(20):
+                yield f"{i},Bench Industries {i}\n".encode()
+
+        return StreamingResponse(rows(), media_type="text/csv")
+
+    if middleware is not None:
+        app.add_middleware(middleware)
+    return app
+
+
+def scope_for(path: str, authenticated: bool) -> dict:
+    headers = [(b"host", b"bench")]
+    if authenticated:
+        headers.append((b"authorization", f"Bearer {TOKEN}".encode()))
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": headers,
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+
+async def one_request(app, scope: dict) -> int:
+    status = 0
+    body_sent = False
+
+    async def receive():
+        # body once, then block like a server with a live client
+        # (StreamingResponse listens for http.disconnect meanwhile)
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    try:
+        await app(dict(scope), receive, send)
+    except Exception:
+        # HTTPException raised from a BaseHTTPMiddleware is not handled by the
+        # app's exception handlers: ServerErrorMiddleware answers 500, re-raises
+        pass
+    return status
+
+
+async def run(app, scope: dict, requests: int, concurrency: int):
+    statuses = set()
+
+    async def batch(n):
+        for code in await asyncio.gather(*(one_request(app, scope) for _ in range(n))):
+            statuses.add(code)
+
+    await batch(min(concurrency, requests))  # warm-up: route compile, lazy middleware stack
+    start = time.perf_counter()
+    done = 0
+    while done < requests:
+        n = min(concurrency, requests - done)
+        await batch(n)
+        done += n
+    elapsed = time.perf_counter() - start
+    return requests / elapsed, elapsed / requests * 1e6, sorted(statuses)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    # warm identity cache: the middleware never leaves the process
+    get_shared_auth_client()._identity_cache.set(
+        _token_cache_key(TOKEN), {"u_id": "bench", "tenant_id": 1, "status": "active"}, 3600
+    )
+
+    stacks = [("none", None), ("before", LegacyAuthMiddleware), ("after", AuthMiddleware)]
+    cases = [
+        ("json, authenticated", "/company/42", True),
+        ("stream, authenticated", "/export", True),
+        ("unauthenticated", "/company/42", False),
+    ]
+
+    async def bench():
+        results = []
+        for case, path, authenticated in cases:
+            for label, middleware in stacks:
+                if middleware is None and not authenticated:
+                    continue
+                app = build_app(middleware)
+                results.append((case, label, await run(app, scope_for(path, authenticated), args.requests, args.concurrency)))
+        return results
+
+    results = asyncio.run(bench())
+    print(
+        f"\n{args.requests} requests per row, {args.concurrency} concurrent, ASGI direct\n"
+        f"{'request':<24} {'stack':<8} {'req/s':>9} {'us/req':>8}  status"
+    )
+    for case, label, (rps, us, statuses) in results:
+        print(f"{case:<24} {label:<8} {rps:>9.0f} {us:>8.1f}  {','.join(map(str, statuses))}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""
+User-token verification against a stub Auth MS: blocking vs async client.
+
+    python scripts/bench_auth_verify.py [--delay-ms 20] [--concurrency 50] [--requests 500]
+
+Starts a local stub of Auth MS /verify (own process) that answers after
+--delay-ms, then runs --requests verifications of distinct tokens (so the
+identity cache never hits), --concurrency at a time on one event loop:
+
+- blocking: AuthClient.verify_user_token called straight from the coroutine,
+  as AuthMiddleware did before AsyncAuthClient (requests.Session.post on
+  the loop: every other request in the worker waits)
+- async:    AsyncAuthClient.verify_user_token (pooled keep-alive httpx)
+
+A last row shows the async client on a warm identity cache. "loop stall" is
+the longest time the event loop could not run anything else.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def serve_stub(delay: float, port) -> None:
+    class Verify(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+        disable_nagle_algorithm = True  # headers and body are separate writes
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("content-length", 0)))
+            token = json.loads(body or b"{}").get("token", "")
+            time.sleep(delay)
+            out = json.dumps({"u_id": token[-8:], "email": "bench@example.com", "tenant_id": 1, "status": "active"})
+            self.send_response(200)
+            self.send_header("content-type", "application/json")
+            self.send_header("content-length", str(len(out)))
+            self.end_headers()
+            self.wfile.write(out.encode())
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        request_queue_size = 256  # default 5 drops connects at --concurrency 50
+
+    server = Server(("127.0.0.1", 0), Verify)
+    server.daemon_threads = True
+    port.value = server.server_port
+    server.serve_forever()
+
+
+def start_stub(delay: float):
+    # separate process: stub threads must not share the GIL with the loop under test
+    port = multiprocessing.Value("i", 0)
+    proc = multiprocessing.Process(target=serve_stub, args=(delay, port), daemon=True)
+    proc.start()
+    while not port.value:
+        time.sleep(0.01)
+    return proc, port.value
+
+
+async def run(verify, tokens, concurrency: int):
+    gate = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(token):
+        async with gate:
+            start = time.perf_counter()
+            await verify(token)
+            latencies.append((time.perf_counter() - start) * 1000.0)
+
+    stall = 0.0
+    done = False
+
+    async def heartbeat():
+        # longest gap between 1 ms ticks = how long the loop was unavailable
+        # to every other request in the worker
+        nonlocal stall
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            stall = max(stall, now - last)
+            last = now
+
+    ticker = asyncio.ensure_future(heartbeat())
+    start = time.perf_counter()
+    await asyncio.gather(*(one(t) for t in tokens))
+    elapsed = time.perf_counter() - start
+    done = True
+    await ticker
+    latencies.sort()
+    p95 = latencies[int(0.95 * (len(latencies) - 1))]
+    return len(tokens) / elapsed, statistics.median(latencies), p95, stall * 1000.0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--delay-ms", type=float, default=20.0, help="stub /verify latency")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--max-connections", type=int, default=None, help="AUTH_HTTP_MAX_CONNECTIONS for the async pool")
+    args = parser.parse_args(argv)
+
+    stub, port = start_stub(args.delay_ms / 1000.0)
+    os.environ.update(
+        AUTH_BASE_URL=f"http://127.0.0.1:{port}",
+        SERVICE_ID="svc_bench",
+        SERVICE_SECRET="bench",
+        USER_TOKEN_VERIFY_MODE="remote",
+    )
+    if args.max_connections:
+        os.environ["AUTH_HTTP_MAX_CONNECTIONS"] = str(args.max_connections)
+    from app.auth.itmtb_auth_sdk import AsyncAuthClient, AuthClient
+
+    def fresh_tokens(tag):
+        return [f"{tag}-token-{i:08d}" for i in range(args.requests)]
+
+    async def bench():
+        sync_client = AuthClient()
+        async_client = AsyncAuthClient(sync_client=AuthClient())
+
+        async def blocking(token):
+            sync_client.verify_user_token(token)
+
+        rows = [
+            ("blocking (before)", await run(blocking, fresh_tokens("b"), args.concurrency)),
+            ("async", await run(async_client.verify_user_token, fresh_tokens("a"), args.concurrency)),
+            ("async, cached", await run(async_client.verify_user_token, fresh_tokens("a"), args.concurrency)),
+        ]
+        await async_client.aclose()
+        return rows
+
+    rows = asyncio.run(bench())
+    print(
+        f"\n{args.requests} verifications, {args.concurrency} concurrent, stub /verify {args.delay_ms:g} ms, "
+        f"pool {os.environ.get('AUTH_HTTP_MAX_CONNECTIONS', 'default')}\n"
+        f"{'client':<20} {'verif/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'loop stall ms':>14}"
+    )
+    for label, (throughput, p50, p95, stall) in rows:
+        print(f"{label:<20} {throughput:>9.0f} {p50:>8.1f} {p95:>8.1f} {stall:>14.1f}")
+    stub.terminate()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+Rows/sec of the company read paths: ORM entities vs column projections.
+
+    python scripts/bench_company_read.py [--companies 20000] [--seconds 2]
+
+Seeds company_master / regulatory_master / company_industry_size_master in
+an in-memory SQLite database (400-char addresses, like real registered
+addresses), then times each shape with a fresh Session per request, as
+the handlers get one:
+
+- search page: the old select(CompanyMaster, RegulatoryMaster,
+  CompanyIndustrySizeMaster) + CompanySearchResult per row, vs SEARCH_SELECT
+  + search_item (app/services/company_read.py)
+- detail: the old select(CompanyMaster) + CompanyDetail, vs detail_stmt()
+
+Only the Python side differs between the two, so SQLite is enough to
+compare them; absolute numbers on MySQL also include the network.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from sqlalchemy import MetaData, create_engine, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.schemas.company import CompanyDetail, CompanySearchResult
+from app.schemas.db import CompanyIndustrySizeMaster, CompanyMaster, RegulatoryMaster
+from app.services.company_read import SEARCH_SELECT, company, detail_stmt, industry_size, regulatory, search_item
+
+PAGE = 100
+
+
+def create_schema(engine) -> None:
+    # SQLite index names are per database, not per table: prefix the copies
+    metadata = MetaData()
+    for table in (company, regulatory, industry_size):
+        copy = table.to_metadata(metadata)
+        for index in copy.indexes:
+            index.name = f"{copy.name}_{index.name}"
+    metadata.create_all(engine)
+
+
+def seed(engine, companies: int) -> list:
+    rng = random.Random(3)
+    words = "tata reliance infosys global steel power holdings industries capital green river".split()
+    ids = [f"{i:08d}-0000-0000-0000-000000000000" for i in range(companies)]
+    with engine.begin() as conn:
+        conn.execute(
+            company.insert(),
+            [
+                {
+                    "company_id": cid,
+                    "legal_name": " ".join(rng.sample(words, 3)).title() + " Pvt Ltd",
+                    "normalized_name": "",
+                    "display_name": None,
+                    "entity_type_id": "et",
+                    "country_id": "in",
+                    "registered_address": "x" * 400,
+                    "operational_hq_address": "y" * 400,
+                    "is_part_of_group": False,
+                    "status": "Draft",
+                    "created_by": "bench",
+                    "is_active": True,
+                }
+                for cid in ids
+            ],
+        )
+        conn.execute(
+            regulatory.insert(),
+            [
+                {"registration_id": f"r{cid}", "company_id": cid, "cin": f"L{i:020d}", "pan": "ABCDE1234F",
+                 "listed_status": "Unlisted", "version": 1, "is_active": True}
+                for i, cid in enumerate(ids)
+            ],
+        )
+        conn.execute(
+            industry_size.insert(),
+            [
+                {"industry_size_id": f"s{cid}", "company_id": cid, "industry_sector_id": "sec", "sub_industry_id": "sub",
+                 "industry_code_id": "code", "revenue_indicator_id": "rev", "spend_indicator_id": "spend",
+                 "version": 1, "is_active": True}
+                for cid in ids
+            ],
+        )
+    return ids
+
+
+# ---- old handler code (before the projection change) ----
+
+def search_orm(db: Session) -> list:
+    stmt = (
+        select(CompanyMaster, RegulatoryMaster, CompanyIndustrySizeMaster)
+        .outerjoin(RegulatoryMaster, RegulatoryMaster.company_id == CompanyMaster.company_id)
+        .outerjoin(CompanyIndustrySizeMaster, CompanyIndustrySizeMaster.company_id == CompanyMaster.company_id)
+        .order_by(CompanyMaster.legal_name, CompanyMaster.company_id)
+        .limit(PAGE + 1)
+    )
+    results = []
+    for company_row, regulatory_row, industry, *_ in db.execute(stmt).all()[:PAGE]:
+        sector_val = None
+        if industry and industry.industry_sector_id is not None:
+            sector_val = str(industry.industry_sector_id)
+        results.append(
+            CompanySearchResult(
+                company_id=company_row.company_id,
+                legal_name=company_row.legal_name,
+                country_id=company_row.country_id,
+                cin=regulatory_row.cin if regulatory_row else None,
+                sector=sector_val,
+            )
+        )
+    return results
+
+
+def detail_orm(db: Session, company_id: str):
+    row = db.scalar(select(CompanyMaster).where(CompanyMaster.company_id == company_id))
+    return CompanyDetail(
+        company_id=row.company_id,
+        legal_name=row.legal_name,
+        display_name=row.display_name,
+        entity_type_id=row.entity_type_id,
+        country_id=row.country_id,
+        registered_address=row.registered_address,
+        operational_hq_address=row.operational_hq_address,
+        is_part_of_group=row.is_part_of_group,
+        parent_group_id=row.parent_group_id,
+        status=row.status,
+    )
+
+
+# ---- current code ----
+
+def search_projection(db: Session) -> list:
+    stmt = SEARCH_SELECT.order_by(company.c.legal_name, company.c.company_id).limit(PAGE + 1)
+    return [search_item(row) for row in db.execute(stmt).all()[:PAGE]]
+
+
+def detail_projection(db: Session, company_id: str):
+    detail = dict(db.execute(detail_stmt(company_id)).first()._mapping)
+    detail.pop("updated_at")
+    return detail
+
+
+def rate(engine, fn, seconds: float) -> float:
+    """Calls per second of fn(session), fresh session each call."""
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        with Session(engine) as db:
+            fn(db)
+        calls += 1
+    return calls / (time.perf_counter() - start)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--companies", type=int, default=20000)
+    parser.add_argument("--seconds", type=float, default=2.0, help="time spent per measurement")
+    args = parser.parse_args(argv)
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    create_schema(engine)
+    ids = seed(engine, args.companies)
+    rng = random.Random(4)
+
+    print(f"{'path':<28} {'ORM':>12} {'projection':>12} {'speedup':>8}")
+    orm = rate(engine, search_orm, args.seconds) * PAGE
+    proj = rate(engine, search_projection, args.seconds) * PAGE
+    print(f"{f'search page ({PAGE} rows)':<28} {orm:>10.0f}/s {proj:>10.0f}/s {proj / orm:>7.2f}x  rows")
+    orm = rate(engine, lambda db: detail_orm(db, rng.choice(ids)), args.seconds)
+    proj = rate(engine, lambda db: detail_projection(db, rng.choice(ids)), args.seconds)
+    print(f"{'detail lookup':<28} {orm:>10.0f}/s {proj:>10.0f}/s {proj / orm:>7.2f}x  lookups")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
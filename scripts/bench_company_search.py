@@ -0,0 +1,142 @@
+"""
+Latency of /company-search's query shapes on a large company table.
+
+    python scripts/bench_company_search.py --url mysql+pymysql://user:pw@host/scratch --rows 1000000
+
+Seeds a scratch table (bench_company_search, same name columns and indexes
+as company_master, incl. FULLTEXT ft_company_search on MySQL) with synthetic
+company names, then times per query:
+
+- fulltext: the current path, MATCH ... AGAINST (_fulltext_terms) ordered by relevance
+- prefix:   the short-query fallback, LIKE 'q%' on legal_name / display_name
+- old:      the query before FULLTEXT, ILIKE '%q%' on both names returning
+            every match (no order, no limit), for comparison
+
+The path /company-search would take for a query is marked with *.
+
+Use a scratch database: the table is dropped and re-created unless
+--skip-seed is given. On a non-MySQL URL (e.g. sqlite:///bench.db) the
+fulltext path is skipped.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from sqlalchemy import Column, Index, MetaData, String, Table, create_engine, or_, select
+from sqlalchemy.dialects.mysql import match
+
+from app.api.company import SEARCH_FULLTEXT_MIN_LEN, _fulltext_terms, _like_prefix
+
+WORDS = (
+    "tata motors reliance infosys wipro adani bharat steel power cement textiles pharma chemicals "
+    "logistics finance capital holdings industries engineering solutions global india national "
+    "eastern western northern southern sun star green blue river ocean mountain alpha omega prime "
+    "united metro city rural agro foods beverages electricals electronics auto components fabrics"
+).split()
+FORMS = ("Private Limited", "Pvt Ltd", "Limited", "LLP", "Ltd", "Industries Ltd")
+QUERIES = ("tata", "tata mot", "reliance cap", "green river foods", "infosys", "ta", "su", "zzznomatch")
+
+
+def bench_table(metadata: MetaData, mysql: bool) -> Table:
+    table = Table(
+        "bench_company_search",
+        metadata,
+        Column("company_id", String(36), primary_key=True),
+        Column("legal_name", String(255), nullable=False),
+        Column("display_name", String(255)),
+        Index("idx_bench_legal_name", "legal_name"),
+        Index("idx_bench_display_name", "display_name"),
+        mysql_engine="InnoDB",
+    )
+    if mysql:
+        Index("ft_bench_company_search", table.c.legal_name, table.c.display_name, mysql_prefix="FULLTEXT")
+    return table
+
+
+def seed(engine, table: Table, rows: int, batch: int = 10000) -> float:
+    rng = random.Random(42)
+    table.drop(engine, checkfirst=True)
+    table.create(engine)
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        for offset in range(0, rows, batch):
+            values = []
+            for i in range(offset, min(rows, offset + batch)):
+                name = " ".join(rng.sample(WORDS, rng.randint(2, 4)))
+                values.append(
+                    {
+                        "company_id": f"{i:036d}",
+                        "legal_name": f"{name.title()} {rng.choice(FORMS)}",
+                        "display_name": name.split()[0].title() if rng.random() < 0.5 else None,
+                    }
+                )
+            conn.execute(table.insert(), values)
+    return time.perf_counter() - start
+
+
+def statements(table: Table, q: str, mysql: bool, limit: int):
+    cols = (table.c.company_id, table.c.legal_name)
+    terms = _fulltext_terms(q)
+    if mysql and terms:
+        score = match(table.c.legal_name, table.c.display_name, against=terms).in_boolean_mode()
+        yield "fulltext", select(*cols, score).where(score).order_by(score.desc(), table.c.company_id).limit(limit)
+    like = _like_prefix(q)
+    yield "prefix", (
+        select(*cols)
+        .where(or_(table.c.legal_name.like(like, escape="\\"), table.c.display_name.like(like, escape="\\")))
+        .order_by(table.c.legal_name, table.c.company_id)
+        .limit(limit)
+    )
+    yield "old", select(*cols).where(
+        or_(table.c.legal_name.ilike(f"%{q}%"), table.c.display_name.ilike(f"%{q}%"))
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=os.getenv("BENCH_DATABASE_URL", "sqlite:///bench_company_search.db"))
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--skip-seed", action="store_true", help="reuse the table from a previous run")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(args.url)
+    mysql = engine.dialect.name == "mysql"
+    table = bench_table(MetaData(), mysql)
+    if not args.skip_seed:
+        print(f"seeding {args.rows} rows ...", flush=True)
+        print(f"seeded in {seed(engine, table, args.rows):.1f}s")
+    if not mysql:
+        print("(not MySQL: fulltext path skipped)")
+
+    print(f"{'query':<20} {'path':<10} {'rows':>7} {'p50 ms':>9} {'p95 ms':>9}")
+    with engine.connect() as conn:
+        for q in QUERIES:
+            served = "fulltext" if mysql and len(q) >= SEARCH_FULLTEXT_MIN_LEN and _fulltext_terms(q) else "prefix"
+            for path, stmt in statements(table, q, mysql, args.limit):
+                conn.execute(stmt).all()  # warm the caches
+                times, found = [], 0
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    found = len(conn.execute(stmt).all())
+                    times.append((time.perf_counter() - start) * 1000.0)
+                times.sort()
+                p95 = times[min(len(times) - 1, int(0.95 * len(times)))]
+                label = path + ("*" if path == served else "")
+                print(f"{q:<20} {label:<10} {found:>7} {statistics.median(times):>9.2f} {p95:>9.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+CPU cost vs bytes saved of the response compression middleware.
+
+    python scripts/bench_compression.py [--rows 2000] [--repeat 200]
+
+Builds JSON bodies shaped like the API's large responses and reports,
+per encoding / level: compressed size, ratio and CPU time per response.
+Then runs whole requests through CompressionMiddleware (plain ASGI, no
+server) to show the per-request overhead, and the ETag cache hit path.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.middleware.compression import CompressionMiddleware
+
+
+def industry_codes(rows: int) -> bytes:
+    """Master list like /masters/industry-codes: short repetitive dicts."""
+    rng = random.Random(1)
+    items = [
+        {
+            "id": f"{rng.getrandbits(128):032x}",
+            "code": f"{rng.randint(1000, 99999)}",
+            "name": f"Manufacture of {rng.choice(['steel', 'cement', 'textiles', 'chemicals', 'pharma'])} "
+            f"products n.e.c. ({i})",
+            "sub_industry_id": f"{rng.getrandbits(128):032x}",
+            "is_active": True,
+        }
+        for i in range(rows)
+    ]
+    return json.dumps({"items": items, "next_cursor": None, "total": None}).encode()
+
+
+def search_page(rows: int) -> bytes:
+    """A /company-search page."""
+    rng = random.Random(2)
+    words = "tata reliance infosys global steel power holdings industries capital".split()
+    items = [
+        {
+            "company_id": f"{rng.getrandbits(128):032x}",
+            "legal_name": " ".join(rng.sample(words, 3)).title() + " Pvt Ltd",
+            "country_id": f"{rng.getrandbits(128):032x}",
+            "cin": f"L{rng.randint(10**19, 10**20 - 1)}",
+            "sector": None,
+        }
+        for _ in range(rows)
+    ]
+    return json.dumps({"items": items, "next_cursor": "eyJrIjoxfQ", "total": None}).encode()
+
+
+def cpu_per_call(fn, repeat: int) -> float:
+    start = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - start) / repeat * 1000.0
+
+
+def levels_table(bodies, repeat: int) -> None:
+    configs = [("gzip", level) for level in (1, 6, 9)] + [("br", quality) for quality in (1, 4, 11)]
+    print(f"{'body':<22} {'encoding':<9} {'bytes':>9} {'ratio':>6} {'cpu ms':>8} {'KB saved/cpu ms':>16}")
+    for label, body in bodies:
+        print(f"{label:<22} {'identity':<9} {len(body):>9}")
+        for encoding, level in configs:
+            mw = CompressionMiddleware(None, gzip_level=level, brotli_quality=level)
+            out = mw.compress(encoding, body)
+            n = max(3, repeat // 20) if (encoding, level) == ("br", 11) else repeat
+            cpu = cpu_per_call(lambda: mw.compress(encoding, body), n)
+            saved = (len(body) - len(out)) / 1024.0
+            print(
+                f"{'':<22} {f'{encoding}-{level}':<9} {len(out):>9} {len(out) / len(body):>6.3f} "
+                f"{cpu:>8.3f} {saved / cpu if cpu else 0:>16.1f}"
+            )
+
+
+async def request_overhead(body: bytes, repeat: int) -> None:
+    async def app(scope, receive, send):
+        headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        if scope["path"] == "/etag":
+            headers.append((b"etag", b'"v1"'))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    def scope(path: str, accept: str):
+        return {
+            "type": "http", "method": "GET", "path": path, "query_string": b"",
+            "headers": [(b"accept-encoding", accept.encode())] if accept else [],
+        }
+
+    print(f"\n{'through middleware':<34} {'us/request':>11}")
+    cases = [
+        ("no Accept-Encoding", "/", ""),
+        ("gzip, no ETag", "/", "gzip"),
+        ("gzip, ETag (cache hit)", "/etag", "gzip"),
+        ("br, no ETag", "/", "br"),
+        ("br, ETag (cache hit)", "/etag", "br"),
+    ]
+    for label, path, accept in cases:
+        mw = CompressionMiddleware(app)
+        await mw(scope(path, accept), receive, send)  # fills the ETag cache
+        start = time.perf_counter()
+        for _ in range(repeat):
+            await mw(scope(path, accept), receive, send)
+        print(f"{label:<34} {(time.perf_counter() - start) / repeat * 1e6:>11.1f}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000, help="rows in the master-list body")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    codes = industry_codes(args.rows)
+    bodies = [
+        (f"master list ({args.rows})", codes),
+        ("search page (100)", search_page(100)),
+        ("search page (20)", search_page(20)),
+    ]
+    levels_table(bodies, args.repeat)
+    asyncio.run(request_overhead(codes, args.repeat))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+"""
+Concurrent /regulatory-upsert and /industry-size-upsert: the old
+read-then-write handlers vs the single-statement upserts with optimistic
+versioning (app/services/company_write.py).
+
+    python scripts/bench_upsert.py --url mysql+pymysql://user:pw@127.0.0.1/audit_bench
+                                   [--companies 20] [--writers 200] [--ops 20]
+
+Needs MySQL (INSERT ... ON DUPLICATE KEY UPDATE, LAST_INSERT_ID); --url
+defaults to BENCH_DATABASE_URL, then DATABASE_URL.
+
+Drives the real app (main.app, AuthMiddleware, identity cache pre-warmed)
+in-process through httpx's ASGI transport. --writers clients each send
+--ops upserts, alternating the two endpoints, over a hot set of
+--companies companies whose child rows are deleted first, so the first
+writes also race on the insert:
+
+- old:  copies of the handlers before the upsert rewrite (load company,
+        duplicate-CIN query, load record, mutate, commit), mounted under
+        /bench-old; no version, last writer silently wins
+- new:  the real endpoints. A client sends the last version it saw as
+        expected_version; a 409 with current_version counts as a version
+        conflict and is retried with that version (up to --retries)
+
+Reports successful upserts/s, version conflicts and failed calls (5xx, e.g.
+duplicate key on a racing first insert under the old path).
+"""
+
+import argparse
+import asyncio
+import collections
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TOKEN = "bench-upsert-token"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=os.getenv("BENCH_DATABASE_URL") or os.getenv("DATABASE_URL"))
+    parser.add_argument("--companies", type=int, default=20, help="hot set size (smaller = more contention)")
+    parser.add_argument("--writers", type=int, default=200, help="concurrent clients")
+    parser.add_argument("--ops", type=int, default=20, help="upserts per client")
+    parser.add_argument("--retries", type=int, default=5, help="retries of a version conflict (new path)")
+    return parser.parse_args(argv)
+
+
+ARGS = parse_args()
+if not ARGS.url or not ARGS.url.startswith("mysql"):
+    sys.exit("bench_upsert.py needs MySQL: pass --url mysql+pymysql://... (or set BENCH_DATABASE_URL)")
+
+# app.schemas.db builds its engines from these at import
+os.environ["DATABASE_URL"] = ARGS.url
+os.environ["DATABASE_REPLICA_URLS"] = ""
+os.environ.setdefault("AUTH_BASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault("SERVICE_ID", "svc_bench")
+os.environ.setdefault("SERVICE_SECRET", "bench")
+os.environ.setdefault("USER_TOKEN_VERIFY_MODE", "remote")
+
+import httpx
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.auth.itmtb_auth_sdk import _token_cache_key, get_shared_auth_client
+from app.schemas.company import IndustrySizeUpsertRequest, RegulatoryUpsertRequest
+from app.schemas.db import CompanyIndustrySizeMaster, CompanyMaster, RegulatoryMaster, engine, get_db
+from app.services.company_write import company, industry_size, regulatory
+from main import app
+
+
+# =========================
+# the handlers before the upsert rewrite
+# =========================
+
+old_router = APIRouter()
+
+
+@old_router.post("/regulatory-upsert")
+def old_regulatory_upsert(payload: RegulatoryUpsertRequest, db: Session = Depends(get_db)):
+    found = db.query(CompanyMaster).filter(CompanyMaster.company_id == payload.company_id).first()
+    if not found:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Company not found")
+    if payload.cin:
+        duplicate = (
+            db.query(RegulatoryMaster.company_id)
+            .join(CompanyMaster, CompanyMaster.company_id == RegulatoryMaster.company_id)
+            .filter(func.lower(CompanyMaster.legal_name) == func.lower(found.legal_name))
+            .filter(RegulatoryMaster.cin == payload.cin)
+            .filter(RegulatoryMaster.company_id != payload.company_id)
+            .first()
+        )
+        if duplicate:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Company with same legal name and CIN already exists")
+    values = payload.model_dump(exclude={"company_id", "expected_version"})
+    record = db.query(RegulatoryMaster).filter(RegulatoryMaster.company_id == payload.company_id).first()
+    if record:
+        for name, value in values.items():
+            setattr(record, name, value)
+    else:
+        db.add(RegulatoryMaster(company_id=payload.company_id, **values))
+    db.commit()
+    return {"message": "Regulatory data upserted", "company_id": payload.company_id}
+
+
+@old_router.post("/industry-size-upsert")
+def old_industry_size_upsert(payload: IndustrySizeUpsertRequest, db: Session = Depends(get_db)):
+    values = payload.model_dump(exclude={"company_id", "expected_version"})
+    record = (
+        db.query(CompanyIndustrySizeMaster).filter(CompanyIndustrySizeMaster.company_id == payload.company_id).first()
+    )
+    if record:
+        for name, value in values.items():
+            setattr(record, name, value)
+    else:
+        db.add(CompanyIndustrySizeMaster(company_id=payload.company_id, **values))
+    db.commit()
+    return {"message": "Industry/size profile upserted", "company_id": payload.company_id}
+
+
+app.include_router(old_router, prefix="/bench-old")
+
+
+# =========================
+# data
+# =========================
+
+def company_ids(n: int) -> list:
+    return [f"{i:08d}-bnup-0000-0000-000000000000" for i in range(n)]
+
+
+def reset(ids: list, create: bool) -> None:
+    with engine.begin() as conn:
+        if create:
+            company.metadata.create_all(conn, tables=[company, regulatory, industry_size], checkfirst=True)
+            conn.execute(company.delete().where(company.c.company_id.in_(ids)))
+            conn.execute(
+                company.insert(),
+                [
+                    {
+                        "company_id": cid,
+                        "legal_name": f"Upsert Bench {i} Pvt Ltd",
+                        "entity_type_id": "et",
+                        "country_id": "in",
+                        "registered_address": "1 Bench Road",
+                        "is_part_of_group": False,
+                        "status": "Draft",
+                        "created_by": "bench",
+                        "is_active": True,
+                    }
+                    for i, cid in enumerate(ids)
+                ],
+            )
+        for table in (regulatory, industry_size):
+            conn.execute(table.delete().where(table.c.company_id.in_(ids)))
+
+
+def payload(endpoint: str, company_index: int, cid: str, rng: random.Random) -> dict:
+    if endpoint == "regulatory-upsert":
+        return {
+            "company_id": cid,
+            "cin": f"U{company_index:020d}",
+            "pan": f"P{company_index:09d}",
+            "listed_status": rng.choice(["Listed", "Unlisted"]),
+            "ticker_symbol": f"T{rng.randint(0, 999)}",
+        }
+    return {
+        "company_id": cid,
+        "industry_sector_id": "sector",
+        "sub_industry_id": "sub",
+        "industry_code_id": "code",
+        "manufacturing_plants_count": rng.randint(0, 50),
+        "revenue_indicator_id": "rev",
+        "spend_indicator_id": "spend",
+    }
+
+
+# =========================
+# load
+# =========================
+
+async def run(client: httpx.AsyncClient, prefix: str, ids: list, versioned: bool):
+    counts = collections.Counter()
+
+    async def writer(w: int):
+        rng = random.Random(w)
+        known = {}  # (endpoint, company_id) -> last version this client saw
+        for op in range(ARGS.ops):
+            endpoint = ("regulatory-upsert", "industry-size-upsert")[op % 2]
+            i = rng.randrange(len(ids))
+            body = payload(endpoint, i, ids[i], rng)
+            for _ in range(ARGS.retries + 1):
+                if versioned:
+                    body["expected_version"] = known.get((endpoint, ids[i]))
+                try:
+                    resp = await client.post(f"{prefix}/{endpoint}", json=body)
+                except Exception as e:
+                    # unhandled in the app: IntegrityError on a racing insert, deadlock, ...
+                    counts[f"failed: {type(e).__name__}"] += 1
+                    break
+                if resp.status_code == 200:
+                    counts["ok"] += 1
+                    if versioned:
+                        known[(endpoint, ids[i])] = resp.json()["version"]
+                    break
+                detail = resp.json().get("detail")
+                if resp.status_code == 409 and isinstance(detail, dict) and "current_version" in detail:
+                    counts["version conflicts"] += 1
+                    known[(endpoint, ids[i])] = detail["current_version"]
+                    continue
+                counts[f"failed: {resp.status_code}"] += 1
+                break
+            else:
+                counts["gave up"] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(writer(w) for w in range(ARGS.writers)))
+    return counts, time.perf_counter() - start
+
+
+async def bench(ids: list) -> list:
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {TOKEN}"}
+    results = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers, timeout=120) as client:
+        for label, prefix, versioned in (("old", "/bench-old", False), ("new", "/api", True)):
+            reset(ids, create=False)
+            results.append((label, *await run(client, prefix, ids, versioned)))
+    return results
+
+
+def main() -> int:
+    ids = company_ids(ARGS.companies)
+    print(f"seeding {ARGS.companies} companies on {engine.url.render_as_string(hide_password=True)} ...")
+    reset(ids, create=True)
+
+    # warm identity cache: AuthMiddleware never leaves the process
+    get_shared_auth_client()._identity_cache.set(
+        _token_cache_key(TOKEN), {"u_id": "bench", "tenant_id": 1, "status": "active"}, 3600
+    )
+
+    results = asyncio.run(bench(ids))
+    print(
+        f"\n{ARGS.writers} writers x {ARGS.ops} upserts over {ARGS.companies} companies\n"
+        f"{'path':<5} {'ok/s':>8} {'ok':>7} {'conflicts':>10}  failed"
+    )
+    for label, counts, elapsed in results:
+        failed = ", ".join(
+            f"{n} {kind.split(': ', 1)[-1]}" for kind, n in counts.most_common()
+            if kind.startswith("failed") or kind == "gave up"
+        ) or "-"
+        print(f"{label:<5} {counts['ok'] / elapsed:>8.0f} {counts['ok']:>7} {counts['version conflicts']:>10}  {failed}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,15 @@
+"""
+Test settings, applied before any app module is imported: app.schemas.db
+builds its engines and the auth SDK reads its settings at import time.
+"""
+
+import os
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="audit-be-tests-")
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmp, 'app.db')}")
+os.environ.setdefault("DATABASE_REPLICA_URLS", "")
+os.environ.setdefault("AUTH_BASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault("SERVICE_ID", "svc_tests")
+os.environ.setdefault("SERVICE_SECRET", "tests")
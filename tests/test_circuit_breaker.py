@@ -0,0 +1,116 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.auth import service_http
+from app.auth.service_http import CircuitBreaker, ServiceHTTPLayer, ServiceUnavailableError
+
+
+def opened(reset_timeout=0.0, failure_threshold=2):
+    breaker = CircuitBreaker(failure_threshold=failure_threshold, reset_timeout=reset_timeout)
+    for _ in range(failure_threshold):
+        breaker.record_failure()
+    return breaker
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()  # resets the streak
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and breaker.opened == 1
+    assert breaker.admit() is None
+    assert breaker.rejected == 1
+
+
+def test_half_open_lets_one_probe_through():
+    breaker = opened()
+    assert breaker.admit() is True
+    assert breaker.state == "half_open"
+    assert breaker.admit() is None  # probe still in flight
+
+
+def test_probe_success_closes():
+    breaker = opened()
+    breaker.admit()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.admit() is False
+
+
+def test_probe_failure_reopens():
+    breaker = opened(reset_timeout=60)
+    breaker._opened_at = time.monotonic() - 61
+    assert breaker.admit() is True
+    breaker.record_failure()
+    assert breaker.state == "open" and breaker.opened == 2
+    assert breaker.admit() is None
+
+
+def test_released_probe_frees_the_slot():
+    breaker = opened()
+    assert breaker.admit() is True
+    breaker.release_probe()
+    assert breaker.admit() is True
+
+
+def layer_with_target(**breaker_kwargs):
+    layer = ServiceHTTPLayer()
+    target = layer.target("TESTSVC")
+    target.breaker = CircuitBreaker(**breaker_kwargs)
+    return layer, target
+
+
+def test_cancelled_probe_does_not_wedge_the_breaker():
+    layer, target = layer_with_target(failure_threshold=1, reset_timeout=0.0)
+    target.breaker.record_failure()
+
+    async def hang(request):
+        await asyncio.sleep(60)
+
+    async def run():
+        target._aclient = httpx.AsyncClient(transport=httpx.MockTransport(hang))
+        call = asyncio.ensure_future(layer.arequest("TESTSVC", "GET", "http://testsvc/health"))
+        await asyncio.sleep(0.01)
+        assert target.breaker.state == "half_open"
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+        await target._aclient.aclose()
+
+    asyncio.run(run())
+    assert target.breaker.admit() is True
+
+
+def test_retry_rechecks_the_breaker_after_backoff(monkeypatch):
+    layer, target = layer_with_target(failure_threshold=3, reset_timeout=60)
+    target.max_retries = 2
+    calls = []
+
+    class Unavailable:
+        status_code = 503
+
+    def send(method, url, **kwargs):
+        calls.append(url)
+        return Unavailable()
+
+    def sleep(seconds):
+        # other callers trip the breaker while this one backs off
+        target.breaker.record_failure()
+        target.breaker.record_failure()
+
+    monkeypatch.setattr(target.session, "request", send)
+    monkeypatch.setattr(service_http.time, "sleep", sleep)
+
+    resp = layer.request("TESTSVC", "GET", "http://testsvc/items")
+    assert resp.status_code == 503
+    assert len(calls) == 1
+    assert target.breaker.state == "open"
+    with pytest.raises(ServiceUnavailableError):
+        layer.request("TESTSVC", "GET", "http://testsvc/items")
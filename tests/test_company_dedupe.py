@@ -0,0 +1,18 @@
+from app.schemas.company import RegulatoryUpsertRequest
+from app.services.company_dedupe import conflict_keys, identifiers_of
+
+
+def test_identifiers_are_folded_for_comparison_only():
+    payload = RegulatoryUpsertRequest(
+        company_id="c1", cin=" u12345mh2001ptc000001 ", pan="aaaca0001a", lei="  ", listed_status="Unlisted"
+    )
+    # stored as sent
+    assert payload.cin == " u12345mh2001ptc000001 " and payload.pan == "aaaca0001a"
+    # compared trimmed and uppercased; blank ones left out
+    assert identifiers_of(payload.model_dump()) == {"cin": "U12345MH2001PTC000001", "pan": "AAACA0001A"}
+
+
+def test_conflict_keys_match_across_case():
+    sent = identifiers_of({"cin": "u12345mh2001ptc000001"})
+    stored = identifiers_of({"cin": "U12345MH2001PTC000001"})
+    assert conflict_keys("acme pvt ltd", sent) == conflict_keys("acme pvt ltd", stored)
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateTable
+from starlette.requests import Request
+
+from app.api import company as company_api
+from app.schemas.company import CompanyImportRow
+from app.services import company_import
+from app.services.company_import import ImportStats, _write_chunk
+
+
+def row(legal_name, cin, pan):
+    return CompanyImportRow(
+        legal_name=legal_name,
+        entity_type_id="et-1",
+        country_id="in",
+        registered_address="1 Test Road, Mumbai",
+        regulatory={"cin": cin, "pan": pan, "listed_status": "Unlisted"},
+    )
+
+
+# the second record is the first company again: same name key, same CIN
+CHUNK = [
+    (1, {"line": 1}, row("Acme Pvt Ltd", "U12345MH2001PTC000001", "AAACA0001A")),
+    (2, {"line": 2}, row("ACME Private Limited", "U12345MH2001PTC000001", "AAACA0002A")),
+]
+
+
+def session_factory(with_tables: bool):
+    engine = create_engine("sqlite://")
+    if with_tables:
+        # tables only: SQLite index names are database-wide and the models reuse some
+        with engine.begin() as conn:
+            for table in (company_import.company, company_import.regulatory, company_import.tax_registration):
+                conn.execute(CreateTable(table))
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def indexes(monkeypatch):
+    upserts = []
+    monkeypatch.setattr(company_import.typeahead_index, "upsert", lambda *a: upserts.append(a))
+    monkeypatch.setattr(company_import.name_index, "upsert", lambda *a: upserts.append(a))
+    return upserts
+
+
+def write(factory):
+    rejects, stats = [], ImportStats()
+
+    def reject(line, raw, error):
+        stats.rejected += 1
+        rejects.append((line, error))
+
+    seen = set()
+    _write_chunk(factory, CHUNK, seen, "tester", reject, stats)
+    return rejects, stats, seen
+
+
+def test_duplicate_in_chunk_is_rejected_once(indexes):
+    rejects, stats, seen = write(session_factory(with_tables=True))
+    assert [line for line, _ in rejects] == [2]
+    assert stats.inserted == 1 and stats.rejected == 1 and stats.regulatory_rows == 1
+    assert seen
+    assert len(indexes) == 2  # typeahead + name index for the written row
+
+
+def test_database_error_rejects_each_row_once(indexes, monkeypatch):
+    # the duplicate probe succeeds, then the INSERT fails (no tables)
+    monkeypatch.setattr(company_import, "existing_conflict_keys", lambda db, name_keys: set())
+    rejects, stats, seen = write(session_factory(with_tables=False))
+    # row 2 is rejected as a duplicate, row 1 by the failed write; never both for row 2
+    assert [line for line, _ in rejects] == [2, 1]
+    assert stats.rejected == 2 and stats.inserted == 0
+    assert rejects[0][1].startswith("Company with same legal name")
+    assert rejects[1][1].startswith("Database error")
+    assert not seen and not indexes
+
+
+def test_import_without_a_user_is_rejected(monkeypatch):
+    # a service token can pass the RBAC guard but leaves no user for created_by
+    monkeypatch.setattr(company_api, "import_companies", lambda *a: pytest.fail("import ran without a user"))
+    request = Request({"type": "http", "method": "POST", "path": "/api/company-import", "headers": [], "state": {}})
+    request.state.user_identity = None
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(company_api.import_company_master(request, fmt="csv"))
+    assert excinfo.value.status_code == 401
@@ -0,0 +1,53 @@
+import pytest
+
+from app.schemas.company_names import NORMALIZED_NAME_LENGTH, normalize_company_name, similarity_text
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        "Acme Pvt. Ltd.",
+        "ACME Private Limited",
+        "Acme (Pvt) Ltd",
+        "acme   p.v.t.  l.t.d.",
+        "The Acme Private Limited",
+        "Ácme Pvt Ltd",
+    ],
+)
+def test_spellings_of_one_company_share_a_key(name):
+    assert normalize_company_name(name) == "acme pvt ltd"
+
+
+def test_ampersand_and_phrases_are_folded():
+    assert normalize_company_name("Smith & Sons Limited Liability Partnership") == "smith and sons llp"
+    assert normalize_company_name("Tata Motors Public Limited Company") == "tata motors plc"
+
+
+def test_apostrophes_join_words():
+    assert normalize_company_name("O'Neil Corporation") == "oneil corp"
+
+
+def test_different_companies_keep_different_keys():
+    assert normalize_company_name("Acme Pvt Ltd") != normalize_company_name("Acme Industries Pvt Ltd")
+
+
+def test_the_alone_is_kept():
+    assert normalize_company_name("The") == "the"
+
+
+@pytest.mark.parametrize("name", [None, ""])
+def test_empty_name(name):
+    assert normalize_company_name(name) == ""
+
+
+def test_punctuation_only_name_falls_back_to_lowercase():
+    assert normalize_company_name(" ?!? ") == "?!?"
+
+
+def test_key_fits_the_column():
+    assert len(normalize_company_name("a" * 300)) == NORMALIZED_NAME_LENGTH
+
+
+def test_similarity_text_drops_legal_forms():
+    assert similarity_text("acme pvt ltd") == "acme"
+    assert similarity_text("pvt ltd") == "pvt ltd"
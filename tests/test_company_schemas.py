@@ -0,0 +1,24 @@
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.company import CompanyOnboardRequest, EngagementCreateRequest
+
+ENGAGEMENT = {
+    "engagement_name": "FY25 IA",
+    "engagement_code": "ENG-1",
+    "audit_type": "Statutory",
+    "reporting_currency": ["INR"],
+    "audit_fy": "FY25",
+}
+COMPANY = {"legal_name": "Acme Pvt Ltd", "entity_type_id": "et", "country_id": "in", "registered_address": "1 Road"}
+
+
+def test_engagement_create_keeps_accepting_any_audit_type():
+    assert EngagementCreateRequest(company_id="c1", **ENGAGEMENT).audit_type == "Statutory"
+
+
+def test_onboard_checks_audit_type_up_front():
+    with pytest.raises(ValidationError) as excinfo:
+        CompanyOnboardRequest(company=COMPANY, engagement=ENGAGEMENT)
+    assert excinfo.value.errors()[0]["loc"] == ("engagement", "audit_type")
+    assert CompanyOnboardRequest(company=COMPANY, engagement={**ENGAGEMENT, "audit_type": "SOX"}).engagement
@@ -0,0 +1,30 @@
+import pytest
+
+from app.api.company import SEARCH_FULLTEXT_MIN_LEN, _fulltext_terms, _like_prefix
+
+
+def test_every_word_required_and_prefix_matched():
+    assert _fulltext_terms("tata mot") == "+tata* +mot*"
+
+
+@pytest.mark.parametrize("q", ['+tata -"motors" (x)', "tata* ~motors <>", "@tata motors@"])
+def test_boolean_operators_are_dropped(q):
+    assert _fulltext_terms(q) == "+tata* +motors*"
+
+
+def test_short_words_are_dropped():
+    short = "a" * (SEARCH_FULLTEXT_MIN_LEN - 1)
+    assert _fulltext_terms(f"{short} infosys") == "+infosys*"
+
+
+@pytest.mark.parametrize("q", ["", "  ", "a b", "&& ++"])
+def test_nothing_indexable_means_no_fulltext(q):
+    assert _fulltext_terms(q) is None
+
+
+def test_unicode_words_are_kept():
+    assert _fulltext_terms("société générale") == "+société* +générale*"
+
+
+def test_like_prefix_escapes_wildcards():
+    assert _like_prefix(r"100%_a\b") == r"100\%\_a\\b%"
@@ -0,0 +1,48 @@
+import asyncio
+import gzip
+import json
+
+import brotli
+import pytest
+
+from app.middleware.compression import CompressionMiddleware
+
+BODY = json.dumps({"items": [{"id": i, "name": f"Company {i}"} for i in range(200)]}).encode()
+
+
+async def app(scope, receive, send):
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(BODY)).encode())]
+    await send({"type": "http.response.start", "status": 200, "headers": headers})
+    await send({"type": "http.response.body", "body": BODY})
+
+
+def get(accept_encoding):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    headers = [(b"accept-encoding", accept_encoding.encode())] if accept_encoding else []
+    scope = {"type": "http", "method": "GET", "path": "/", "query_string": b"", "headers": headers}
+    asyncio.run(CompressionMiddleware(app)(scope, receive, send))
+    start, *bodies = messages
+    headers = {k.decode(): v.decode() for k, v in start["headers"]}
+    return headers.get("content-encoding"), b"".join(m.get("body", b"") for m in bodies)
+
+
+@pytest.mark.parametrize(
+    "accept, encoding, decode",
+    [
+        ("gzip, deflate, br", "br", brotli.decompress),
+        ("br;q=0, gzip", "gzip", gzip.decompress),
+        ("gzip", "gzip", gzip.decompress),
+        ("", None, bytes),
+    ],
+)
+def test_negotiates_br_then_gzip(accept, encoding, decode):
+    got, body = get(accept)
+    assert got == encoding
+    assert decode(body) == BODY
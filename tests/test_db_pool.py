@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from app.config.db_config import get_pool_config
+from app.schemas.db_pool import AsyncPoolHealthChecker, create_async_pooled_engine
+
+
+def async_engine(tmp_path, liveness):
+    config = {**get_pool_config(), "liveness": liveness}
+    return create_async_pooled_engine(f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}", config)
+
+
+@pytest.mark.parametrize("liveness, pre_ping", [("background", False), ("pre_ping", True), ("none", False)])
+def test_async_engine_pre_pings_only_when_asked(tmp_path, liveness, pre_ping):
+    engine = async_engine(tmp_path, liveness)
+    assert engine.sync_engine.pool._pre_ping is pre_ping
+
+
+def test_async_checker_pings_idle_connections(tmp_path):
+    engine = async_engine(tmp_path, "background")
+    checker = AsyncPoolHealthChecker(engine, interval=0.01)
+    metrics = engine.sync_engine.pool.metrics
+
+    async def run():
+        async with engine.connect():
+            pass  # one idle connection in the pool
+        checker.start()
+        await asyncio.sleep(0.1)
+        await checker.stop()
+        await engine.dispose()
+
+    asyncio.run(run())
+    assert metrics.health_checks >= 2
+    assert metrics.health_check_failures == 0
+    assert metrics.last_health_check_error is None
+
+
+def test_async_checker_records_failures(tmp_path):
+    engine = async_engine(tmp_path, "background")
+    checker = AsyncPoolHealthChecker(engine, interval=60)
+
+    def refuse():
+        raise OSError("server gone")
+
+    async def run():
+        engine.sync_engine.pool._creator = refuse  # every new connection fails
+        return await checker.check()
+
+    assert asyncio.run(run()) is False
+    metrics = engine.sync_engine.pool.metrics
+    assert metrics.health_check_failures == 1
+    assert "server gone" in metrics.last_health_check_error
+
+
+def test_disabled_checker_does_not_start():
+    checker = AsyncPoolHealthChecker(engine=None, interval=0)
+
+    async def run():
+        checker.start()
+        assert checker._task is None
+        await checker.stop()
+
+    asyncio.run(run())
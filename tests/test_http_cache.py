@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from starlette.requests import Request
+
+from app.api.http_cache import http_date, is_not_modified, make_etag
+
+UPDATED = datetime(2015, 10, 21, 7, 28, 0, 123456)  # naive UTC, as stored
+ETAG = make_etag("c1", UPDATED.isoformat())
+
+
+def request(**headers):
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def test_if_none_match_weak_comparison():
+    assert is_not_modified(request(if_none_match=ETAG.removeprefix("W/")), ETAG, UPDATED)
+    assert is_not_modified(request(if_none_match=f'"other", {ETAG}'), ETAG, UPDATED)
+    assert is_not_modified(request(if_none_match="*"), ETAG, UPDATED)
+    assert not is_not_modified(request(if_none_match='"other"'), ETAG, UPDATED)
+
+
+def test_if_none_match_wins_over_if_modified_since():
+    req = request(if_none_match='"other"', if_modified_since=http_date(UPDATED))
+    assert not is_not_modified(req, ETAG, UPDATED)
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        "Wed, 21 Oct 2015 07:28:00 GMT",
+        "Wed, 21 Oct 2015 07:28:00 +0000",
+        "Wed, 21 Oct 2015 07:28:00 -0000",  # parses to a naive datetime
+        "Wed, 21 Oct 2015 09:28:00 +0200",
+    ],
+)
+def test_if_modified_since_at_last_modified(header):
+    assert is_not_modified(request(if_modified_since=header), ETAG, UPDATED)
+
+
+def test_if_modified_since_before_last_modified():
+    header = http_date(UPDATED - timedelta(seconds=1))
+    assert not is_not_modified(request(if_modified_since=header), ETAG, UPDATED)
+    assert not is_not_modified(request(if_modified_since="Wed, 21 Oct 2015 07:27:59 -0000"), ETAG, UPDATED)
+
+
+def test_aware_last_modified():
+    aware = UPDATED.replace(tzinfo=timezone.utc)
+    assert is_not_modified(request(if_modified_since="Wed, 21 Oct 2015 07:28:00 -0000"), ETAG, aware)
+
+
+@pytest.mark.parametrize("header", ["yesterday", "", "Wed, 99 Oct 2015 07:28:00 GMT"])
+def test_unparseable_if_modified_since_is_modified(header):
+    assert not is_not_modified(request(if_modified_since=header), ETAG, UPDATED)
+
+
+def test_http_date_is_gmt():
+    assert http_date(UPDATED) == "Wed, 21 Oct 2015 07:28:00 GMT"
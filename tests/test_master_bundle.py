@@ -0,0 +1,36 @@
+import gzip
+import json
+
+import brotli
+
+from app.services.master_bundle import MasterBundleCache
+from app.services.master_cache import MasterDataCache, MasterDef
+
+
+class FakeSession:
+    def close(self):
+        pass
+
+
+def bundle_cache():
+    items = [{"id": f"c{i}", "name": f"Country {i}"} for i in range(50)]
+    masters = {"countries": MasterDef("countries", lambda db: items, key=lambda item: (item["id"],))}
+    return MasterBundleCache(MasterDataCache(masters, session_factory=FakeSession))
+
+
+def test_brotli_variant_is_always_built_and_preferred():
+    body = bundle_cache().get(["countries"])
+
+    assert brotli.decompress(body.br) == body.identity
+    assert gzip.decompress(body.gzip) == body.identity
+    assert body.encoded("gzip, br") == (body.br, "br")
+    assert body.encoded("gzip, br;q=0") == (body.gzip, "gzip")
+    assert body.encoded("") == (body.identity, None)
+    assert len(json.loads(body.identity)["masters"]["countries"]) == 50
+
+
+def test_stats_report_brotli_size():
+    cache = bundle_cache()
+    body = cache.get(["countries"])
+
+    assert cache.stats()["variants"]["countries"]["br_bytes"] == len(body.br)
@@ -0,0 +1,67 @@
+import pytest
+from fastapi import HTTPException
+
+from app.api.pagination import PageParams, decode_cursor, encode_cursor, paginate_items
+
+ITEMS = [{"name": f"name-{i:02d}", "id": f"id-{i:02d}"} for i in range(25)]
+
+
+def key_of(item):
+    return (item["name"], item["id"])
+
+
+def params(limit=10, cursor=None, include_total=False):
+    return PageParams(limit=limit, cursor=cursor, include_total=include_total)
+
+
+def test_cursor_round_trip():
+    values = ["Tata Motors", "c0ffee", 42, None]
+    cursor = encode_cursor(values)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, len(values)) == values
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor(["only-one"]), encode_cursor({"a": 1}), "e30"])
+def test_bad_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, 2)
+    assert exc.value.status_code == 400
+
+
+def test_pages_cover_every_item_once():
+    seen, cursor = [], None
+    while True:
+        page, cursor, total = paginate_items(ITEMS, key_of, params(cursor=cursor))
+        assert total is None
+        seen.extend(page)
+        if cursor is None:
+            break
+    assert seen == ITEMS
+
+
+def test_last_full_page_has_no_next_cursor():
+    page, cursor, _ = paginate_items(ITEMS[:20], key_of, params(cursor=encode_cursor(key_of(ITEMS[9]))))
+    assert page == ITEMS[10:20]
+    assert cursor is None
+
+
+def test_cursor_between_items_resumes_after_it():
+    # item deleted since the cursor was issued: resume at the next key
+    cursor = encode_cursor(["name-04", "id-04x"])
+    page, _, _ = paginate_items(ITEMS, key_of, params(limit=2, cursor=cursor))
+    assert page == ITEMS[5:7]
+
+
+def test_total_only_when_asked():
+    _, _, total = paginate_items(ITEMS, key_of, params(include_total=True))
+    assert total == len(ITEMS)
+
+
+def test_empty_list():
+    assert paginate_items([], key_of, params(cursor=encode_cursor(["a", "b"]))) == ([], None, None)
+
+
+def test_cursor_of_wrong_type_is_400():
+    with pytest.raises(HTTPException) as exc:
+        paginate_items(ITEMS, key_of, params(cursor=encode_cursor([1, 2])))
+    assert exc.value.status_code == 400
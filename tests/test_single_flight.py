@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from app.auth.itmtb_auth_sdk import AsyncSingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"u_id": "u1"}
+
+    async def run():
+        return await asyncio.gather(*(flight.do("token", fetch) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert results == [{"u_id": "u1"}] * 5
+    assert len(calls) == 1
+    assert flight.shared == 4
+    assert flight._calls == {}
+
+
+def test_errors_reach_every_caller():
+    flight = AsyncSingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise ValueError("auth down")
+
+    async def run():
+        return await asyncio.gather(*(flight.do("token", fetch) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+def test_cancelled_leader_does_not_fail_followers():
+    flight = AsyncSingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "identity"
+
+    async def run():
+        leader = asyncio.ensure_future(flight.do("token", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("token", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(run()) == "identity"
@@ -0,0 +1,68 @@
+import time
+
+from app.auth.itmtb_auth_sdk import TTLCache
+
+
+def test_get_set_and_counters():
+    cache = TTLCache()
+    assert cache.get("a") is None
+    cache.set("a", 1, ttl=60)
+    assert cache.get("a") == 1
+    assert cache.get("b", "default") == "default"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 2, 1)
+    assert stats["hit_ratio"] == round(1 / 3, 4)
+
+
+def test_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = TTLCache()
+    cache.set("a", 1, ttl=5)
+    now[0] += 4.9
+    assert cache.get("a") == 1
+    now[0] += 0.1
+    assert cache.get("a") is None
+    assert cache.expirations == 1
+    assert len(cache) == 0
+
+
+def test_non_positive_ttl_is_not_stored():
+    cache = TTLCache()
+    cache.set("a", 1, ttl=0)
+    cache.set("b", 1, ttl=-3)
+    assert len(cache) == 0
+
+
+def test_least_recently_used_is_evicted():
+    cache = TTLCache(max_entries=2)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    cache.get("a")  # b is now the oldest
+    cache.set("c", 3, ttl=60)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_set_refreshes_value_and_recency():
+    cache = TTLCache(max_entries=2)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    cache.set("a", 10, ttl=60)
+    cache.set("c", 3, ttl=60)
+    assert cache.get("a") == 10
+    assert cache.get("b") is None
+
+
+def test_pop_invalidate_clear():
+    cache = TTLCache()
+    for key in ("user:1", "user:2", "svc:1"):
+        cache.set(key, True, ttl=60)
+    cache.pop("missing")
+    cache.pop("svc:1")
+    assert cache.invalidate(lambda key: key.startswith("user:")) == 2
+    assert len(cache) == 0
+    cache.set("x", 1, ttl=60)
+    cache.clear()
+    assert cache.get("x") is None
@@ -0,0 +1,112 @@
+import pytest
+
+from app.services.typeahead import TypeaheadIndex
+
+ROWS = [
+    ("c1", "Tata Motors Limited", "Tata Motors", "L28920MH1945PLC004520"),
+    ("c2", "Tata Steel Limited", None, "L27100MH1907PLC000260"),
+    ("c3", "Motors India Pvt Ltd", None, None),
+    ("c4", "Indian Tata Holdings", None, None),
+    ("c5", "Infosys Limited", "Infosys", None),
+]
+
+
+def index(rows=ROWS):
+    idx = TypeaheadIndex()
+    idx.load(rows)
+    return idx
+
+
+def ids(results):
+    return [r["company_id"] for r in results]
+
+
+def test_prefix_of_legal_name_ranks_first():
+    # "Tata Steel" outranks the word match in "Indian Tata Holdings"; shorter name first
+    assert ids(index().search("tata")) == ["c2", "c1", "c4"]
+
+
+def test_every_word_must_match():
+    assert ids(index().search("tata mot")) == ["c1"]
+    assert ids(index().search("mot")) == ["c3", "c1"]
+
+
+def test_matches_display_name_and_cin():
+    assert ids(index().search("L27100")) == ["c2"]
+    assert ids(index().search("infosys")) == ["c5"]
+
+
+def test_case_and_punctuation_are_ignored():
+    assert ids(index().search("  TATA-motors!! ")) == ["c1"]
+
+
+def test_k_limits_results():
+    assert len(index().search("t", k=2)) == 2
+
+
+def test_no_match_and_empty_query():
+    idx = index()
+    assert idx.search("zzz") == []
+    assert idx.search("  ") == []
+
+
+def test_upsert_replaces_a_company():
+    idx = index()
+    idx.upsert("c1", "Tata Motors Passenger Vehicles Ltd")
+    assert ids(idx.search("passenger")) == ["c1"]
+    assert ids(idx.search("tata motors")) == ["c1"]
+    assert idx.stats()["companies"] == len(ROWS)
+
+
+def test_upserted_company_beats_sorted_docs():
+    # early termination over the bulk-loaded docs must still see later upserts
+    idx = index([(f"x{i}", f"Alpha Company {i:03d}", None, None) for i in range(50)])
+    idx.upsert("new", "Alpha")
+    assert ids(idx.search("alpha", k=3))[0] == "new"
+
+
+def test_set_cin_reindexes():
+    idx = index()
+    idx.set_cin("c3", "U34100DL2001PTC000001")
+    assert ids(idx.search("U34100")) == ["c3"]
+    assert idx.search("motors india")[0]["cin"] == "U34100DL2001PTC000001"
+
+
+def test_compaction_keeps_results():
+    idx = index()
+    for i in range(10):
+        idx.upsert("c5", f"Infosys Limited {i}")
+    assert idx.compactions > 0
+    assert ids(idx.search("infosys")) == ["c5"]
+
+
+def test_upsert_before_load_is_ignored():
+    idx = TypeaheadIndex()
+    idx.upsert("c9", "Early Bird Ltd")
+    assert idx.search("early") == []
+
+
+def test_upsert_during_reload_is_kept():
+    idx = index()
+
+    def loader():
+        # company created after the reload query read its snapshot
+        idx.upsert("c9", "Zenith Exports Ltd")
+        return ROWS
+
+    idx.reload(loader)
+    assert ids(idx.search("zenith")) == ["c9"]
+    assert idx.stats()["companies"] == len(ROWS) + 1
+
+
+def test_failed_reload_keeps_current_index():
+    idx = index()
+
+    def loader():
+        raise RuntimeError("db down")
+
+    with pytest.raises(RuntimeError):
+        idx.reload(loader)
+    assert ids(idx.search("infosys")) == ["c5"]
+    idx.upsert("c9", "Zenith Exports Ltd")
+    assert idx._pending is None